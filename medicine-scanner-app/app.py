@@ -1,8 +1,15 @@
 from flask import Flask, request, jsonify
 from flask_cors import CORS
 import sqlite3
+import hashlib
 import json
 import logging
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
 
 app = Flask(__name__)
 CORS(app)
@@ -11,103 +18,323 @@ CORS(app)
 logging.basicConfig(level=logging.DEBUG)
 logger = logging.getLogger(__name__)
 
-def get_db_connection():
-    try:
-        conn = sqlite3.connect('medicines.db')
+DB_PATH = os.environ.get('MEDICINES_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'medicines.db'))
+DB_POOL_SIZE = int(os.environ.get('MEDICINES_DB_POOL_SIZE', '8'))
+# Lookup responses kept in memory, and how often medicines.db is checked for a rebuild
+MEDICINE_CACHE_SIZE = int(os.environ.get('MEDICINE_CACHE_SIZE', '2048'))
+CATALOGUE_CHECK_SECONDS = float(os.environ.get('MEDICINES_DB_CHECK_SECONDS', '2'))
+# Seconds browsers may reuse a lookup before revalidating it with If-None-Match
+MEDICINE_MAX_AGE = int(os.environ.get('MEDICINE_MAX_AGE', '300'))
+
+MEDICINE_COLUMNS = ['name', 'name_hi', 'usage', 'usage_hi', 'warnings', 'warnings_hi',
+                    'dosage', 'dosage_hi', 'sideEffects', 'sideEffects_hi',
+                    'commonNames', 'commonNames_hi']
+# FTS5 trigram tokens need at least three characters
+MIN_FTS_TERM_LENGTH = 3
+
+
+class ConnectionPool:
+    """Fixed set of read connections shared by all request threads."""
+
+    def __init__(self, path, size):
+        self.path = path
+        self._idle = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            self._idle.put(None)
+
+    def _connect(self):
+        # Read-only: serving never creates or changes medicines.db, that's the builder's job
+        conn = sqlite3.connect(f"file:{self.path}?mode=ro", uri=True, check_same_thread=False)
         conn.row_factory = sqlite3.Row
         return conn
-    except Exception as e:
-        logger.error(f"Database connection error: {str(e)}")
-        raise
 
-@app.route('/api/medicine/<medicine_name>')
-def get_medicine_info(medicine_name):
+    @contextmanager
+    def connection(self):
+        conn = self._idle.get()
+        try:
+            if conn is None:
+                conn = self._connect()
+            yield conn
+        except sqlite3.Error:
+            if conn is not None:
+                conn.close()
+            conn = None
+            raise
+        finally:
+            self._idle.put(conn)
+
+    def close(self):
+        """Close the idle connections; ones in use are closed when garbage collected."""
+        while True:
+            try:
+                conn = self._idle.get_nowait()
+            except queue.Empty:
+                return
+            if conn is not None:
+                conn.close()
+
+
+class ResponseCache:
+    """LRU of serialized lookup responses keyed by (catalogue version, name, lang)."""
+
+    def __init__(self, size):
+        self.size = size
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.not_modified = 0
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry
+
+    def put(self, key, entry):
+        if self.size <= 0:
+            return
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.size:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                'notModified': self.not_modified}
+
+
+db_pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+_schema = None
+_schema_lock = threading.Lock()
+medicine_cache = ResponseCache(MEDICINE_CACHE_SIZE)
+_catalogue = {'signature': None, 'version': None, 'next_check': 0.0}
+_catalogue_lock = threading.Lock()
+
+
+def get_db_connection():
+    return db_pool.connection()
+
+
+def has_search_index(conn):
+    """True when medicines.db was built with the trigram FTS table (python/medicines_db.py)."""
+    return conn.execute(
+        "SELECT 1 FROM sqlite_master WHERE type='table' AND name='medicines_fts'").fetchone() is not None
+
+
+def load_schema(conn):
+    """Introspect the medicines table once and prepare the lookup queries."""
+    cursor = conn.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='medicines'")
+    if not cursor.fetchone():
+        return None
+
+    columns = [col[1] for col in conn.execute("PRAGMA table_info(medicines)").fetchall()]
+    logger.debug(f"Available columns: {columns}")
+    select_columns = [col for col in MEDICINE_COLUMNS if col in columns]
+    if not select_columns:
+        return {'select_columns': []}
+
+    like_columns = [col for col in ('name', 'name_hi') if col in columns]
+    fts = 'name' in columns and has_search_index(conn)
+    return {
+        'select_columns': select_columns,
+        'fts': fts,
+        'fts_query': f"""
+        SELECT {', '.join('m.' + col for col in select_columns)}
+        FROM medicines_fts f JOIN medicines m ON m.rowid = f.rowid
+        WHERE medicines_fts MATCH ?
+        ORDER BY (m.name = ? COLLATE NOCASE) DESC, f.rank
+        LIMIT 1
+        """,
+        'like_query': f"""
+        SELECT {', '.join(select_columns)}
+        FROM medicines
+        WHERE {' OR '.join(f'LOWER({col}) LIKE LOWER(?)' for col in like_columns)}
+        LIMIT 1
+        """,
+        'like_params': len(like_columns)
+    }
+
+
+def get_schema(conn):
+    global _schema
+    if _schema is None:
+        with _schema_lock:
+            if _schema is None:
+                # Stays None while the table is missing, so a later build is picked up
+                _schema = load_schema(conn)
+    return _schema
+
+
+def file_signature(path):
     try:
-        lang = request.args.get('lang', 'en')
-        logger.debug(f"Searching for medicine: {medicine_name} in language: {lang}")
-        
-        conn = get_db_connection()
-        cursor = conn.cursor()
-        
-        # First, let's check if the table exists
-        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='medicines'")
-        if not cursor.fetchone():
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return (stat.st_ino, stat.st_size, stat.st_mtime_ns)
+
+
+def read_catalogue_version(signature):
+    """The build's catalogue_meta version, or a digest of the file's stat for older databases."""
+    try:
+        with get_db_connection() as conn:
+            row = conn.execute("SELECT value FROM catalogue_meta WHERE key = 'version'").fetchone()
+        if row:
+            return row[0]
+    except sqlite3.Error:
+        pass
+    return hashlib.sha1(repr(signature).encode('utf-8')).hexdigest()[:16]
+
+
+def reset_catalogue():
+    """Drop everything tied to the old medicines.db after it was rebuilt."""
+    global db_pool, _schema
+    old_pool = db_pool
+    # Pooled connections keep reading the replaced file, so start a new pool
+    db_pool = ConnectionPool(DB_PATH, DB_POOL_SIZE)
+    _schema = None
+    medicine_cache.clear()
+    old_pool.close()
+
+
+def catalogue_version():
+    """Version of the medicines.db being served, checked at most every CATALOGUE_CHECK_SECONDS."""
+    now = time.monotonic()
+    if now < _catalogue['next_check']:
+        return _catalogue['version']
+    with _catalogue_lock:
+        if now < _catalogue['next_check']:
+            return _catalogue['version']
+        signature = file_signature(DB_PATH)
+        if signature != _catalogue['signature']:
+            if _catalogue['signature'] is not None:
+                logger.info("medicines.db changed, reopening connections and clearing cached lookups")
+                reset_catalogue()
+            _catalogue['signature'] = signature
+            _catalogue['version'] = read_catalogue_version(signature) if signature else None
+        _catalogue['next_check'] = now + CATALOGUE_CHECK_SECONDS
+    return _catalogue['version']
+
+
+def medicine_etag(version, name, lang):
+    # Strong: the body is fully determined by the catalogue version, name and language
+    digest = hashlib.blake2b(f"{name}\0{lang}".encode('utf-8'), digest_size=8).hexdigest()
+    return f"{version}-{digest}"
+
+
+def find_medicine(conn, schema, medicine_name):
+    term = medicine_name.lower()
+    if schema['fts'] and len(term) >= MIN_FTS_TERM_LENGTH:
+        match = '"' + term.replace('"', '""') + '"'
+        return conn.execute(schema['fts_query'], (match, term)).fetchone()
+
+    search_term = f'%{term}%'
+    logger.debug(f"Executing query with search term: {search_term}")
+    return conn.execute(schema['like_query'], (search_term,) * schema['like_params']).fetchone()
+
+
+def lookup_medicine(medicine_name, lang):
+    """Query the catalogue: returns ``(result dict, status)``."""
+    if not os.path.exists(DB_PATH):
+        logger.error(f"{DB_PATH} has not been built (python medicines_db.py)")
+        return {'error': 'Database not properly initialized'}, 500
+    with get_db_connection() as conn:
+        schema = get_schema(conn)
+        if schema is None:
             logger.error("Medicines table does not exist")
-            return jsonify({'error': 'Database not properly initialized'}), 500
-        
-        # Get all columns from the table
-        cursor.execute("PRAGMA table_info(medicines)")
-        columns = [col[1] for col in cursor.fetchall()]
-        logger.debug(f"Available columns: {columns}")
-        
-        # Build the query based on available columns
-        select_columns = []
-        for col in ['name', 'name_hi', 'usage', 'usage_hi', 'warnings', 'warnings_hi', 
-                   'dosage', 'dosage_hi', 'sideEffects', 'sideEffects_hi', 
-                   'commonNames', 'commonNames_hi']:
-            if col in columns:
-                select_columns.append(col)
-        
-        if not select_columns:
+            return {'error': 'Database not properly initialized'}, 500
+
+        if not schema['select_columns']:
             logger.error("No valid columns found in medicines table")
-            return jsonify({'error': 'Invalid database structure'}), 500
-        
-        query = f"""
-        SELECT {', '.join(select_columns)}
-        FROM medicines 
-        WHERE LOWER(name) LIKE LOWER(?)
-        OR LOWER(name_hi) LIKE LOWER(?)
-        """
-        
-        search_term = f'%{medicine_name.lower()}%'
-        logger.debug(f"Executing query with search term: {search_term}")
-        
-        cursor.execute(query, (search_term, search_term))
-        medicine = cursor.fetchone()
+            return {'error': 'Invalid database structure'}, 500
+
+        medicine = find_medicine(conn, schema, medicine_name)
+    
+    if medicine:
+        medicine_dict = dict(medicine)
+        logger.debug(f"Found medicine: {medicine_dict}")
         
-        if medicine:
-            medicine_dict = dict(medicine)
-            logger.debug(f"Found medicine: {medicine_dict}")
-            
-            # Handle JSON fields
-            for field in ['commonNames', 'commonNames_hi']:
-                if field in medicine_dict and medicine_dict[field]:
-                    try:
-                        medicine_dict[field] = json.loads(medicine_dict[field])
-                    except json.JSONDecodeError:
-                        medicine_dict[field] = []
-            
-            if lang == 'hi':
-                result = {
-                    'name': medicine_dict.get('name_hi') or medicine_dict.get('name', ''),
-                    'usage': medicine_dict.get('usage_hi') or medicine_dict.get('usage', ''),
-                    'warnings': medicine_dict.get('warnings_hi') or medicine_dict.get('warnings', ''),
-                    'dosage': medicine_dict.get('dosage_hi') or medicine_dict.get('dosage', ''),
-                    'sideEffects': medicine_dict.get('sideEffects_hi') or medicine_dict.get('sideEffects', ''),
-                    'commonNames': medicine_dict.get('commonNames_hi') or medicine_dict.get('commonNames', [])
-                }
-            else:
-                result = {
-                    'name': medicine_dict.get('name', ''),
-                    'usage': medicine_dict.get('usage', ''),
-                    'warnings': medicine_dict.get('warnings', ''),
-                    'dosage': medicine_dict.get('dosage', ''),
-                    'sideEffects': medicine_dict.get('sideEffects', ''),
-                    'commonNames': medicine_dict.get('commonNames', [])
-                }
-            
-            logger.debug(f"Returning result: {result}")
-            return jsonify(result)
+        # Handle JSON fields
+        for field in ['commonNames', 'commonNames_hi']:
+            if field in medicine_dict and medicine_dict[field]:
+                try:
+                    medicine_dict[field] = json.loads(medicine_dict[field])
+                except json.JSONDecodeError:
+                    medicine_dict[field] = []
         
-        logger.warning(f"No medicine found for: {medicine_name}")
-        return jsonify({'error': 'Medicine not found'}), 404
+        if lang == 'hi':
+            result = {
+                'name': medicine_dict.get('name_hi') or medicine_dict.get('name', ''),
+                'usage': medicine_dict.get('usage_hi') or medicine_dict.get('usage', ''),
+                'warnings': medicine_dict.get('warnings_hi') or medicine_dict.get('warnings', ''),
+                'dosage': medicine_dict.get('dosage_hi') or medicine_dict.get('dosage', ''),
+                'sideEffects': medicine_dict.get('sideEffects_hi') or medicine_dict.get('sideEffects', ''),
+                'commonNames': medicine_dict.get('commonNames_hi') or medicine_dict.get('commonNames', [])
+            }
+        else:
+            result = {
+                'name': medicine_dict.get('name', ''),
+                'usage': medicine_dict.get('usage', ''),
+                'warnings': medicine_dict.get('warnings', ''),
+                'dosage': medicine_dict.get('dosage', ''),
+                'sideEffects': medicine_dict.get('sideEffects', ''),
+                'commonNames': medicine_dict.get('commonNames', [])
+            }
         
+        logger.debug(f"Returning result: {result}")
+        return result, 200
+    
+    logger.warning(f"No medicine found for: {medicine_name}")
+    return {'error': 'Medicine not found'}, 404
+
+
+def medicine_response(body, status, etag):
+    response = app.response_class(body, status=status, mimetype='application/json')
+    if status in (200, 304):
+        response.set_etag(etag)
+        response.cache_control.public = True
+        response.cache_control.max_age = MEDICINE_MAX_AGE
+    else:
+        # A missing medicine may be added by the next build
+        response.cache_control.no_cache = True
+    return response
+
+
+@app.route('/api/medicine/<medicine_name>')
+def get_medicine_info(medicine_name):
+    try:
+        lang = 'hi' if request.args.get('lang', 'en') == 'hi' else 'en'
+        logger.debug(f"Searching for medicine: {medicine_name} in language: {lang}")
+        name = medicine_name.lower()
+        version = catalogue_version()
+        etag = medicine_etag(version, name, lang)
+
+        # An ETag from this catalogue version means the client already has this exact body
+        if version and request.if_none_match.contains_weak(etag):
+            medicine_cache.not_modified += 1
+            return medicine_response(b'', 304, etag)
+
+        key = (version, name, lang)
+        cached = medicine_cache.get(key)
+        if cached is None:
+            result, status = lookup_medicine(medicine_name, lang)
+            cached = (jsonify(result).get_data(), status)
+            if version and status in (200, 404):
+                medicine_cache.put(key, cached)
+        return medicine_response(cached[0], cached[1], etag)
+
     except Exception as e:
         logger.error(f"Error processing request: {str(e)}")
         return jsonify({'error': str(e)}), 500
-    finally:
-        if 'conn' in locals():
-            conn.close()
 
 if __name__ == '__main__':
     app.run(debug=True) 
\ No newline at end of file
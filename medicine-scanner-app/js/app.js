@@ -10,6 +10,7 @@ const canvas = document.getElementById('canvas');
 const speakBtn = document.getElementById('speak-btn');
 const languageSelect = document.getElementById('language');
 const loadingOverlay = document.getElementById('loading-overlay');
+const scanStatus = document.getElementById('scan-status');
 const scanHistory = document.getElementById('scan-history');
 const reminderBtn = document.getElementById('reminder-btn');
 
@@ -76,7 +77,7 @@ function captureImage() {
     canvas.height = video.videoHeight;
     const context = canvas.getContext('2d');
     context.drawImage(video, 0, 0, canvas.width, canvas.height);
-    return canvas.toDataURL('image/jpeg');
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.92));
 }
 
 // Language handling functions
@@ -354,30 +355,114 @@ function hideLoading() {
     loadingOverlay.classList.add('hidden');
 }
 
-// Process image from gallery
-async function processGalleryImage(file) {
+function showScanResult(info) {
+    // Update UI with the information
+    updateUI(info);
+
+    // Add to history with timestamp
+    addToHistory(info.name, info);
+
+    // Automatically speak after scan
+    speakText(info);
+}
+
+// Live scan status shown under the preview, so the camera stays visible while aiming
+function showScanStatus(message) {
+    const t = translations[languageSelect.value] || translations.en;
+    if (message.type === 'busy') {
+        scanStatus.textContent = t.liveScanBusy;
+    } else if (message.candidate) {
+        // confidence is the lead over the runner-up; the server decides at 1.0
+        const percent = Math.round(Math.min(1, message.confidence) * 100);
+        scanStatus.textContent = `${t.liveScanCandidate} ${message.candidate} (${percent}%)`;
+    } else {
+        scanStatus.textContent = t.liveScanning;
+    }
+    scanStatus.classList.remove('hidden');
+}
+
+function hideScanStatus() {
+    scanStatus.classList.add('hidden');
+}
+
+// Live scan: stream downscaled camera frames until the server recognizes the medicine
+const STREAM_SCAN_URL = `${location.protocol === 'https:' ? 'wss:' : 'ws:'}//${location.host}/api/scan/stream`;
+const STREAM_FRAME_WIDTH = 960;
+const STREAM_FRAME_INTERVAL = 250; // ms between frames
+
+// Only asgi.py serves the live scan; /api/health says whether this server does.
+// null until asked, false after a failed connection so later taps go straight to a photo.
+let liveScanSupported = null;
+
+async function liveScanAvailable() {
+    if (liveScanSupported === null) {
+        try {
+            const response = await fetch('/api/health');
+            liveScanSupported = response.ok && (await response.json()).liveScan === true;
+        } catch (err) {
+            return false;
+        }
+    }
+    return liveScanSupported;
+}
+
+function captureFrame() {
+    const scale = Math.min(1, STREAM_FRAME_WIDTH / video.videoWidth);
+    canvas.width = Math.round(video.videoWidth * scale);
+    canvas.height = Math.round(video.videoHeight * scale);
+    canvas.getContext('2d').drawImage(video, 0, 0, canvas.width, canvas.height);
+    return new Promise(resolve => canvas.toBlob(resolve, 'image/jpeg', 0.8));
+}
+
+// Resolves with the server's result message, or null if it gave up;
+// rejects when the WebSocket could not be opened.
+// onProgress gets each progress and busy message.
+function streamScan(onProgress) {
     return new Promise((resolve, reject) => {
-        const reader = new FileReader();
-        reader.onload = (e) => resolve(e.target.result);
-        reader.onerror = (e) => reject(e);
-        reader.readAsDataURL(file);
+        const socket = new WebSocket(`${STREAM_SCAN_URL}?language=${languageSelect.value}`);
+        let timer = null;
+        let opened = false;
+        let settled = false;
+        const finish = (settle, value) => {
+            if (!settled) {
+                settled = true;
+                clearInterval(timer);
+                settle(value);
+            }
+        };
+
+        socket.onopen = () => {
+            opened = true;
+            timer = setInterval(async () => {
+                // Skip a tick while the last frame is still being sent, so frames never queue up
+                if (socket.readyState !== WebSocket.OPEN || socket.bufferedAmount > 0) return;
+                const frame = await captureFrame();
+                if (frame && socket.readyState === WebSocket.OPEN) socket.send(frame);
+            }, STREAM_FRAME_INTERVAL);
+        };
+        socket.onmessage = (event) => {
+            const message = JSON.parse(event.data);
+            if (message.type === 'result') finish(resolve, message);
+            else if (message.type === 'progress' || message.type === 'busy') onProgress(message);
+            else if (message.type === 'timeout') finish(resolve, null);
+            else if (message.type === 'stop') clearInterval(timer);
+        };
+        // A stream that dropped after opening falls back to a photo this time only
+        socket.onerror = socket.onclose = () => opened ? finish(resolve, null) : finish(reject, new Error('Live scan unavailable'));
     });
 }
 
 // Handle image processing
-async function handleImageProcessing(imageData) {
+async function handleImageProcessing(image) {
     showLoading();
     const language = languageSelect.value;
     try {
-        // Send image data and language to Python backend
-        const response = await axios.post('http://localhost:5000/api/scan', {
-            imageData: imageData,
-            language: language
-        }, {
-            timeout: 30000, // 30 second timeout
-            headers: {
-                'Content-Type': 'application/json'
-            }
+        // Upload the image as a binary file part; no base64 encoding on either side
+        const formData = new FormData();
+        formData.append('image', image, image.name || 'capture.jpg');
+        formData.append('language', language);
+        const response = await axios.post('http://localhost:5000/api/scan/upload', formData, {
+            timeout: 30000 // 30 second timeout
         });
 
         if (response.data.success) {
@@ -388,14 +473,7 @@ async function handleImageProcessing(imageData) {
                 throw new Error('Invalid response data from server');
             }
 
-            // Update UI with the information
-            updateUI(info);
-
-            // Add to history with timestamp
-            addToHistory(info.name, info);
-
-            // Automatically speak after scan
-            speakText(info);
+            showScanResult(info);
         } else {
             throw new Error(response.data.message || 'Failed to process image');
         }
@@ -419,8 +497,26 @@ async function handleImageProcessing(imageData) {
 
 // Event Listeners
 captureBtn.addEventListener('click', async () => {
-    const imageData = captureImage();
-    await handleImageProcessing(imageData);
+    captureBtn.disabled = true;
+    let result = null;
+    try {
+        if (await liveScanAvailable()) {
+            showScanStatus({ type: 'start' });
+            result = await streamScan(showScanStatus);
+        }
+    } catch (err) {
+        console.warn('Live scan unavailable, sending a still photo instead:', err);
+        liveScanSupported = false;
+    } finally {
+        hideScanStatus();
+        captureBtn.disabled = false;
+    }
+    if (result) {
+        showScanResult(result.data);
+        return;
+    }
+    const image = await captureImage();
+    await handleImageProcessing(image);
 });
 
 switchCameraBtn.addEventListener('click', switchCamera);
@@ -431,8 +527,7 @@ galleryBtn.addEventListener('click', () => {
 
 galleryUpload.addEventListener('change', async (e) => {
     if (e.target.files && e.target.files[0]) {
-        const imageData = await processGalleryImage(e.target.files[0]);
-        await handleImageProcessing(imageData);
+        await handleImageProcessing(e.target.files[0]);
     }
 });
 
@@ -1,20 +1,35 @@
-from flask import Flask, request, jsonify, send_file
+from flask import Flask, Response, request, jsonify, send_file, stream_with_context
 from flask_cors import CORS
+from werkzeug.exceptions import RequestEntityTooLarge
 import os
+import atexit
 import base64
+import gc
+import hmac
+import itertools
+import json
 import pytesseract
-from PIL import Image
-import io
 import re
+import time
 import logging
 from datetime import datetime
 import platform
-from config import TESSERACT_CONFIG, FLASK_CONFIG, LOGGING_CONFIG
-from medicine_database import MEDICINE_DATABASE
-from gtts import gTTS
-from googletrans import Translator
-import tempfile
-from deep_translator import GoogleTranslator
+from config import (TESSERACT_CONFIG, FLASK_CONFIG, LOGGING_CONFIG, FUZZY_MATCH_CONFIG, DATABASE_CONFIG,
+                    AUDIO_CACHE_CONFIG, TRANSLATION_CACHE_CONFIG, SPEECH_JOB_CONFIG, OCR_POOL_CONFIG,
+                    PREPROCESS_CONFIG, OCR_CASCADE_CONFIG, BATCH_SCAN_CONFIG, OCR_CACHE_CONFIG, METRICS_CONFIG,
+                    ADMIN_CONFIG, TRANSLATION_ENGINE_CONFIG, SCAN_HISTORY_CONFIG, SUPPORTED_LANGUAGES)
+from catalogue import Catalogue, CatalogueStore
+from audio_cache import AudioCache, audio_cache_key
+from translation_cache import TranslationCache
+from speech_jobs import SpeechJobQueue
+from ocr_pool import OCRPool, OCRQueueFull, OCRTimeout
+from ocr_cache import OCRResultCache, perceptual_hash
+from metrics import Metrics
+from lazy import LazyObject, lazy_import
+from scan_history import ScanRecorder
+from singleflight import SingleFlight
+from translation_engine import TranslationEngine
+from warmup import Warmup
 
 # Configure logging
 logging.basicConfig(
@@ -23,22 +38,59 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
-SUPPORTED_LANGUAGES = {
-    'en': 'English',
-    'hi': 'Hindi',
-    'es': 'Spanish',
-    'fr': 'French',
-    'de': 'German',
-    'it': 'Italian',
-    'pt': 'Portuguese',
-    'ru': 'Russian',
-    'ja': 'Japanese',
-    'ko': 'Korean',
-    'zh': 'Chinese',
-    'ar': 'Arabic'
-}
-
-translator = Translator()
+# Imported on first use or by the warmup, so importing the app stays fast
+gTTS = lazy_import('gtts', 'gTTS')
+translation_engine = TranslationEngine(
+    url=TRANSLATION_ENGINE_CONFIG['url'],
+    chunk_chars=TRANSLATION_ENGINE_CONFIG['chunk_chars'],
+    max_parallel=TRANSLATION_ENGINE_CONFIG['max_parallel'],
+    pool_connections=TRANSLATION_ENGINE_CONFIG['pool_connections'],
+    timeout=TRANSLATION_ENGINE_CONFIG['timeout_seconds']
+)
+metrics = Metrics()
+audio_cache = AudioCache(AUDIO_CACHE_CONFIG['directory'], AUDIO_CACHE_CONFIG['max_bytes'])
+speech_jobs = SpeechJobQueue(SPEECH_JOB_CONFIG['workers'], SPEECH_JOB_CONFIG['max_pending'])
+# Requests that miss the caches for the same text wait on one upstream call
+translation_flights = SingleFlight()
+speech_flights = SingleFlight()
+upstream_flights = {'translation': translation_flights, 'speech': speech_flights}
+# Set by asgi.py to send translation and TTS calls through its event loop's
+# pooled async client (async_upstreams.BlockingUpstreams) instead of
+# translation_engine and gTTS
+upstreams = None
+# True under asgi.py, the only server with the /api/scan/stream WebSocket; reported by /api/health
+live_scan = False
+translation_cache = TranslationCache(
+    TRANSLATION_CACHE_CONFIG['path'],
+    memory_entries=TRANSLATION_CACHE_CONFIG['memory_entries'],
+    max_entries=TRANSLATION_CACHE_CONFIG['max_entries'],
+    ttl_seconds=TRANSLATION_CACHE_CONFIG['ttl_seconds']
+)
+scan_recorder = ScanRecorder(
+    SCAN_HISTORY_CONFIG['path'],
+    max_queue=SCAN_HISTORY_CONFIG['max_queue'],
+    batch_size=SCAN_HISTORY_CONFIG['batch_size'],
+    flush_seconds=SCAN_HISTORY_CONFIG['flush_seconds'],
+    spill_path=SCAN_HISTORY_CONFIG['path'] + '.spill' if SCAN_HISTORY_CONFIG['spill'] else None
+) if SCAN_HISTORY_CONFIG['enabled'] else None
+# Writes the scans still queued when the process exits
+if scan_recorder is not None:
+    atexit.register(scan_recorder.close)
+
+def load_catalogue(path):
+    return Catalogue.open(path, FUZZY_MATCH_CONFIG, cache_entries=DATABASE_CONFIG['detail_cache_entries'])
+
+def builtin_catalogue():
+    from medicine_database import MEDICINE_DATABASE
+    return Catalogue.from_database(MEDICINE_DATABASE, FUZZY_MATCH_CONFIG, SUPPORTED_LANGUAGES)
+
+# Loaded by the warmup or the first scan, and reloaded when medicines.db is rebuilt
+catalogue_store = CatalogueStore(
+    DATABASE_CONFIG['path'],
+    load=load_catalogue,
+    fallback=builtin_catalogue,
+    check_seconds=DATABASE_CONFIG['reload_check_seconds']
+)
 
 def configure_tesseract():
     if TESSERACT_CONFIG['path']:
@@ -62,53 +114,202 @@ def configure_tesseract():
                 return
 
         logger.warning("Tesseract not found in default locations. Please install Tesseract OCR or set TESSERACT_PATH.")
-    else:
-        try:
-            pytesseract.get_tesseract_version()
-            logger.info("Tesseract found in system PATH")
-        except Exception as e:
-            logger.error(f"Tesseract not found in system PATH: {str(e)}")
+
+def check_tesseract():
+    # Runs `tesseract --version`, so it is part of the warmup rather than the import
+    try:
+        version = str(pytesseract.get_tesseract_version())
+    except Exception as e:
+        logger.error(f"Tesseract not found: {str(e)}")
+        raise
+    logger.info(f"Tesseract {version} found")
+    return version
 
 configure_tesseract()
 
+ocr_pool = OCRPool(
+    workers=OCR_POOL_CONFIG['workers'],
+    queue_depth=OCR_POOL_CONFIG['queue_depth'],
+    timeout=OCR_POOL_CONFIG['timeout_seconds'],
+    lang=TESSERACT_CONFIG['lang'],
+    config=TESSERACT_CONFIG['config'],
+    preprocess_config=PREPROCESS_CONFIG,
+    tesseract_cmd=pytesseract.pytesseract.tesseract_cmd,
+    passes=OCR_CASCADE_CONFIG['passes'][:max(1, OCR_CASCADE_CONFIG['max_passes'])]
+)
+
+def confident_match(text):
+    """True when OCR ``text`` contains a catalogue name exactly, so no further OCR pass is needed."""
+    return catalogue_store.current().matcher.best_match(text.lower())[0] is not None
+
+def run_ocr(image_bytes):
+    text, _ = ocr_pool.recognize(image_bytes, confident_match)
+    return text
+
+def run_ocr_batch(images):
+    """Yield ``(index, text, error)`` for each image as its OCR finishes."""
+    results = ocr_pool.recognize_many(images, confident_match, BATCH_SCAN_CONFIG['timeout_seconds'])
+    for index, result, error in results:
+        yield index, result[0] if result else None, error
+
+ocr_cache = OCRResultCache(
+    max_entries=OCR_CACHE_CONFIG['max_entries'],
+    max_distance=OCR_CACHE_CONFIG['max_distance'],
+    hash_bits=OCR_CACHE_CONFIG['hash_size'] ** 2
+)
+
+def image_fingerprint(image_bytes):
+    """Perceptual hash used as the OCR cache key, or None when the cache is off or the image can't be read."""
+    if not OCR_CACHE_CONFIG['enabled']:
+        return None
+    try:
+        with metrics.span('hash'):
+            return perceptual_hash(image_bytes, OCR_CACHE_CONFIG['hash_size'])
+    except Exception as e:
+        logger.warning(f"Could not hash image for OCR cache: {str(e)}")
+        return None
+
+def cache_ocr_result(image_hash, text, info, seconds):
+    # Only scans that found a medicine are kept, so a retake of a blurry photo still gets a fresh OCR
+    if image_hash is not None and info['name']:
+        ocr_cache.put(image_hash, text, seconds)
+
 app = Flask(__name__)
 CORS(app)
 app.config['SECRET_KEY'] = FLASK_CONFIG['SECRET_KEY']
 app.config['MAX_CONTENT_LENGTH'] = FLASK_CONFIG['MAX_CONTENT_LENGTH']
 
+@app.before_request
+def start_warmup():
+    # Servers that import the app instead of running it (gunicorn, asgi.py) start it here
+    if warmup.started_at is None:
+        warmup.start()
+
+@app.before_request
+def start_request_metrics():
+    metrics.request_started(server_timing=METRICS_CONFIG['server_timing'])
+
+@app.after_request
+def finish_request_metrics(response):
+    server_timing = metrics.request_finished(request.endpoint or 'unmatched', response.status_code)
+    if server_timing:
+        response.headers['Server-Timing'] = server_timing
+    return response
+
 def translate_text(text, target_lang='en'):
     try:
         if target_lang == 'en':
             return text
-        return translator.translate(text, dest=target_lang).text
+        cached = translation_cache.get(text, 'auto', target_lang)
+        if cached is not None:
+            return cached
+        with metrics.span('translate'):
+            return translation_flights.do(('auto', target_lang, text), fetch_translation, text, 'auto', target_lang)
     except Exception as e:
         logger.error(f"Translation error: {str(e)}")
         return text
 
 def translate_to_hindi(text):
     try:
-        chunks = [text[i:i+5000] for i in range(0, len(text), 5000)]
-        return ' '.join([GoogleTranslator(source='en', target='hi').translate(chunk) for chunk in chunks])
+        cached = translation_cache.get(text, 'en', 'hi')
+        if cached is not None:
+            return cached
+        with metrics.span('translate'):
+            return translation_flights.do(('en', 'hi', text), fetch_translation, text, 'en', 'hi')
     except Exception as e:
         logger.error(f"Translation error: {str(e)}")
         return text
 
-def generate_speech(text, lang='en'):
-    try:
-        if lang == 'hi':
-            text = text.replace('\n', '। ').strip()
-            tts = gTTS(text=text, lang='hi', slow=True)
-        else:
-            tts = gTTS(text=text, lang=lang, slow=False)
+def fetch_translation(text, source_lang, target_lang):
+    translated = (upstreams or translation_engine).translate(text, source_lang, target_lang)
+    translation_cache.put(text, source_lang, target_lang, translated)
+    return translated
+
+def speech_request(text, lang):
+    slow = lang == 'hi'
+    if slow:
+        text = text.replace('\n', '। ').strip()
+    return audio_cache_key(text, lang, slow), text, slow
 
-        temp_file = tempfile.NamedTemporaryFile(delete=False, suffix='.mp3')
-        tts.save(temp_file.name)
-        logger.info(f"Speech generated and saved to: {temp_file.name}")
-        return temp_file.name
+def synthesize_speech(key, text, lang, slow):
+    try:
+        with metrics.span('tts'):
+            audio_path = speech_flights.do(key, save_speech, key, text, lang, slow)
+        logger.info(f"Speech generated and saved to: {audio_path}")
+        return audio_path
     except Exception as e:
         logger.error(f"Error generating speech: {str(e)}")
         return None
 
+def save_speech(key, text, lang, slow):
+    if upstreams is None:
+        return audio_cache.put(key, gTTS(text=text, lang=lang, slow=slow).save)
+    audio = upstreams.synthesize(text, lang, slow)
+
+    def write(path):
+        with open(path, 'wb') as f:
+            f.write(audio)
+    return audio_cache.put(key, write)
+
+def stream_speech(key, text, lang, slow, flight=None):
+    """Yield mp3 bytes as gTTS returns each part of ``text``, then cache the whole file under ``key``.
+
+    ``flight`` is this request's ``speech_flights`` future; it gets the cached
+    path, or None if synthesis failed or the client went away first.
+    """
+    start = time.perf_counter()
+    chunks = []
+    audio_path = None
+    try:
+        try:
+            parts = gTTS(text=text, lang=lang, slow=slow).stream() if upstreams is None else \
+                upstreams.stream_speech(text, lang, slow)
+            for chunk in parts:
+                if not chunks:
+                    metrics.observe('tts_first_chunk', time.perf_counter() - start)
+                chunks.append(chunk)
+                yield chunk
+        except Exception as e:
+            metrics.observe('tts', time.perf_counter() - start, failed=True)
+            logger.error(f"Error generating speech: {str(e)}")
+            return
+        metrics.observe('tts', time.perf_counter() - start)
+
+        def write(path):
+            with open(path, 'wb') as f:
+                f.writelines(chunks)
+        audio_path = audio_cache.put(key, write)
+    finally:
+        if flight is not None:
+            speech_flights.finish(key, flight, audio_path)
+
+def generate_speech(text, lang='en'):
+    key, text, slow = speech_request(text, lang)
+    cached = audio_cache.get(key)
+    if cached:
+        logger.info(f"Speech served from cache: {cached}")
+        return cached
+    return synthesize_speech(key, text, lang, slow)
+
+def queue_speech(text, lang='en'):
+    """Start synthesis in the background; returns ``(audio filename, status)``."""
+    key, text, slow = speech_request(text, lang)
+    if audio_cache.get(key):
+        return f"{key}.mp3", 'ready'
+    if speech_jobs.submit(key, synthesize_speech, key, text, lang, slow) is None:
+        logger.warning("Speech queue is full, skipping audio for this scan")
+        return None, 'unavailable'
+    return f"{key}.mp3", 'pending'
+
+def localized(med, field):
+    # Only translate when neither the catalogue nor the precomputed records have Hindi text
+    if f'{field}_hi' in med:
+        return med[f'{field}_hi']
+    record = catalogue_store.current().localized(med.get('name'), 'hi')
+    if record:
+        return getattr(record, field)
+    return translate_to_hindi(med[field])
+
 def extract_medicine_info(text, lang='en'):
     info = {
         'name': '', 'name_hi': '',
@@ -122,34 +323,28 @@ def extract_medicine_info(text, lang='en'):
     }
 
     lower_text = text.lower()
-    best_match = None
-    best_score = 0
-
-    for key, med in MEDICINE_DATABASE.items():
-        if med['name'].lower() in lower_text:
-            score = len(med['name']) / len(lower_text)
-            if score > best_score:
-                best_match, best_score = med, score
-                info['matchedNames'].append(med['name'])
-
-        for alias in med['commonNames']:
-            if alias.lower() in lower_text:
-                score = len(alias) / len(lower_text)
-                if score > best_score:
-                    best_match, best_score = med, score
-                    info['matchedNames'].append(alias)
+    catalogue = catalogue_store.current()
+    best_match, best_score, info['matchedNames'] = catalogue.matcher.best_match(lower_text)
+    if not best_match:
+        best_match, best_score, info['matchedNames'] = catalogue.fuzzy_index.best_match(
+            lower_text,
+            min_similarity=FUZZY_MATCH_CONFIG['min_similarity'],
+            top_k=FUZZY_MATCH_CONFIG['top_k']
+        )
+        if best_match:
+            logger.info(f"Fuzzy matched OCR text to: {info['matchedNames'][0]}")
 
     if best_match:
         info['name'] = best_match['name']
-        info['name_hi'] = best_match.get('name_hi', translate_to_hindi(best_match['name']))
+        info['name_hi'] = localized(best_match, 'name')
         info['usage'] = best_match['usage']
-        info['usage_hi'] = best_match.get('usage_hi', translate_to_hindi(best_match['usage']))
+        info['usage_hi'] = localized(best_match, 'usage')
         info['warnings'] = best_match['warnings']
-        info['warnings_hi'] = best_match.get('warnings_hi', translate_to_hindi(best_match['warnings']))
+        info['warnings_hi'] = localized(best_match, 'warnings')
         info['dosage'] = best_match['dosage']
-        info['dosage_hi'] = best_match.get('dosage_hi', translate_to_hindi(best_match['dosage']))
+        info['dosage_hi'] = localized(best_match, 'dosage')
         info['sideEffects'] = best_match['sideEffects']
-        info['sideEffects_hi'] = best_match.get('sideEffects_hi', translate_to_hindi(best_match['sideEffects']))
+        info['sideEffects_hi'] = localized(best_match, 'sideEffects')
         info['confidence'] = best_score
         logger.info(f"Matched medicine: {best_match['name']}")
 
@@ -157,11 +352,64 @@ def extract_medicine_info(text, lang='en'):
 
 @app.route('/api/health', methods=['GET'])
 def health_check():
-    return jsonify({"status": "healthy", "message": "Server is running", "timestamp": datetime.now().isoformat()})
+    return jsonify({"status": "healthy", "message": "Server is running", "liveScan": live_scan,
+                    "timestamp": datetime.now().isoformat()})
+
+@app.route('/api/ready', methods=['GET'])
+def readiness_check():
+    """200 once the warmup has loaded the catalogue and run OCR in every worker, else 503."""
+    ready = warmup.finished and all(warmup.ok(name) for name in ('catalogue', 'tesseract', 'ocr'))
+    body = {"ready": ready, "warmup": warmup.status(), "catalogue": catalogue_store.stats(),
+            "timestamp": datetime.now().isoformat()}
+    if ready:
+        return jsonify(body)
+    response = jsonify(body)
+    response.status_code = 503
+    if not warmup.finished:
+        response.headers['Retry-After'] = '1'
+    return response
+
+def admin_allowed():
+    token = ADMIN_CONFIG['token']
+    if token:
+        return hmac.compare_digest(request.headers.get('X-Admin-Token', ''), token)
+    # Without ADMIN_TOKEN only requests from this machine may use admin endpoints
+    return request.remote_addr in ('127.0.0.1', '::1')
+
+@app.route('/api/admin/catalogue/reload', methods=['POST'])
+def reload_catalogue():
+    """Load medicines.db again and swap it in; scans keep using the old catalogue until it is ready."""
+    if not admin_allowed():
+        return jsonify({"success": False, "message": "Forbidden"}), 403
+    previous = catalogue_store.stats()['version']
+    try:
+        catalogue = catalogue_store.reload()
+    except Exception as e:
+        return jsonify({"success": False, "message": f"Catalogue reload failed: {str(e)}",
+                        "version": previous}), 500
+    return jsonify({"success": True, "previousVersion": previous, "version": catalogue.version,
+                    "entries": len(catalogue.medicines), "loadSeconds": round(catalogue_store.last_load_seconds, 3)})
+
+@app.route('/api/admin/scans/stats', methods=['GET'])
+def get_scan_stats():
+    """Scan history totals and top medicines per language: ?days=7&language=hi&limit=10"""
+    if not admin_allowed():
+        return jsonify({"success": False, "message": "Forbidden"}), 403
+    if scan_recorder is None:
+        return jsonify({"success": False, "message": "Scan history is disabled"}), 404
+    days = request.args.get('days', type=float)
+    since = time.time() - days * 86400 if days else None
+    summary = scan_recorder.summary(since, request.args.get('language'), request.args.get('limit', 10, type=int))
+    return jsonify({"success": True, "recorder": scan_recorder.stats(), **summary})
 
 @app.route('/api/languages', methods=['GET'])
 def get_languages():
-    return jsonify({"success": True, "languages": SUPPORTED_LANGUAGES})
+    response = jsonify({"success": True, "languages": SUPPORTED_LANGUAGES})
+    # Fixed for the life of the process: let browsers keep it and revalidate by ETag
+    response.cache_control.public = True
+    response.cache_control.max_age = 86400
+    response.add_etag()
+    return response.make_conditional(request)
 
 @app.route('/api/translate', methods=['POST'])
 def translate_medicine_info():
@@ -182,18 +430,208 @@ def generate_medicine_speech():
     lang = data.get('language', 'en')
     if lang not in SUPPORTED_LANGUAGES:
         return jsonify({"success": False, "message": f"Unsupported language"}), 400
-    audio_file = generate_speech(data['text'], lang)
-    if audio_file:
-        return send_file(audio_file, mimetype='audio/mpeg', as_attachment=True, download_name=f'medicine_info_{lang}.mp3')
-    return jsonify({"success": False, "message": "Error generating speech"}), 500
+    key, text, slow = speech_request(data['text'], lang)
+    download_name = f'medicine_info_{lang}.mp3'
+    cached = audio_cache.get(key)
+    if cached:
+        return send_file(cached, mimetype='audio/mpeg', as_attachment=True, download_name=download_name)
+
+    flight, leader = speech_flights.begin(key)
+    if not leader:
+        # Another request is already synthesizing this text; send its file once cached
+        try:
+            audio_path = flight.result()
+        except Exception:
+            audio_path = None
+        audio_path = audio_path or generate_speech(data['text'], lang)
+        if not audio_path:
+            return jsonify({"success": False, "message": "Error generating speech"}), 500
+        return send_file(audio_path, mimetype='audio/mpeg', as_attachment=True, download_name=download_name)
+
+    # Send each sentence's audio as gTTS returns it; the first part is fetched
+    # here so a failed synthesis still gets a JSON error instead of an empty mp3
+    chunks = stream_speech(key, text, lang, slow, flight)
+    first = next(chunks, None)
+    if first is None:
+        return jsonify({"success": False, "message": "Error generating speech"}), 500
+    return Response(stream_with_context(itertools.chain([first], chunks)), mimetype='audio/mpeg',
+                    headers={'Content-Disposition': f'attachment; filename={download_name}'})
 
 @app.route('/api/audio/<filename>', methods=['GET'])
 def serve_audio_file(filename):
-    audio_path = os.path.join(tempfile.gettempdir(), filename)
-    if os.path.exists(audio_path):
-        return send_file(audio_path, mimetype='audio/mpeg', as_attachment=True, download_name=filename)
+    key = filename[:-len('.mp3')] if filename.endswith('.mp3') else filename
+    job = speech_jobs.get(key)
+    if job is not None:
+        # Long-poll: ?wait=<seconds> holds the request until the audio is ready
+        wait = min(request.args.get('wait', 0, type=float), SPEECH_JOB_CONFIG['max_wait_seconds'])
+        if wait > 0:
+            try:
+                job.result(timeout=wait)
+            except Exception:
+                pass
+
+    # Serving the file makes it recently used, so a played clip isn't evicted next
+    audio_path = audio_cache.touch(key)
+    if audio_path is not None:
+        return send_file(audio_path, mimetype='audio/mpeg', as_attachment=True, download_name=f"{key}.mp3")
+    if speech_jobs.get(key) is not None:
+        response = jsonify({"success": True, "status": "pending", "message": "Audio is being generated"})
+        response.headers['Retry-After'] = '1'
+        return response, 202
+    if speech_jobs.failed(key):
+        return jsonify({"success": False, "status": "failed", "message": "Error generating speech"}), 500
     return jsonify({"success": False, "message": "Audio file not found"}), 404
 
+@app.route('/api/cache/stats', methods=['GET'])
+def get_cache_stats():
+    return jsonify({"success": True, "audio": audio_cache.stats(), "translation": translation_cache.stats(),
+                    "ocr": ocr_pool.stats(),
+                    "ocrResults": ocr_cache.stats(), "coalescing": coalescing_stats()})
+
+def coalescing_stats():
+    """Upstream calls made and calls answered by joining one already in flight, per kind."""
+    stats = {}
+    for kind, flights in upstream_flights.items():
+        stats[kind] = flights.stats()
+    return stats
+
+def read_request_body():
+    """Read the raw request body straight into one buffer, without intermediate chunks."""
+    if request.content_length is None:
+        return request.get_data(cache=False)
+    # The buffer is sized from the client's header, so check it before allocating
+    if request.content_length > app.config['MAX_CONTENT_LENGTH']:
+        raise RequestEntityTooLarge()
+    body = bytearray(request.content_length)
+    view = memoryview(body)
+    received = 0
+    while received < len(body):
+        count = request.stream.readinto(view[received:])
+        if not count:
+            break
+        received += count
+    return body[:received] if received < len(body) else body
+
+def scan_info(text, lang):
+    """Match OCR ``text``; returns the scan payload without audio and the text to speak."""
+    with metrics.span('match'):
+        info = extract_medicine_info(text, lang)
+
+    record = catalogue_store.current().localized(info['name'], lang)
+    if record:
+        speech_text = record.speech
+        display_info = record.display()
+    elif lang == 'hi':
+        speech_text = f"दवा का नाम: {info['name_hi']} उपयोग: {info['usage_hi']} चेतावनी: {info['warnings_hi']} खुराक: {info['dosage_hi']} दुष्प्रभाव: {info['sideEffects_hi']}"
+        display_info = {
+            'name': info['name_hi'], 'usage': info['usage_hi'], 'warnings': info['warnings_hi'],
+            'dosage': info['dosage_hi'], 'sideEffects': info['sideEffects_hi']
+        }
+    else:
+        speech_text = f"Medicine: {info['name']} Usage: {info['usage']} Warnings: {info['warnings']} Dosage: {info['dosage']} Side Effects: {info['sideEffects']}"
+        display_info = {
+            'name': info['name'], 'usage': info['usage'], 'warnings': info['warnings'],
+            'dosage': info['dosage'], 'sideEffects': info['sideEffects']
+        }
+
+    info['display'] = display_info
+    info['selectedLanguage'] = lang
+    return info, speech_text
+
+def scan_result(text, lang, speech=True):
+    """Match OCR ``text`` and build the scan payload, queueing speech unless ``speech`` is False."""
+    if lang not in SUPPORTED_LANGUAGES:
+        lang = 'en'
+    info, speech_text = scan_info(text, lang)
+
+    if not speech:
+        audio_filename, info['audioStatus'] = None, 'skipped'
+    elif SPEECH_JOB_CONFIG['async']:
+        with metrics.span('speech'):
+            audio_filename, info['audioStatus'] = queue_speech(speech_text, lang)
+    else:
+        with metrics.span('speech'):
+            audio_file = generate_speech(speech_text, lang)
+        audio_filename = os.path.basename(audio_file) if audio_file else None
+        info['audioStatus'] = 'ready' if audio_file else 'unavailable'
+    if audio_filename:
+        info['audioDownloadUrl'] = f'/api/audio/{audio_filename}'
+        info['translatedText'] = speech_text
+    return info
+
+def record_scan(info, lang, source, ocr_cached, timings=None):
+    """Queue a scan for the history database; returns at once.
+
+    ``timings`` defaults to the stages of the current request.
+    """
+    if scan_recorder is not None:
+        scan_recorder.record(source, lang if lang in SUPPORTED_LANGUAGES else 'en', info.get('name'),
+                             info.get('confidence'), ocr_cached, metrics.timings() if timings is None else timings)
+
+def scan_image(image_bytes, lang, source='scan'):
+    image_hash = image_fingerprint(image_bytes)
+    text = ocr_cache.get(image_hash) if image_hash is not None else None
+    if text is not None:
+        info = scan_result(text, lang)
+        record_scan(info, lang, source, True)
+        return info
+
+    start = time.perf_counter()
+    with metrics.span('ocr'):
+        text = run_ocr(image_bytes)
+    seconds = time.perf_counter() - start
+    info = scan_result(text, lang)
+    cache_ocr_result(image_hash, text, info, seconds)
+    record_scan(info, lang, source, False)
+    return info
+
+def scan_response(image_bytes, lang, source='scan'):
+    try:
+        info = scan_image(image_bytes, lang, source)
+        return jsonify({"success": True, "message": "Medicine scanned successfully", "data": info, "timestamp": datetime.now().isoformat()})
+    except OCRQueueFull:
+        logger.warning("OCR queue is full, rejecting scan")
+        response = jsonify({"success": False, "message": "Server is busy, please retry shortly"})
+        response.headers['Retry-After'] = str(OCR_POOL_CONFIG['retry_after_seconds'])
+        return response, 503
+    except OCRTimeout:
+        logger.error("OCR timed out")
+        return jsonify({"success": False, "message": "Image processing timed out"}), 504
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"success": False, "message": "Unexpected error occurred"}), 500
+
+def cache_counts(field):
+    translation = translation_cache.stats()
+    return {
+        (('cache', 'audio'),): audio_cache.stats()[field],
+        (('cache', 'translation'),): translation['memoryHits'] + translation['diskHits'] if field == 'hits' else translation[field],
+        (('cache', 'ocr_result'),): ocr_cache.stats()[field]
+    }
+
+metrics.register('cache_hits_total', 'counter', 'Cache lookups answered from the cache.', lambda: cache_counts('hits'))
+metrics.register('cache_misses_total', 'counter', 'Cache lookups that had to do the work.', lambda: cache_counts('misses'))
+metrics.register('ocr_jobs_in_flight', 'gauge', 'Scans running or queued in the OCR pool.', lambda: ocr_pool.stats()['inFlight'])
+metrics.register('ocr_rejected_total', 'counter', 'Scans turned away because the OCR queue was full.', lambda: ocr_pool.stats()['rejected'])
+metrics.register('ocr_timeouts_total', 'counter', 'Scans whose OCR missed its deadline.', lambda: ocr_pool.stats()['timeouts'])
+metrics.register('ocr_images_total', 'counter', 'Images recognized by the OCR cascade.', lambda: ocr_pool.stats()['recognized'])
+metrics.register('ocr_passes_total', 'counter', 'OCR cascade passes run; divide by ocr_images_total for passes per image.',
+                 lambda: ocr_pool.stats()['passesRun'])
+metrics.register('upstream_calls_total', 'counter', 'Translation and speech calls made to Google.',
+                 lambda: {(('kind', kind),): stats['calls'] for kind, stats in coalescing_stats().items()})
+metrics.register('upstream_calls_coalesced_total', 'counter', 'Translation and speech requests that joined an identical call already in flight.',
+                 lambda: {(('kind', kind),): stats['coalesced'] for kind, stats in coalescing_stats().items()})
+metrics.register('translate_requests_total', 'counter', 'Chunk requests sent to Google Translate.',
+                 lambda: translation_engine.requests)
+metrics.register('speech_jobs_pending', 'gauge', 'Speech syntheses queued or running.', lambda: speech_jobs.pending_count())
+metrics.register('scan_history_dropped_total', 'counter', 'Scan records lost because the history queue was full or a write failed.',
+                 lambda: scan_recorder.dropped if scan_recorder is not None else 0)
+metrics.register('speech_rejected_total', 'counter', 'Scans left without audio because the speech queue was full.', lambda: speech_jobs.rejected)
+
+@app.route('/api/metrics', methods=['GET'])
+def get_metrics():
+    return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
+
 @app.route('/api/scan', methods=['POST'])
 def scan_medicine():
     try:
@@ -201,42 +639,157 @@ def scan_medicine():
         if not data or 'imageData' not in data:
             return jsonify({"success": False, "message": "No image data provided"}), 400
 
-        image_data = data['imageData'].split(',')[1]
-        image_bytes = base64.b64decode(image_data)
-        image = Image.open(io.BytesIO(image_bytes))
-        text = pytesseract.image_to_string(image, lang=TESSERACT_CONFIG['lang'], config=TESSERACT_CONFIG['config'])
-
+        with metrics.span('decode'):
+            image_data = data['imageData'].split(',')[1]
+            image_bytes = base64.b64decode(image_data)
         lang = data.get('language', 'en')
-        if lang not in SUPPORTED_LANGUAGES:
-            lang = 'en'
-
-        info = extract_medicine_info(text, lang)
-
-        if lang == 'hi':
-            speech_text = f"दवा का नाम: {info['name_hi']} उपयोग: {info['usage_hi']} चेतावनी: {info['warnings_hi']} खुराक: {info['dosage_hi']} दुष्प्रभाव: {info['sideEffects_hi']}"
-            display_info = {
-                'name': info['name_hi'], 'usage': info['usage_hi'], 'warnings': info['warnings_hi'],
-                'dosage': info['dosage_hi'], 'sideEffects': info['sideEffects_hi']
-            }
+    except Exception as e:
+        logger.error(f"Unexpected error: {str(e)}")
+        return jsonify({"success": False, "message": "Unexpected error occurred"}), 500
+    return scan_response(image_bytes, lang)
+
+@app.route('/api/scan/upload', methods=['POST'])
+def scan_medicine_upload():
+    # multipart/form-data with an 'image' file field, or the raw image as the body
+    if request.mimetype == 'multipart/form-data':
+        with metrics.span('decode'):
+            upload = request.files.get('image')
+            image_bytes = upload.read() if upload else b''
+        lang = request.form.get('language') or request.args.get('language', 'en')
+    elif request.mimetype.startswith('image/'):
+        try:
+            with metrics.span('decode'):
+                image_bytes = read_request_body()
+        except RequestEntityTooLarge:
+            return jsonify({"success": False, "message": "Image is too large"}), 413
+        lang = request.args.get('language', 'en')
+    else:
+        return jsonify({"success": False, "message": "Send multipart/form-data or an image/* body"}), 415
+
+    if not image_bytes:
+        return jsonify({"success": False, "message": "No image data provided"}), 400
+    return scan_response(image_bytes, lang, 'upload')
+
+def batch_item_error(error):
+    if isinstance(error, OCRQueueFull):
+        return "Server is busy, please retry shortly"
+    if isinstance(error, OCRTimeout):
+        return "Image processing timed out"
+    return "Unexpected error occurred"
+
+def scan_batch(images, lang, speech):
+    """Yield one result dict per image, in completion order."""
+    def scanned(index, text, image_hash=None, seconds=None):
+        try:
+            info = scan_result(text, lang, speech)
+        except Exception as e:
+            return failed(index, e)
+        if seconds is not None:
+            cache_ocr_result(image_hash, text, info, seconds)
+        # The request's stages cover the whole batch, so record this image's OCR time alone
+        record_scan(info, lang, 'batch', seconds is None, {'ocr': seconds} if seconds is not None else {})
+        return {"index": index, "filename": images[index][0], "success": True, "data": info}
+
+    def failed(index, error):
+        logger.error(f"Batch scan of image {index} failed: {str(error)}")
+        return {"index": index, "filename": images[index][0], "success": False, "message": batch_item_error(error)}
+
+    # Photos the OCR cache recognizes are answered before any OCR starts
+    misses = []
+    for index, (_, image) in enumerate(images):
+        image_hash = image_fingerprint(image)
+        text = ocr_cache.get(image_hash) if image_hash is not None else None
+        if text is not None:
+            yield scanned(index, text)
         else:
-            speech_text = f"Medicine: {info['name']} Usage: {info['usage']} Warnings: {info['warnings']} Dosage: {info['dosage']} Side Effects: {info['sideEffects']}"
-            display_info = {
-                'name': info['name'], 'usage': info['usage'], 'warnings': info['warnings'],
-                'dosage': info['dosage'], 'sideEffects': info['sideEffects']
-            }
-
-        audio_file = generate_speech(speech_text, lang)
-        if audio_file:
-            info['audioDownloadUrl'] = f'/api/audio/{os.path.basename(audio_file)}'
-            info['translatedText'] = speech_text
-
-        info['display'] = display_info
-        info['selectedLanguage'] = lang
+            misses.append((index, image_hash))
+    if not misses:
+        return
 
-        return jsonify({"success": True, "message": "Medicine scanned successfully", "data": info, "timestamp": datetime.now().isoformat()})
+    start = time.perf_counter()
+    for completed, (position, text, error) in enumerate(run_ocr_batch([images[index][1] for index, _ in misses]), 1):
+        index, image_hash = misses[position]
+        if error is not None:
+            yield failed(index, error)
+        else:
+            # Workers run in parallel, so the saving per image is the batch's wall time per image
+            yield scanned(index, text, image_hash, (time.perf_counter() - start) / completed)
+
+def read_batch_request():
+    """Return ``(images, language, speech, stream)`` from a multipart or JSON batch request."""
+    if request.mimetype == 'multipart/form-data':
+        images = [(upload.filename, upload.read()) for upload in request.files.getlist('images')]
+        options = request.form
+    else:
+        data = request.get_json(silent=True) or {}
+        images = [(None, base64.b64decode(image.split(',')[-1])) for image in data.get('images', [])]
+        options = data
+    lang = options.get('language') or request.args.get('language', 'en')
+    speech = options.get('speech', request.args.get('speech', BATCH_SCAN_CONFIG['speech']))
+    if isinstance(speech, str):
+        speech = speech.lower() in ('1', 'true', 'yes', 'on')
+    stream = request.args.get('stream', '').lower() in ('1', 'true', 'yes') or \
+        request.accept_mimetypes.best == 'application/x-ndjson'
+    return images, lang, bool(speech), stream
+
+@app.route('/api/scan/batch', methods=['POST'])
+def scan_medicine_batch():
+    try:
+        images, lang, speech, stream = read_batch_request()
     except Exception as e:
         logger.error(f"Unexpected error: {str(e)}")
         return jsonify({"success": False, "message": "Unexpected error occurred"}), 500
 
+    if not images or not all(image for _, image in images):
+        return jsonify({"success": False, "message": "No image data provided"}), 400
+    if len(images) > BATCH_SCAN_CONFIG['max_images']:
+        return jsonify({"success": False, "message": f"At most {BATCH_SCAN_CONFIG['max_images']} images per batch"}), 413
+
+    if stream:
+        # One JSON object per line, written as each image finishes
+        lines = (json.dumps(result, ensure_ascii=False) + '\n' for result in scan_batch(images, lang, speech))
+        return Response(stream_with_context(lines), mimetype='application/x-ndjson')
+
+    results = sorted(scan_batch(images, lang, speech), key=lambda result: result['index'])
+    return jsonify({"success": all(result['success'] for result in results), "results": results, "timestamp": datetime.now().isoformat()})
+
+def warm_catalogue():
+    catalogue = catalogue_store.current()
+    return {'version': catalogue.version, 'entries': len(catalogue.medicines)}
+
+def warm_ocr():
+    if not warmup.ok('tesseract'):
+        raise RuntimeError("Tesseract is not available")
+    ocr_pool.warm()
+    return {'workers': ocr_pool.workers}
+
+def warm_clients():
+    if isinstance(gTTS, LazyObject):
+        gTTS.resolve()
+    translation_engine.warm()
+
+def freeze_heap():
+    # The catalogue's matchers and the imported modules live for the whole
+    # process; move them out of the cyclic GC so full collections don't rescan them
+    gc.collect()
+    gc.freeze()
+    return {'frozen': gc.get_freeze_count()}
+
+warmup = Warmup([
+    ('catalogue', warm_catalogue),  # Matcher and fuzzy index for the first scan
+    ('tesseract', check_tesseract),
+    ('ocr', warm_ocr),  # Spawns every OCR worker and runs one pass in each
+    ('clients', warm_clients),  # Imports gTTS, requests and BeautifulSoup
+    ('gc', freeze_heap)  # Last, once, so it covers everything warmup loaded
+])
+
+metrics.register('catalogue_entries', 'gauge', 'Medicines in the loaded catalogue.',
+                 lambda: catalogue_store.stats()['entries'])
+metrics.register('catalogue_reloads_total', 'counter', 'Times a rebuilt medicines.db was swapped in.',
+                 lambda: catalogue_store.reloads)
+
 if __name__ == '__main__':
+    # With the debug reloader only the child process that serves requests warms up
+    if not FLASK_CONFIG['DEBUG'] or os.environ.get('WERKZEUG_RUN_MAIN') == 'true':
+        warmup.start()
     app.run(debug=FLASK_CONFIG['DEBUG'], port=FLASK_CONFIG['PORT'], host=FLASK_CONFIG['HOST'])
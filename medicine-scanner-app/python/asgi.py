@@ -0,0 +1,194 @@
+"""Production ASGI entry point for the scan API.
+
+Run from the ``python/`` directory:
+
+    uvicorn asgi:application --host 0.0.0.0 --port 5000
+
+Every HTTP route is the Flask app in app.py, served through a2wsgi on a
+bounded pool of ``wsgi_workers`` threads, so CORS, metrics and the handlers
+are the same as under ``python app.py``. What runs on the event loop:
+
+- Google Translate and gTTS calls. The Flask handlers send them to one
+  pooled async HTTP client (async_upstreams.py) with per-upstream
+  concurrency limits, and only wait for the answer.
+- The live camera scan WebSocket (/api/scan/stream), which is served only
+  here. Its frames are OCRed in the process pool without holding a thread.
+"""
+import asyncio
+import json
+import logging
+import time
+from urllib.parse import parse_qs
+
+from a2wsgi import WSGIMiddleware
+
+import app as scanner
+from async_upstreams import AsyncUpstreams, BlockingUpstreams
+from config import (ASYNC_SERVING_CONFIG, FUZZY_MATCH_CONFIG, OCR_POOL_CONFIG, STREAM_SCAN_CONFIG,
+                    SUPPORTED_LANGUAGES, TRANSLATION_ENGINE_CONFIG)
+from ocr_pool import OCRQueueFull
+from stream_scan import FrameEvidence, LatestFrame
+
+logger = logging.getLogger(__name__)
+
+upstreams = AsyncUpstreams(
+    max_connections=ASYNC_SERVING_CONFIG['max_connections'],
+    translate_concurrency=ASYNC_SERVING_CONFIG['translate_concurrency'],
+    tts_concurrency=ASYNC_SERVING_CONFIG['tts_concurrency'],
+    timeout=ASYNC_SERVING_CONFIG['upstream_timeout_seconds'],
+    translate_url=TRANSLATION_ENGINE_CONFIG['url'],
+    chunk_chars=TRANSLATION_ENGINE_CONFIG['chunk_chars'],
+    tts_verify=ASYNC_SERVING_CONFIG['tts_verify_tls']
+)
+flask_app = WSGIMiddleware(scanner.app, workers=ASYNC_SERVING_CONFIG['wsgi_workers'])
+scanner.live_scan = True
+
+
+async def run_frame_ocr(frame):
+    """OCR one live camera frame with the first ``passes_per_frame`` passes of the cascade."""
+    passes = scanner.ocr_pool.passes[:STREAM_SCAN_CONFIG['passes_per_frame']]
+    text, _ = await scanner.ocr_pool.recognize_async(frame, scanner.confident_match, passes)
+    return text
+
+
+# --- Live camera scan -----------------------------------------------------
+
+async def send_json(send, payload):
+    await send({'type': 'websocket.send', 'text': scanner.app.json.dumps(payload)})
+
+
+async def receive_frames(receive, frames):
+    """Put each binary message into ``frames`` until the client disconnects or sends ``{"type": "stop"}``."""
+    while True:
+        message = await receive()
+        if message['type'] == 'websocket.disconnect':
+            break
+        frame = message.get('bytes')
+        if frame is not None:
+            if len(frame) <= STREAM_SCAN_CONFIG['max_frame_bytes']:
+                frames.put(frame)
+        elif (json_body(message.get('text') or '') or {}).get('type') == 'stop':
+            break
+    frames.close()
+
+
+async def scan_stream(scope, receive, send):
+    """WebSocket /api/scan/stream?language=hi: recognize a medicine from live camera frames.
+
+    The client sends JPEG frames as binary messages while the camera runs and
+    gets JSON text messages back: ``progress`` after each frame read, ``busy``
+    when the OCR queue was full, then either ``result`` (``data`` as in
+    /api/scan) or ``timeout``, followed by ``stop``. After ``stop`` the client
+    stops sending and the server closes the socket.
+    """
+    if (await receive())['type'] != 'websocket.connect':
+        return
+    await send({'type': 'websocket.accept'})
+    lang = query_args(scope).get('language', 'en')
+    if lang not in SUPPORTED_LANGUAGES:
+        lang = 'en'
+    frames = LatestFrame()
+    evidence = FrameEvidence(await asyncio.to_thread(scanner.catalogue_store.current), FUZZY_MATCH_CONFIG,
+                             STREAM_SCAN_CONFIG['confidence_threshold'])
+    reader = asyncio.ensure_future(receive_frames(receive, frames))
+    start = time.perf_counter()
+    deadline = start + STREAM_SCAN_CONFIG['max_seconds']
+    outcome = 'closed'
+    try:
+        while True:
+            try:
+                frame = await asyncio.wait_for(frames.take(), deadline - time.perf_counter())
+            except asyncio.TimeoutError:
+                outcome = 'timeout'
+                # Like a photo that matched nothing
+                scanner.record_scan({}, lang, 'stream', False, {'stream_recognition': time.perf_counter() - start})
+                await send_json(send, {"type": "timeout", "message": "No medicine recognized, try a still photo",
+                                       "frames": evidence.frames, "dropped": frames.dropped})
+                break
+            if frame is None:
+                break
+            try:
+                with scanner.metrics.span('ocr'):
+                    text = await run_frame_ocr(frame)
+            except OCRQueueFull:
+                await send_json(send, {"type": "busy", "retryAfter": OCR_POOL_CONFIG['retry_after_seconds']})
+                continue
+            except Exception as e:
+                # A timed-out or undecodable frame; the next one may do
+                logger.warning(f"Skipping stream frame: {type(e).__name__}: {str(e)}")
+                continue
+            if frames.closed:
+                break
+            evidence.add(text)
+            if evidence.decided:
+                # The same matching and speech as /api/scan, in a worker thread
+                info = await asyncio.to_thread(scanner.scan_result, evidence.best_text(), lang)
+                seconds = time.perf_counter() - start
+                scanner.metrics.observe('stream_recognition', seconds)
+                outcome = 'recognized'
+                # No request context on a WebSocket, so pass the stream's own timing
+                scanner.record_scan(info, lang, 'stream', False, {'stream_recognition': seconds})
+                await send_json(send, {"type": "result", "success": True, "message": "Medicine scanned successfully",
+                                       "data": info, "frames": evidence.frames, "dropped": frames.dropped,
+                                       "seconds": round(seconds, 3),
+                                       "timestamp": scanner.datetime.now().isoformat()})
+                break
+            candidate, margin = evidence.leader()
+            await send_json(send, {"type": "progress", "frames": evidence.frames, "candidate": candidate,
+                                   "confidence": round(margin, 3)})
+        if not frames.closed:
+            await send_json(send, {"type": "stop"})
+            await send({'type': 'websocket.close', 'code': 1000})
+    except OSError:
+        # The client went away while a message was being sent
+        pass
+    finally:
+        reader.cancel()
+        scanner.metrics.inc('stream_scans_total', outcome=outcome)
+        scanner.metrics.inc('stream_frames_total', evidence.frames, outcome='read')
+        scanner.metrics.inc('stream_frames_total', frames.dropped, outcome='dropped')
+
+
+# --- ASGI plumbing ----------------------------------------------------------
+
+def query_args(scope):
+    return {key: values[0] for key, values in parse_qs(scope['query_string'].decode('latin-1')).items()}
+
+
+def json_body(body):
+    try:
+        data = json.loads(body)
+    except ValueError:
+        return None
+    return data if isinstance(data, dict) else None
+
+
+async def lifespan(receive, send):
+    while True:
+        message = await receive()
+        if message['type'] == 'lifespan.startup':
+            scanner.upstreams = BlockingUpstreams(upstreams, asyncio.get_running_loop())
+            scanner.warmup.start()
+            await send({'type': 'lifespan.startup.complete'})
+        elif message['type'] == 'lifespan.shutdown':
+            scanner.speech_jobs.shutdown()
+            scanner.upstreams = None
+            await upstreams.aclose()
+            scanner.ocr_pool.shutdown()
+            if scanner.scan_recorder is not None:
+                await asyncio.to_thread(scanner.scan_recorder.close)
+            await send({'type': 'lifespan.shutdown.complete'})
+            return
+
+
+async def application(scope, receive, send):
+    if scope['type'] == 'lifespan':
+        return await lifespan(receive, send)
+    if scope['type'] == 'websocket':
+        if scope['path'] == '/api/scan/stream':
+            return await scan_stream(scope, receive, send)
+        # Closing before accepting makes the server answer the handshake with 403
+        await receive()
+        return await send({'type': 'websocket.close', 'code': 1008})
+    if scope['type'] == 'http':
+        return await flask_app(scope, receive, send)
@@ -0,0 +1,133 @@
+"""Non-blocking Google Translate and gTTS calls for the ASGI server (asgi.py).
+
+Each upstream has its own pooled ``httpx.AsyncClient`` shared by every
+request, and its own semaphore, so a slow TTS backend cannot use up the
+connections translation needs. Both verify TLS certificates; ``gTTS``
+itself skips that for the TTS host (for proxies), which ``tts_verify``
+can mirror for that host only. Translations are chunked like
+``TranslationEngine``'s, with every chunk of a long text sent at once. TTS
+request bodies come from ``gTTS.get_bodies()`` (gTTS is pinned in
+requirements.txt); only the transport is async.
+
+The Flask handlers reach it through BlockingUpstreams: the calls run on the
+server's event loop and the handler's thread only waits for the result.
+"""
+import asyncio
+import base64
+import re
+
+import httpx
+
+from localization import TRANSLATOR_LANG_CODES
+from translation_engine import TRANSLATE_URL, split_text, translated_text
+
+TTS_URL = 'https://translate.google.com/_/TranslateWebserverUi/data/batchexecute'
+TTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+class UpstreamError(Exception):
+    pass
+
+
+class AsyncUpstreams:
+    def __init__(self, max_connections, translate_concurrency, tts_concurrency, timeout,
+                 translate_url=TRANSLATE_URL, chunk_chars=1500, tts_url=TTS_URL, tts_verify=True):
+        self.max_connections = max_connections
+        self.timeout = timeout
+        self.translate_url = translate_url
+        self.tts_url = tts_url
+        self.chunk_chars = chunk_chars
+        self.limits = {'translate': translate_concurrency, 'tts': tts_concurrency}
+        self.verify = {'translate': True, 'tts': tts_verify}
+        self._clients = None
+        self._semaphores = None
+
+    def _ensure_client(self, upstream):
+        # Created inside the running event loop on first use
+        if self._clients is None:
+            self._clients = {
+                name: httpx.AsyncClient(
+                    timeout=self.timeout,
+                    verify=self.verify[name],
+                    limits=httpx.Limits(max_connections=self.max_connections,
+                                        max_keepalive_connections=self.max_connections)
+                )
+                for name in self.limits
+            }
+            self._semaphores = {name: asyncio.Semaphore(limit) for name, limit in self.limits.items()}
+        return self._clients[upstream]
+
+    async def translate(self, text, source, target):
+        pairs = split_text(text, self.chunk_chars)
+        parts = await asyncio.gather(*(self._translate_chunk(chunk, source, target) for chunk, _ in pairs))
+        return ''.join(part + separator for part, (_, separator) in zip(parts, pairs))
+
+    async def _translate_chunk(self, chunk, source, target):
+        if not chunk.strip():
+            return chunk
+        client = self._ensure_client('translate')
+        async with self._semaphores['translate']:
+            response = await client.get(self.translate_url, params={'tl': target, 'sl': source, 'q': chunk})
+        if response.status_code != 200:
+            raise UpstreamError(f"Google Translate returned HTTP {response.status_code}")
+        return translated_text(response.text, chunk)
+
+    async def synthesize(self, text, lang, slow=False):
+        """Return the mp3 bytes gTTS would have written for ``text``."""
+        return b''.join([chunk async for chunk in self.stream_speech(text, lang, slow)])
+
+    async def stream_speech(self, text, lang, slow=False):
+        """Yield mp3 bytes for each part of ``text`` as the TTS endpoint returns it."""
+        from gtts import gTTS
+        client = self._ensure_client('tts')
+        # gTTS tokenizes the text and packages each part; only sending is done here
+        bodies = gTTS(text=text, lang=lang, slow=slow).get_bodies()
+        async with self._semaphores['tts']:
+            for body in bodies:
+                response = await client.post(self.tts_url, content=body, headers=gTTS.GOOGLE_TTS_HEADERS)
+                if response.status_code != 200:
+                    raise UpstreamError(f"gTTS endpoint returned HTTP {response.status_code}")
+                for line in response.text.splitlines():
+                    if 'jQ1olc' in line:
+                        match = TTS_AUDIO.search(line)
+                        if not match:
+                            raise UpstreamError("gTTS response had no audio")
+                        yield base64.b64decode(match.group(1))
+
+    async def aclose(self):
+        if self._clients is not None:
+            for client in self._clients.values():
+                await client.aclose()
+            self._clients = None
+
+
+class BlockingUpstreams:
+    """Synchronous calls into an AsyncUpstreams running on ``loop``, for worker threads.
+
+    Mirrors the calls app.py makes to ``TranslationEngine`` and ``gTTS``.
+    Must not be called from the loop's own thread.
+    """
+
+    def __init__(self, upstreams, loop):
+        self.upstreams = upstreams
+        self.loop = loop
+
+    def _run(self, coroutine):
+        return asyncio.run_coroutine_threadsafe(coroutine, self.loop).result()
+
+    def translate(self, text, source='auto', target='en'):
+        return self._run(self.upstreams.translate(text, source, TRANSLATOR_LANG_CODES.get(target, target)))
+
+    def synthesize(self, text, lang, slow=False):
+        return self._run(self.upstreams.synthesize(text, lang, slow))
+
+    def stream_speech(self, text, lang, slow=False):
+        chunks = self.upstreams.stream_speech(text, lang, slow)
+        try:
+            while True:
+                try:
+                    yield self._run(chunks.__anext__())
+                except StopAsyncIteration:
+                    return
+        finally:
+            self._run(chunks.aclose())
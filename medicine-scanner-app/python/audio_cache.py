@@ -0,0 +1,125 @@
+import hashlib
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+
+def audio_cache_key(text, lang, slow):
+    return hashlib.sha256(f"{lang}\0{int(slow)}\0{text}".encode('utf-8')).hexdigest()
+
+
+class AudioCache:
+    """Content-addressed mp3 store bounded by total bytes, evicting least recently used.
+
+    Files are named ``<sha256>.mp3`` inside ``directory``. Recency is kept in
+    file mtimes, so the LRU order survives a restart.
+    """
+
+    def __init__(self, directory, max_bytes):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self._total_bytes = 0
+        os.makedirs(directory, exist_ok=True)
+        self._load()
+
+    def _load(self):
+        files = []
+        for filename in os.listdir(self.directory):
+            path = os.path.join(self.directory, filename)
+            if filename.endswith('.mp3.tmp'):
+                os.remove(path)
+            elif filename.endswith('.mp3'):
+                stat = os.stat(path)
+                files.append((stat.st_mtime, filename, stat.st_size))
+        for _, filename, size in sorted(files):
+            self._entries[filename] = size
+            self._total_bytes += size
+        self._evict()
+
+    def path_for(self, filename):
+        return os.path.join(self.directory, filename)
+
+    def get(self, key):
+        filename = f"{key}.mp3"
+        with self._lock:
+            if filename not in self._entries:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return self.touch(key)
+
+    def touch(self, key):
+        """Mark ``key`` as just used and return its path, or None when it isn't cached.
+
+        For serving a file already counted by ``get``, so it doesn't count as a hit again.
+        """
+        filename = f"{key}.mp3"
+        with self._lock:
+            if filename not in self._entries:
+                return None
+            self._entries.move_to_end(filename)
+        path = self.path_for(filename)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            with self._lock:
+                self._forget(filename)
+            return None
+        return path
+
+    def put(self, key, write):
+        """Store the output of ``write(path)`` under ``key`` and return its final path."""
+        filename = f"{key}.mp3"
+        fd, tmp_path = tempfile.mkstemp(suffix='.mp3.tmp', dir=self.directory)
+        os.close(fd)
+        try:
+            write(tmp_path)
+            size = os.path.getsize(tmp_path)
+            os.replace(tmp_path, self.path_for(filename))
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+
+        with self._lock:
+            self._forget(filename)
+            self._entries[filename] = size
+            self._total_bytes += size
+            self._evict(keep=filename)
+        return self.path_for(filename)
+
+    def _forget(self, filename):
+        size = self._entries.pop(filename, None)
+        if size is not None:
+            self._total_bytes -= size
+
+    def _evict(self, keep=None):
+        while self._total_bytes > self.max_bytes and self._entries:
+            filename = next(iter(self._entries))
+            if filename == keep:
+                break
+            self._forget(filename)
+            self.evictions += 1
+            try:
+                os.remove(self.path_for(filename))
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': self.hits / lookups if lookups else 0,
+                'evictions': self.evictions,
+                'entries': len(self._entries),
+                'bytes': self._total_bytes,
+                'maxBytes': self.max_bytes
+            }
@@ -0,0 +1,99 @@
+"""Images/second through /api/scan/batch as the OCR pool grows.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_batch_scan
+    python -m benchmarks.bench_batch_scan --batch-size 16 --workers 1,4
+
+Each round posts the sample photos (repeated to ``--batch-size``) in one
+multipart request, with OCR pools of 1, 2, 4, ... workers up to the CPU
+count, and compares against the same images sent one by one to
+/api/scan/upload. Both go through the app's own ``run_ocr`` and
+``run_ocr_batch``, so images escalate through the OCR cascade as in
+production. Without Tesseract installed the workers run only the real
+decoding, preprocessing and rotation; the stand-in reads no text, so every
+image runs the whole cascade.
+"""
+import argparse
+import io
+import logging
+import os
+import time
+
+import app
+from benchmarks.samples import sample_paths, tesseract_available
+from benchmarks.stubs import PreprocessOnlyPool, SlowTTS, StubTranslationEngine
+from ocr_pool import OCRPool
+
+BATCH_SIZE = 32
+
+
+def worker_counts():
+    cpus = os.cpu_count() or 1
+    counts, workers = [1], 2
+    while workers < cpus:
+        counts.append(workers)
+        workers *= 2
+    return counts + [cpus] if cpus > 1 else counts
+
+
+def use_pool(workers, pool_class, queue_depth):
+    """Replace the app's OCR pool with a started one of ``workers`` processes."""
+    pool = pool_class(workers, queue_depth, 60, app.TESSERACT_CONFIG['lang'], app.TESSERACT_CONFIG['config'],
+                      app.PREPROCESS_CONFIG, app.pytesseract.pytesseract.tesseract_cmd, app.ocr_pool.passes)
+    # Start every worker before timing so process spawn isn't counted
+    pool.warm()
+    app.ocr_pool = pool
+    return pool
+
+
+def post_batch(client, images):
+    files = [(io.BytesIO(image), name) for name, image in images]
+    response = client.post('/api/scan/batch', data={'images': files, 'speech': 'false'})
+    assert response.status_code == 200, response.status_code
+    return response.get_json()['results']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Images/second through /api/scan/batch as the OCR pool grows")
+    parser.add_argument('--batch-size', type=int, default=BATCH_SIZE, help=f"Images per batch, at most BATCH_SCAN_CONFIG['max_images'] (default {BATCH_SIZE})")
+    parser.add_argument('--workers', default=','.join(map(str, worker_counts())),
+                        help="OCR pool sizes to try (default: 1, 2, 4, ... up to the CPU count)")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    app.OCR_CACHE_CONFIG['enabled'] = False  # Every request here must reach OCR
+    app.gTTS = SlowTTS
+    app.translation_engine = StubTranslationEngine()
+    pool_class = OCRPool if tesseract_available() else PreprocessOnlyPool
+    samples = [(os.path.basename(path), open(path, 'rb').read()) for path, _ in sample_paths()]
+    images = [samples[i % len(samples)] for i in range(args.batch_size)]
+    client = app.app.test_client()
+
+    print(f"{args.batch_size} images per batch, {os.cpu_count()} CPUs, "
+          f"{'Tesseract' if pool_class is OCRPool else 'preprocessing only (no Tesseract)'}, "
+          f"up to {len(app.ocr_pool.passes)} OCR passes per image")
+
+    pool = use_pool(1, pool_class, args.batch_size)
+    start = time.perf_counter()
+    for name, image in images:
+        response = client.post('/api/scan/upload', data={'image': (io.BytesIO(image), name)})
+        assert response.status_code == 200, response.status_code
+    serial = args.batch_size / (time.perf_counter() - start)
+    pool.shutdown()
+    print(f"{'one by one':<12} {serial:7.1f} images/s  {pool.stats()['averagePasses']:.2f} passes/image")
+
+    for workers in (int(value) for value in args.workers.split(',')):
+        pool = use_pool(workers, pool_class, args.batch_size)
+        start = time.perf_counter()
+        results = post_batch(client, images)
+        rate = args.batch_size / (time.perf_counter() - start)
+        pool.shutdown()
+        failed = sum(not result['success'] for result in results)
+        print(f"{f'{workers} workers':<12} {rate:7.1f} images/s  {pool.stats()['averagePasses']:.2f} passes/image  "
+              f"x{rate / serial:4.1f}  ({failed} failed)")
+
+    app.speech_jobs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,42 @@
+"""Time to compile a large formulary into medicines.db.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_build_db [entries]
+"""
+import argparse
+import os
+import tempfile
+import time
+
+from benchmarks.bench_matcher import synthetic_database
+from medicines_db import build_medicines_db, load_medicine_database
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time compiling a synthetic formulary into medicines.db")
+    parser.add_argument('entries', nargs='?', type=int, default=100000, help="Formulary size (default 100000)")
+    size = parser.parse_args().entries
+    database = synthetic_database(size)
+    for med in database.values():
+        med.setdefault('usage', f"For {med['name'].lower()} related conditions")
+        med.setdefault('warnings', 'Take as directed')
+        med.setdefault('dosage', '10mg once daily')
+        med.setdefault('sideEffects', 'Nausea, headache')
+
+    output = os.path.join(tempfile.mkdtemp(), 'medicines.db')
+    start = time.perf_counter()
+    version = build_medicines_db(database, output)
+    build_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    loaded = load_medicine_database(output)
+    load_s = time.perf_counter() - start
+
+    print(f"{size} entries: build {build_s:.2f}s, load {load_s:.2f}s, "
+          f"{os.path.getsize(output) / 1e6:.1f} MB, version {version}")
+    assert len(loaded) == len(database)
+
+
+if __name__ == '__main__':
+    main()
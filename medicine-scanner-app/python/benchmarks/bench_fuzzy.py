@@ -0,0 +1,110 @@
+"""Latency and recall of the fuzzy OCR-token index.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_fuzzy
+    python -m benchmarks.bench_fuzzy --sizes 1000 --no-samples
+
+Recall is measured on synthetic OCR misreads of every catalogue name and,
+when Tesseract is installed, on the real OCR output of the sample photos.
+Lookups run with the configured ``min_similarity``, as ``best_match`` calls
+them for scans, and with none ("any"): every label within ``max_distance``.
+The build is timed too; it runs once per catalogue load, in the warmup or a
+background reload, never on a scan.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.bench_matcher import synthetic_database
+from benchmarks.samples import sample_paths, tesseract_available
+from config import FUZZY_MATCH_CONFIG, TESSERACT_CONFIG
+from fuzzy_matcher import FuzzyMedicineIndex
+from medicine_database import MEDICINE_DATABASE
+from medicine_matcher import MedicineMatcher
+
+OCR_SUBSTITUTIONS = {'l': '1', 'i': '1', 'o': '0', 's': '5', 'b': '8'}
+
+
+def misread(word, rng):
+    chars = list(word.lower())
+    i = rng.randrange(len(chars))
+    roll = rng.random()
+    if roll < 0.4 and chars[i] in OCR_SUBSTITUTIONS:
+        chars[i] = OCR_SUBSTITUTIONS[chars[i]]
+    elif roll < 0.7:
+        del chars[i]
+    elif roll < 0.85 and i + 1 < len(chars):
+        chars[i], chars[i + 1] = chars[i + 1], chars[i]
+    else:
+        chars[i] = rng.choice('abcdefghijklmnopqrstuvwxyz')
+    return ''.join(chars)
+
+
+def build_index(database):
+    return FuzzyMedicineIndex(
+        database,
+        max_distance=FUZZY_MATCH_CONFIG['max_distance'],
+        prefix_length=FUZZY_MATCH_CONFIG['prefix_length'],
+        min_token_length=FUZZY_MATCH_CONFIG['min_token_length']
+    )
+
+
+def synthetic_recall(index, database, rng, min_similarity):
+    names = [med['name'] for med in database.values() if med.get('name')]
+    hits, latencies = 0, []
+    for name in names:
+        token = misread(name, rng)
+        start = time.perf_counter()
+        results = index.lookup(token, FUZZY_MATCH_CONFIG['top_k'], min_similarity)
+        latencies.append(time.perf_counter() - start)
+        if any(med.get('name') == name for _, _, med, _ in results):
+            hits += 1
+    latencies.sort()
+    return hits / len(names), latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+def sample_recall(index):
+    import pytesseract
+    from PIL import Image
+
+    matcher = MedicineMatcher(MEDICINE_DATABASE)
+    for path, expected in sample_paths():
+        text = pytesseract.image_to_string(Image.open(path), lang=TESSERACT_CONFIG['lang'],
+                                           config=TESSERACT_CONFIG['config']).lower()
+        exact, _, _ = matcher.best_match(text)
+        start = time.perf_counter()
+        fuzzy, _, names = index.best_match(text, FUZZY_MATCH_CONFIG['min_similarity'], FUZZY_MATCH_CONFIG['top_k'])
+        elapsed_us = (time.perf_counter() - start) * 1e6
+        print(f"  {expected:<14} exact={exact['name'] if exact else '-':<14} "
+              f"fuzzy={fuzzy['name'] if fuzzy else '-':<14} {elapsed_us:8.1f}us {names}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Latency and recall of the fuzzy OCR-token index")
+    parser.add_argument('--sizes', default=f"{len(MEDICINE_DATABASE)},10000,100000",
+                        help="Catalogue sizes to build (default: the built-in catalogue, 10000, 100000)")
+    parser.add_argument('--no-samples', action='store_true', help="Skip OCR of the sample photos")
+    args = parser.parse_args()
+    print(f"{'entries':>8} {'build ms':>9} {'min sim':>8} {'recall':>7} {'p50 us':>8} {'p99 us':>8}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        database = synthetic_database(size)
+        start = time.perf_counter()
+        index = build_index(database)
+        build_ms = (time.perf_counter() - start) * 1e3
+        for min_similarity in (FUZZY_MATCH_CONFIG['min_similarity'], 0.0):
+            # Same misreads for both
+            recall, p50, p99 = synthetic_recall(index, database, random.Random(3), min_similarity)
+            print(f"{size:>8} {build_ms:>9.1f} {min_similarity or 'any':>8} {recall:>7.1%} {p50:>8.1f} {p99:>8.1f}")
+
+    if args.no_samples:
+        return
+    if tesseract_available():
+        print("Sample photos (exact vs fuzzy fallback):")
+        sample_recall(build_index(MEDICINE_DATABASE))
+    else:
+        print("Tesseract not installed; skipping sample-photo recall.")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,271 @@
+"""Concurrent load test of the HTTP API with per-endpoint latency percentiles.
+
+Run from the ``python/`` directory. Against a running deployment:
+
+    python -m benchmarks.bench_load --url http://host:5000 --medicine-url http://host:5001 \\
+        --concurrency 64 --duration 60
+
+Without ``--url`` a local ``benchmarks.stub_server`` is started in a
+subprocess, so Google Translate and gTTS are replaced by fixed-delay stand-ins.
+
+Requests mix ``/api/scan`` (replaying the sample photos), ``/api/medicine/<name>``,
+``/api/translate`` and ``/api/speech`` by ``--mix`` weights. By default each of
+``--concurrency`` clients sends its next request as soon as the last one
+returns. With ``--rate`` requests arrive as a Poisson process at that many
+per second instead. Up to ``--concurrency`` of them are in flight, and latency
+is measured from the scheduled arrival, so time spent waiting for a free
+client counts too. Anything slower than ``--timeout`` (the frontend's 30s
+axios timeout) is an error.
+
+``--cold --share N`` sends each unique translate/speech text N times in a
+row, like several phones scanning a new medicine at once. The report then
+shows how many Google calls the server made and how many requests joined
+one already in flight (``/api/cache/stats`` before and after the run).
+"""
+import argparse
+import asyncio
+import base64
+import json
+import os
+import random
+import subprocess
+import sys
+import time
+from collections import defaultdict
+
+import httpx
+
+from benchmarks.samples import sample_paths
+from config import SUPPORTED_LANGUAGES
+from medicine_database import MEDICINE_DATABASE
+
+DEFAULT_MIX = 'scan=4,medicine=3,translate=2,speech=1'
+
+
+def percentile(ordered, fraction):
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))] if ordered else 0.0
+
+
+class Workload:
+    """Builds the next request for each endpoint from the sample photos and the catalogue."""
+
+    def __init__(self, url, medicine_url, cold, seed=1, share=1):
+        self.url = url.rstrip('/')
+        self.medicine_url = medicine_url.rstrip('/')
+        self.cold = cold
+        self.share = share
+        self.shared = {}
+        self.rng = random.Random(seed)
+        self.counter = 0
+        self.images = []
+        for path, _ in sample_paths():
+            with open(path, 'rb') as f:
+                mime = 'image/webp' if path.endswith('.webp') else 'image/jpeg'
+                self.images.append(f"data:{mime};base64," + base64.b64encode(f.read()).decode())
+        self.medicines = [med for med in MEDICINE_DATABASE.values() if med.get('name')]
+        self.languages = list(SUPPORTED_LANGUAGES)
+
+    def text(self, med):
+        self.counter += 1
+        text = f"Medicine: {med['name']} Usage: {med.get('usage', '')} Warnings: {med.get('warnings', '')}"
+        # --cold makes every text unique so translation and audio caches never hit
+        return f"{text} #{self.counter}" if self.cold else text
+
+    def shared_text(self, endpoint, med, languages):
+        """Return ``(text, language)``, repeating each pair for ``share`` requests to ``endpoint``."""
+        remaining, text, lang = self.shared.get(endpoint, (0, None, None))
+        if remaining == 0:
+            remaining, text, lang = self.share, self.text(med), self.rng.choice(languages)
+        self.shared[endpoint] = (remaining - 1, text, lang)
+        return text, lang
+
+    def request(self, endpoint):
+        med = self.rng.choice(self.medicines)
+        lang = self.rng.choice(self.languages)
+        if endpoint == 'scan':
+            image = self.images[self.counter % len(self.images)]
+            self.counter += 1
+            return 'POST', f"{self.url}/api/scan", {'imageData': image, 'language': lang}
+        if endpoint == 'medicine':
+            return 'GET', f"{self.medicine_url}/api/medicine/{med['name']}?lang={self.rng.choice(['en', 'hi'])}", None
+        if endpoint == 'translate':
+            text, lang = self.shared_text(endpoint, med, self.languages)
+            return 'POST', f"{self.url}/api/translate", {'text': text, 'language': lang}
+        text, lang = self.shared_text(endpoint, med, ['en', 'hi'])
+        return 'POST', f"{self.url}/api/speech", {'text': text, 'language': lang}
+
+
+class Results:
+    def __init__(self):
+        self.latencies = defaultdict(list)
+        self.errors = defaultdict(lambda: defaultdict(int))
+
+    def record(self, endpoint, seconds, error=None):
+        self.latencies[endpoint].append(seconds)
+        if error is not None:
+            self.errors[endpoint][error] += 1
+
+    def report(self, elapsed):
+        report = {}
+        for endpoint in sorted(self.latencies):
+            ordered = sorted(self.latencies[endpoint])
+            errors = sum(self.errors[endpoint].values())
+            report[endpoint] = {
+                'requests': len(ordered),
+                'throughput_rps': round(len(ordered) / elapsed, 2),
+                'p50_ms': round(percentile(ordered, 0.50) * 1e3, 1),
+                'p95_ms': round(percentile(ordered, 0.95) * 1e3, 1),
+                'p99_ms': round(percentile(ordered, 0.99) * 1e3, 1),
+                'max_ms': round(ordered[-1] * 1e3, 1),
+                'error_rate': round(errors / len(ordered), 4),
+                'errors': dict(self.errors[endpoint])
+            }
+        return report
+
+
+async def send(client, workload, endpoint, results, scheduled):
+    method, url, body = workload.request(endpoint)
+    try:
+        response = await client.request(method, url, json=body)
+        await response.aread()
+        error = None if response.status_code < 400 else f"HTTP {response.status_code}"
+    except httpx.TimeoutException:
+        error = 'timeout'
+    except httpx.HTTPError as e:
+        error = type(e).__name__
+    results.record(endpoint, time.perf_counter() - scheduled, error)
+
+
+async def closed_loop(client, workload, choose, results, concurrency, deadline):
+    async def user():
+        while time.perf_counter() < deadline:
+            await send(client, workload, choose(), results, time.perf_counter())
+    await asyncio.gather(*(user() for _ in range(concurrency)))
+
+
+async def open_loop(client, workload, choose, results, concurrency, rate, deadline, rng):
+    slots = asyncio.Semaphore(concurrency)
+    tasks = []
+
+    async def arrival(endpoint, scheduled):
+        async with slots:
+            await send(client, workload, endpoint, results, scheduled)
+
+    next_arrival = time.perf_counter()
+    while next_arrival < deadline:
+        delay = next_arrival - time.perf_counter()
+        if delay > 0:
+            await asyncio.sleep(delay)
+        tasks.append(asyncio.ensure_future(arrival(choose(), next_arrival)))
+        next_arrival += rng.expovariate(rate)
+    await asyncio.gather(*tasks)
+
+
+async def run(args, url, medicine_url):
+    weights = dict((name, float(weight)) for name, weight in (item.split('=') for item in args.mix.split(',')))
+    rng = random.Random(args.seed)
+    endpoints, endpoint_weights = list(weights), list(weights.values())
+
+    def choose():
+        return rng.choices(endpoints, endpoint_weights)[0]
+
+    workload = Workload(url, medicine_url, args.cold, args.seed, args.share)
+    results = Results()
+    limits = httpx.Limits(max_connections=args.concurrency, max_keepalive_connections=args.concurrency)
+    async with httpx.AsyncClient(timeout=args.timeout, limits=limits) as client:
+        before = await coalescing_stats(client, url)
+        start = time.perf_counter()
+        deadline = start + args.duration
+        if args.rate:
+            await open_loop(client, workload, choose, results, args.concurrency, args.rate, deadline, rng)
+        else:
+            await closed_loop(client, workload, choose, results, args.concurrency, deadline)
+        elapsed = time.perf_counter() - start
+        after = await coalescing_stats(client, url)
+    report = results.report(elapsed)
+    if before is not None and after is not None:
+        report['coalescing'] = {kind: {field: after[kind][field] - before[kind][field] for field in ('calls', 'coalesced')}
+                                for kind in after}
+    return report, elapsed
+
+
+async def coalescing_stats(client, url):
+    """The server's upstream call counters, or None if it doesn't report them."""
+    try:
+        response = await client.get(f"{url.rstrip('/')}/api/cache/stats")
+        return response.json().get('coalescing')
+    except (httpx.HTTPError, ValueError):
+        return None
+
+
+def start_stub_server(args):
+    command = [sys.executable, '-m', 'benchmarks.stub_server', '--port', str(args.port),
+               '--catalogue-port', str(args.port + 1), '--translate-port', str(args.port + 2)]
+    server = subprocess.Popen(command, cwd=os.path.join(os.path.dirname(__file__), '..'),
+                              stdout=subprocess.PIPE, stderr=subprocess.DEVNULL, text=True)
+    # The server prints one line once both APIs are listening
+    if not server.stdout.readline():
+        raise RuntimeError("stub server failed to start")
+    return server, f"http://127.0.0.1:{args.port}", f"http://127.0.0.1:{args.port + 1}"
+
+
+def print_report(report, elapsed, args):
+    mode = f"{args.rate}/s Poisson arrivals" if args.rate else "closed loop"
+    print(f"{elapsed:.1f}s, concurrency {args.concurrency}, {mode}")
+    print(f"{'endpoint':<10} {'reqs':>6} {'req/s':>7} {'p50':>8} {'p95':>8} {'p99':>8} {'max':>8} {'errors':>7}")
+    coalescing = report.pop('coalescing', None)
+    for endpoint, numbers in report.items():
+        print(f"{endpoint:<10} {numbers['requests']:>6} {numbers['throughput_rps']:>7.1f} "
+              f"{numbers['p50_ms']:>6.0f}ms {numbers['p95_ms']:>6.0f}ms {numbers['p99_ms']:>6.0f}ms "
+              f"{numbers['max_ms']:>6.0f}ms {numbers['error_rate']:>6.1%}")
+        for error, count in numbers['errors'].items():
+            print(f"{'':<10} {count:>6} x {error}")
+    if coalescing:
+        for kind, counts in coalescing.items():
+            total = counts['calls'] + counts['coalesced']
+            saved = counts['coalesced'] / total if total else 0.0
+            print(f"{kind:<11} {counts['calls']} upstream calls, {counts['coalesced']} requests joined one "
+                  f"in flight ({saved:.0%} of upstream calls saved)")
+    if coalescing is not None:
+        report['coalescing'] = coalescing
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the Mediscan HTTP API")
+    parser.add_argument('--url', help="Scan API base URL (default: start benchmarks.stub_server)")
+    parser.add_argument('--medicine-url', help="Base URL of the root app.py serving /api/medicine (default: --url)")
+    parser.add_argument('--port', type=int, default=5050, help="Port for the local stub server")
+    parser.add_argument('-c', '--concurrency', type=int, default=16, help="Clients / maximum requests in flight")
+    parser.add_argument('-r', '--rate', type=float, help="Open-loop arrival rate in requests/second")
+    parser.add_argument('-d', '--duration', type=float, default=30, help="Seconds to generate load")
+    parser.add_argument('--mix', default=DEFAULT_MIX, help=f"Endpoint weights (default {DEFAULT_MIX})")
+    parser.add_argument('--timeout', type=float, default=30, help="Per-request timeout, as in the frontend")
+    parser.add_argument('--cold', action='store_true', help="Make translate/speech texts unique to defeat caches")
+    parser.add_argument('--share', type=int, default=1,
+                        help="With --cold, send each unique text this many times in a row")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--json', help="Also write the report to this file")
+    args = parser.parse_args()
+
+    server = None
+    if args.url:
+        url, medicine_url = args.url, args.medicine_url or args.url
+    else:
+        server, url, medicine_url = start_stub_server(args)
+    try:
+        report, elapsed = asyncio.run(run(args, url, medicine_url))
+    finally:
+        if server is not None:
+            server.terminate()
+            server.wait()
+
+    print_report(report, elapsed, args)
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'duration_s': round(elapsed, 2), 'concurrency': args.concurrency, 'rate': args.rate,
+                       'endpoints': {name: numbers for name, numbers in report.items() if name != 'coalescing'},
+                       'coalescing': report.get('coalescing')}, f, indent=2)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,75 @@
+"""Per-scan latency of the old linear matcher vs. the Aho-Corasick index.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_matcher
+    python -m benchmarks.bench_matcher --sizes 1000,10000 --scans 50
+"""
+import argparse
+import random
+import string
+import time
+
+from medicine_database import MEDICINE_DATABASE
+from medicine_matcher import MedicineMatcher
+
+SIZES = [30, 1000, 10000, 100000]
+SCANS = 200
+OCR_TEXT = (
+    "DOLO-650 Paracetamol Tablets IP 650 mg Each uncoated tablet contains "
+    "Paracetamol IP 650mg Dosage: as directed by the physician. Store below 30C. "
+    "Mfd by Micro Labs Ltd. Batch No. DOBS3175 Exp 12/2027"
+).lower()
+
+
+def synthetic_database(size, seed=7):
+    rng = random.Random(seed)
+    database = dict(MEDICINE_DATABASE)
+    while len(database) < size:
+        name = ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(6, 14)))
+        aliases = [''.join(rng.choices(string.ascii_lowercase, k=rng.randint(4, 10))) for _ in range(3)]
+        database[name] = {'name': name.title(), 'commonNames': aliases}
+    return database
+
+
+def linear_best_match(database, lower_text):
+    best_match, best_score, matched_names = None, 0, []
+    for med in database.values():
+        labels = ([med['name']] if med.get('name') else []) + [a for a in med.get('commonNames', []) if a]
+        for label in labels:
+            if label.lower() in lower_text:
+                score = len(label) / len(lower_text)
+                if score > best_score:
+                    best_match, best_score = med, score
+                    matched_names.append(label)
+    return best_match, best_score, matched_names
+
+
+def time_per_scan(fn, scans):
+    start = time.perf_counter()
+    for _ in range(scans):
+        fn()
+    return (time.perf_counter() - start) / scans * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Per-scan latency of the linear matcher vs. the Aho-Corasick index")
+    parser.add_argument('--sizes', default=','.join(map(str, SIZES)), help="Catalogue sizes to build")
+    parser.add_argument('--scans', type=int, default=SCANS, help=f"Timed scans per size (default {SCANS})")
+    args = parser.parse_args()
+    print(f"{'entries':>8} {'build ms':>9} {'linear us/scan':>15} {'automaton us/scan':>18}")
+    for size in (int(value) for value in args.sizes.split(',')):
+        database = synthetic_database(size)
+        start = time.perf_counter()
+        matcher = MedicineMatcher(database)
+        build_ms = (time.perf_counter() - start) * 1e3
+
+        assert matcher.best_match(OCR_TEXT) == linear_best_match(database, OCR_TEXT)
+        linear_scans = max(1, args.scans * 30 // size)
+        linear_us = time_per_scan(lambda: linear_best_match(database, OCR_TEXT), linear_scans)
+        automaton_us = time_per_scan(lambda: matcher.best_match(OCR_TEXT), args.scans)
+        print(f"{size:>8} {build_ms:>9.1f} {linear_us:>15.1f} {automaton_us:>18.1f}")
+
+
+if __name__ == '__main__':
+    main()
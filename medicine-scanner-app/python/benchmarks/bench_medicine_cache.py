@@ -0,0 +1,106 @@
+"""Repeat lookups on ``/api/medicine/<name>`` with and without the response cache.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_medicine_cache [rows]
+
+Each simulated user opens ``VIEWS`` medicines (popular ones more often) and
+toggles the language ``TOGGLES`` times on each, as ``fetchMedicineInfo``
+does. "previous" has the server cache off and a client without ETags, like
+the app before. "cache" has the server LRU on, and the client sends back the
+ETag it holds for each URL as ``If-None-Match``. That is what a browser does
+once ``max-age`` has run out, so it is the worst case; inside ``max-age`` the
+browser sends nothing. Requests go through the Flask test client. After the
+first pass the catalogue is rebuilt with ``os.replace`` to check that nothing
+stale is served.
+"""
+import argparse
+import logging
+import os
+import random
+import sqlite3
+import tempfile
+import time
+
+from benchmarks.bench_medicine_lookup import build_catalogue, load_root_app
+
+USERS = 200
+VIEWS = 5
+TOGGLES = 3
+
+
+def workload(names, seed=3):
+    rng = random.Random(seed)
+    # Zipf-like: a few medicines make up most lookups
+    weights = [1 / (rank + 1) for rank in range(len(names))]
+    urls = []
+    for _ in range(USERS):
+        for name, _ in rng.choices(names, weights, k=VIEWS):
+            for toggle in range(TOGGLES + 1):
+                urls.append(f"/api/medicine/{name}?lang={'hi' if toggle % 2 else 'en'}")
+    return urls
+
+
+def run(app, urls, use_etags):
+    client = app.app.test_client()
+    queries = [0]
+    find_medicine = app.find_medicine
+
+    def counted(*args):
+        queries[0] += 1
+        return find_medicine(*args)
+    app.find_medicine = counted
+    etags, body_bytes, statuses = {}, 0, {}
+    start = time.perf_counter()
+    try:
+        for url in urls:
+            headers = {'If-None-Match': etags[url]} if use_etags and url in etags else {}
+            response = client.get(url, headers=headers)
+            body_bytes += len(response.data)
+            statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+            if response.headers.get('ETag'):
+                etags[url] = response.headers['ETag']
+    finally:
+        app.find_medicine = find_medicine
+    return time.perf_counter() - start, queries[0], body_bytes, statuses
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Repeat /api/medicine lookups with and without the response cache")
+    parser.add_argument('rows', nargs='?', type=int, default=50000, help="Catalogue rows (default 50000)")
+    rows = parser.parse_args().rows
+    path = os.path.join(tempfile.mkdtemp(), 'medicines.db')
+    names = build_catalogue(path, rows)
+    os.environ['MEDICINES_DB_CHECK_SECONDS'] = '0'
+    app = load_root_app(path)
+    logging.disable(logging.WARNING)
+    urls = workload(names[:2000])
+    client = app.app.test_client()
+
+    size = app.medicine_cache.size
+    print(f"{rows} rows, {len(urls)} requests from {USERS} users")
+    print(f"{'server':<9} {'requests':>8} {'queries':>8} {'body KB':>8} {'304s':>6} {'ms':>7}")
+    for label, cache_size, use_etags in (('previous', 0, False), ('cache', size, True)):
+        app.medicine_cache.size = cache_size
+        app.medicine_cache.clear()
+        seconds, queries, body_bytes, statuses = run(app, urls, use_etags)
+        print(f"{label:<9} {len(urls):>8} {queries:>8} {body_bytes / 1024:>8.1f} "
+              f"{statuses.get(304, 0):>6} {seconds * 1e3:>7.0f}")
+
+    # Rebuild with a changed first medicine and swap the file in, as medicines_db does
+    first = names[0][0]
+    response = client.get(f"/api/medicine/{first}")
+    before, etag = response.get_json()['usage'], response.headers['ETag']
+    rebuilt = path + '.new'
+    build_catalogue(rebuilt, rows)
+    conn = sqlite3.connect(rebuilt)
+    conn.execute("UPDATE medicines SET usage = 'rebuilt' WHERE name = ?", (first,))
+    conn.commit()
+    conn.close()
+    os.replace(rebuilt, path)
+    response = client.get(f"/api/medicine/{first}", headers={'If-None-Match': etag})
+    print(f"after rebuild: usage {before!r} -> {response.get_json()['usage']!r}, status {response.status_code}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,137 @@
+"""Old vs. new query path behind ``/api/medicine/<name>`` in the root app.py.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_medicine_lookup [rows]
+
+The old path opens a connection, introspects the schema and runs a
+``LOWER(name) LIKE '%term%'`` scan per request; the new path borrows a pooled
+read-only connection, reuses the cached schema and queries the trigram FTS5
+index built with the catalogue.
+"""
+import argparse
+import importlib.util
+import json
+import logging
+import os
+import random
+import sqlite3
+import string
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+ROOT_APP = os.path.join(os.path.dirname(__file__), '..', '..', 'app.py')
+LOOKUPS = 300
+THREADS = 8
+
+
+def build_catalogue(path, rows, seed=11):
+    rng = random.Random(seed)
+    conn = sqlite3.connect(path)
+    conn.execute("""
+    CREATE TABLE medicines (
+        name TEXT, name_hi TEXT, usage TEXT, usage_hi TEXT, warnings TEXT, warnings_hi TEXT,
+        dosage TEXT, dosage_hi TEXT, sideEffects TEXT, sideEffects_hi TEXT,
+        commonNames TEXT, commonNames_hi TEXT
+    )""")
+    names = []
+
+    def word(low, high):
+        return ''.join(rng.choices(string.ascii_lowercase, k=rng.randint(low, high)))
+
+    def generate():
+        for _ in range(rows):
+            name = word(7, 14).title()
+            aliases = [word(4, 9) for _ in range(3)]
+            names.append((name, aliases))
+            yield (name, None, 'For ' + word(5, 10), None, 'Take with ' + word(4, 8), None,
+                   '10mg daily', None, word(5, 10), None, json.dumps(aliases), None)
+
+    conn.executemany("INSERT INTO medicines VALUES (?,?,?,?,?,?,?,?,?,?,?,?)", generate())
+    # The app reads the index medicines_db.py builds; it never creates one itself
+    conn.executescript("""
+    CREATE VIRTUAL TABLE medicines_fts USING fts5(
+        name, name_hi, commonNames, commonNames_hi, content='medicines', tokenize='trigram'
+    );
+    INSERT INTO medicines_fts(medicines_fts) VALUES ('rebuild');
+    """)
+    conn.commit()
+    conn.close()
+    return names
+
+
+def legacy_lookup(path, medicine_name):
+    conn = sqlite3.connect(path)
+    conn.row_factory = sqlite3.Row
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT name FROM sqlite_master WHERE type='table' AND name='medicines'")
+        cursor.fetchone()
+        cursor.execute("PRAGMA table_info(medicines)")
+        columns = [col[1] for col in cursor.fetchall()]
+        cursor.execute(f"""
+        SELECT {', '.join(columns)} FROM medicines
+        WHERE LOWER(name) LIKE LOWER(?) OR LOWER(name_hi) LIKE LOWER(?)
+        """, (f'%{medicine_name.lower()}%',) * 2)
+        return cursor.fetchone()
+    finally:
+        conn.close()
+
+
+def load_root_app(path):
+    os.environ['MEDICINES_DB'] = path
+    spec = importlib.util.spec_from_file_location('medicine_lookup_app', ROOT_APP)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    logging.disable(logging.WARNING)
+    return module
+
+
+def measure(fn, terms, threads):
+    latencies = []
+
+    def timed(term):
+        start = time.perf_counter()
+        fn(term)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        list(pool.map(timed, terms))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return len(terms) / elapsed, latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Old vs. new query path behind /api/medicine/<name>")
+    parser.add_argument('rows', nargs='?', type=int, default=200000, help="Catalogue rows (default 200000)")
+    rows = parser.parse_args().rows
+    path = os.path.join(tempfile.mkdtemp(), 'medicines.db')
+    names = build_catalogue(path, rows)
+    app = load_root_app(path)
+
+    with app.get_db_connection() as conn:
+        app.get_schema(conn)
+    print(f"{rows} rows")
+
+    rng = random.Random(5)
+    terms = []
+    for _ in range(LOOKUPS):
+        name, aliases = rng.choice(names)
+        terms.append(rng.choice([name, name[:5], name[2:8], rng.choice(aliases), 'zzzzqq']))
+
+    def new_lookup(term):
+        with app.get_db_connection() as conn:
+            return app.find_medicine(conn, app.get_schema(conn), term)
+
+    print(f"{'path':<8} {'threads':>7} {'req/s':>9} {'p50 ms':>8} {'p99 ms':>8}")
+    for label, fn, count in (('legacy', lambda t: legacy_lookup(path, t), LOOKUPS // 10), ('fts', new_lookup, LOOKUPS)):
+        for threads in (1, THREADS):
+            rate, p50, p99 = measure(fn, terms[:count], threads)
+            print(f"{label:<8} {threads:>7} {rate:>9.1f} {p50:>8.2f} {p99:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
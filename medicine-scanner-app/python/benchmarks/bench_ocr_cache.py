@@ -0,0 +1,85 @@
+"""Hit rate and time saved by the perceptual-hash OCR cache on repeat scans.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_ocr_cache
+
+Every sample photo is scanned once, then rescanned as it would arrive from
+another phone snap of the same box: re-encoded, rescaled, brighter, rotated
+slightly. With Tesseract installed the real OCR pool runs; otherwise OCR
+is a stand-in returning the expected name after ``--ocr-seconds``.
+"""
+import argparse
+import io
+import logging
+import os
+import time
+
+from PIL import Image, ImageEnhance
+
+import app
+from benchmarks.samples import sample_paths, tesseract_available
+from benchmarks.stubs import SlowTTS, StubTranslationEngine, slow_ocr
+
+OCR_SECONDS = 0.5
+
+RETAKES = {
+    're-encoded': lambda image: image,
+    'scaled 90%': lambda image: image.resize((int(image.width * 0.9), int(image.height * 0.9))),
+    'brighter': lambda image: ImageEnhance.Brightness(image).enhance(1.2),
+    'rotated 2deg': lambda image: image.rotate(2, fillcolor='white')
+}
+
+
+def retake(image_bytes, transform):
+    image = transform(Image.open(io.BytesIO(image_bytes)).convert('RGB'))
+    buffer = io.BytesIO()
+    image.save(buffer, format='JPEG', quality=80)
+    return buffer.getvalue()
+
+
+def scan(client, image_bytes, expected, ocr_seconds):
+    """POST one photo; ``ocr_seconds`` is the stand-in OCR time, or None for the real OCR pool."""
+    if ocr_seconds is not None:
+        app.run_ocr = slow_ocr(f"{expected} tablets", ocr_seconds)
+    start = time.perf_counter()
+    response = client.post('/api/scan/upload', data=image_bytes, content_type='image/jpeg')
+    elapsed = time.perf_counter() - start
+    assert response.status_code == 200, response.status_code
+    return elapsed, response.get_json()['data']['name']
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Hit rate and time saved by the OCR cache on repeat scans")
+    parser.add_argument('--ocr-seconds', type=float, default=OCR_SECONDS,
+                        help=f"Stand-in OCR time without Tesseract (default {OCR_SECONDS})")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    app.gTTS = SlowTTS
+    app.translation_engine = StubTranslationEngine()
+    ocr_seconds = None if tesseract_available() else args.ocr_seconds
+    client = app.app.test_client()
+    samples = [(os.path.basename(path), open(path, 'rb').read(), expected) for path, expected in sample_paths()]
+
+    print(f"{len(samples)} photos, OCR: {'Tesseract' if ocr_seconds is None else f'stub {ocr_seconds * 1e3:.0f}ms'}, "
+          f"max distance {app.OCR_CACHE_CONFIG['max_distance']} bits")
+    first = sum(scan(client, image, expected, ocr_seconds)[0] for _, image, expected in samples)
+    print(f"{'first scan':<14} {first / len(samples) * 1e3:8.1f}ms/scan")
+
+    for label, transform in RETAKES.items():
+        before = app.ocr_cache.stats()['hits']
+        elapsed, wrong = 0.0, 0
+        for _, image, expected in samples:
+            seconds, name = scan(client, retake(image, transform), expected, ocr_seconds)
+            elapsed += seconds
+            wrong += bool(name) and name != expected
+        hits = app.ocr_cache.stats()['hits'] - before
+        print(f"{label:<14} {elapsed / len(samples) * 1e3:8.1f}ms/scan  {hits}/{len(samples)} hits  {wrong} wrong")
+
+    stats = app.ocr_cache.stats()
+    print(f"hit rate {stats['hitRate']:.0%}, OCR time saved {stats['secondsSaved']:.1f}s")
+    app.speech_jobs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
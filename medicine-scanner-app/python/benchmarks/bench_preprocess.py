@@ -0,0 +1,92 @@
+"""OCR input size, latency and match accuracy with and without preprocessing.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_preprocess
+    python -m benchmarks.bench_preprocess --variants raw,preprocessed
+
+Each sample photo is read by the OCR workers' engine (tesserocr when
+installed, else pytesseract) as uploaded ("raw"), after the configured
+PREPROCESS_CONFIG ("preprocessed"), and with the optional adaptive
+threshold switched on ("binarized"). A match is the exact-name matcher
+finding the medicine printed on the box. Without Tesseract installed only
+decode/preprocess time and pixel counts are reported.
+"""
+import argparse
+import io
+import time
+
+from PIL import Image
+
+import ocr_pool
+from benchmarks.samples import sample_paths, tesseract_available
+from config import PREPROCESS_CONFIG, TESSERACT_CONFIG
+from medicine_database import MEDICINE_DATABASE
+from medicine_matcher import MedicineMatcher
+from preprocess import preprocess_image
+
+VARIANTS = {
+    'raw': None,
+    'preprocessed': PREPROCESS_CONFIG,
+    'binarized': dict(PREPROCESS_CONFIG, binarize=True),
+}
+
+
+def prepared_image(image_bytes, config):
+    if config is None:
+        image = Image.open(io.BytesIO(image_bytes))
+        image.load()
+        # Tesseract takes 1-bit, grayscale or RGB pixels
+        return image if image.mode in ('1', 'L', 'RGB') else image.convert('RGB')
+    image = preprocess_image(image_bytes, config)
+    image.load()
+    return image
+
+
+def main():
+    parser = argparse.ArgumentParser(description="OCR input size, latency and accuracy with and without preprocessing")
+    parser.add_argument('--variants', default=','.join(VARIANTS), help=f"Comma-separated subset of {', '.join(VARIANTS)}")
+    args = parser.parse_args()
+    variants = {label: VARIANTS[label] for label in args.variants.split(',')}
+    ocr = tesseract_available()
+    if ocr:
+        ocr_pool._init_worker(TESSERACT_CONFIG['path'], TESSERACT_CONFIG['lang'], TESSERACT_CONFIG['config'],
+                              PREPROCESS_CONFIG)
+    matcher = MedicineMatcher(MEDICINE_DATABASE)
+    totals = {label: {'correct': 0, 'ocr': 0.0, 'prep': 0.0, 'pixels': 0} for label in variants}
+
+    print(f"{'sample':<15} {'path':<13} {'pixels':>10} {'prep ms':>8} {'ocr ms':>8}  match")
+    for path, expected in sample_paths():
+        with open(path, 'rb') as f:
+            image_bytes = f.read()
+        for label, config in variants.items():
+            start = time.perf_counter()
+            image = prepared_image(image_bytes, config)
+            prep_ms = (time.perf_counter() - start) * 1e3
+            ocr_ms, matched = float('nan'), '-'
+            if ocr:
+                start = time.perf_counter()
+                text, _ = ocr_pool.recognize_words(image)
+                ocr_ms = (time.perf_counter() - start) * 1e3
+                best, _, _ = matcher.best_match(text.lower())
+                matched = best['name'] if best else '-'
+            total = totals[label]
+            total['correct'] += matched == expected
+            total['ocr'] += ocr_ms
+            total['prep'] += prep_ms
+            total['pixels'] += image.width * image.height
+            print(f"{expected:<15} {label:<13} {image.width * image.height:>10} {prep_ms:>8.1f} {ocr_ms:>8.1f}  {matched}")
+
+    count = len(list(sample_paths()))
+    print()
+    print(f"{'path':<13} {'mean pixels':>11} {'prep ms':>8} {'ocr ms':>8} {'matched':>8}")
+    for label, total in totals.items():
+        ocr_ms = f"{total['ocr'] / count:>8.0f}" if ocr else f"{'-':>8}"
+        matched = f"{total['correct']}/{count}" if ocr else '-'
+        print(f"{label:<13} {total['pixels'] // count:>11} {total['prep'] / count:>8.1f} {ocr_ms} {matched:>8}")
+    if not ocr:
+        print("Tesseract not installed; OCR latency and accuracy not measured.")
+
+
+if __name__ == '__main__':
+    main()
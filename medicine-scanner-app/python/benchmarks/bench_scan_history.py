@@ -0,0 +1,125 @@
+"""Cost on the scan path of recording each scan: synchronous INSERT vs. ScanRecorder.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_scan_history
+    python -m benchmarks.bench_scan_history --scans 20000 --threads 8 --burst 50000
+
+"sync" opens a transaction and commits one row per scan on the request
+thread, sharing one WAL connection the way a per-request write would.
+"write-behind" only queues the row; the recorder's thread writes batches.
+Both use ``synchronous=NORMAL`` on a temporary database. ``--burst`` queues
+that many scans at once into a small queue to show spilling, then times
+``close()`` writing out the backlog. The last line times the
+``/api/admin/scans/stats`` query over everything written.
+"""
+import argparse
+import json
+import os
+import random
+import sqlite3
+import tempfile
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from scan_history import INSERT, SCHEMA, ScanRecorder
+
+NAMES = ['Paracetamol', 'Amoxicillin', 'Cetirizine', 'Ibuprofen', 'Metformin', 'Omeprazole', 'Azithromycin',
+         'Pantoprazole', 'Dolo 650', 'Crocin', 'Atorvastatin', 'Amlodipine']
+
+
+def scans(count, seed=9):
+    rng = random.Random(seed)
+    for _ in range(count):
+        matched = rng.random() < 0.85
+        yield ('scan', rng.choice(['en', 'hi', 'hi', 'ta', 'bn']),
+               rng.choices(NAMES, [1 / (rank + 1) for rank in range(len(NAMES))])[0] if matched else None,
+               rng.uniform(0.75, 1.0) if matched else 0,
+               rng.random() < 0.2,
+               {'decode': rng.uniform(0.001, 0.004), 'ocr': rng.uniform(0.3, 1.2), 'match': rng.uniform(0.0002, 0.002)})
+
+
+class SyncRecorder:
+    def __init__(self, path):
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._lock = threading.Lock()
+
+    def record(self, source, language, medicine, confidence, ocr_cached=False, timings=None):
+        row = (time.time(), source, language, medicine, confidence, int(ocr_cached),
+               json.dumps({stage: round(seconds * 1e3, 2) for stage, seconds in timings.items()}))
+        with self._lock:
+            self._conn.execute("BEGIN")
+            self._conn.execute(INSERT, row)
+            self._conn.execute("COMMIT")
+
+    def close(self):
+        self._conn.close()
+
+
+def measure(recorder, rows, threads):
+    latencies = []
+
+    def timed(row):
+        start = time.perf_counter()
+        recorder.record(*row)
+        latencies.append(time.perf_counter() - start)
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(threads) as pool:
+        list(pool.map(timed, rows))
+    elapsed = time.perf_counter() - start
+    latencies.sort()
+    return elapsed, latencies[len(latencies) // 2] * 1e6, latencies[int(len(latencies) * 0.99)] * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the scan-path cost of recording scans")
+    parser.add_argument('--scans', type=int, default=10000)
+    parser.add_argument('--threads', type=int, default=8)
+    parser.add_argument('--burst', type=int, default=20000, help="Scans queued at once for the overflow test")
+    args = parser.parse_args()
+    directory = tempfile.mkdtemp()
+    rows = list(scans(args.scans))
+
+    print(f"{args.scans} scans from {args.threads} threads")
+    print(f"{'recorder':<13} {'p50 us':>8} {'p99 us':>8} {'wall ms':>8} {'rows':>7} {'written ms':>11}")
+    for label, recorder in (('sync', SyncRecorder(os.path.join(directory, 'sync.db'))),
+                            ('write-behind', ScanRecorder(os.path.join(directory, 'behind.db')))):
+        elapsed, p50, p99 = measure(recorder, rows, args.threads)
+        start = time.perf_counter()
+        if isinstance(recorder, ScanRecorder):
+            recorder.flush()
+            written = recorder.written
+        else:
+            written = args.scans
+        drained = elapsed + time.perf_counter() - start
+        print(f"{label:<13} {p50:>8.1f} {p99:>8.1f} {elapsed * 1e3:>8.0f} {written:>7} {drained * 1e3:>11.0f}")
+        recorder.close()
+
+    path = os.path.join(directory, 'burst.db')
+    recorder = ScanRecorder(path, max_queue=1000, spill_path=path + '.spill')
+    for row in scans(args.burst, seed=10):
+        recorder.record(*row)
+    queued = recorder.stats()
+    start = time.perf_counter()
+    recorder.close()
+    closed = time.perf_counter() - start
+    total = sqlite3.connect(path).execute("SELECT COUNT(*) FROM scans").fetchone()[0]
+    print(f"burst of {args.burst} into a 1000-row queue: {queued['spilled']} spilled, {queued['dropped']} dropped; "
+          f"close() wrote the rest in {closed * 1e3:.0f}ms, {total} rows on disk")
+
+    reader = ScanRecorder(path)
+    start = time.perf_counter()
+    summary = reader.summary(limit=3)
+    seconds = time.perf_counter() - start
+    top = ', '.join(f"{entry['name']} ({entry['scans']})" for entry in summary['languages']['hi']['topMedicines'])
+    print(f"stats query over {summary['scans']} scans: {seconds * 1e3:.1f}ms, top in hi: {top}")
+    reader.close()
+
+
+if __name__ == '__main__':
+    main()
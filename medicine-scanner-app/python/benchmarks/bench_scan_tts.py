@@ -0,0 +1,76 @@
+"""Time-to-first-result of /api/scan with inline vs. background speech synthesis.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_scan_tts
+    python -m benchmarks.bench_scan_tts --requests 100 --tts-seconds 1.5
+
+Tesseract, gTTS and Google Translate are replaced by local stand-ins with fixed delays so the
+numbers isolate how long the client waits for the JSON result.
+"""
+import argparse
+import base64
+import io
+import logging
+import random
+import tempfile
+import time
+
+from PIL import Image
+
+import app
+from audio_cache import AudioCache
+from benchmarks.stubs import SlowTTS, StubTranslationEngine, slow_ocr
+
+REQUESTS = 40
+OCR_SECONDS = 0.15
+TTS_SECONDS = 0.8
+
+
+def sample_payload():
+    buffer = io.BytesIO()
+    Image.new('RGB', (64, 32), 'white').save(buffer, format='PNG')
+    return {'imageData': 'data:image/png;base64,' + base64.b64encode(buffer.getvalue()).decode(), 'language': 'en'}
+
+
+def run(client, payload, names, async_speech, requests, ocr_seconds):
+    app.SPEECH_JOB_CONFIG['async'] = async_speech
+    app.audio_cache = AudioCache(tempfile.mkdtemp(), 64 * 1024 * 1024)
+    latencies = []
+    for i in range(requests):
+        # A different medicine each time, so every scan needs fresh speech
+        app.run_ocr = slow_ocr(f"{names[i % len(names)]} tablets batch {i}", ocr_seconds)
+        start = time.perf_counter()
+        response = client.post('/api/scan', json=payload)
+        latencies.append(time.perf_counter() - start)
+        assert response.status_code == 200, response.get_json()
+    latencies.sort()
+    return latencies[len(latencies) // 2] * 1e3, latencies[int(len(latencies) * 0.99)] * 1e3
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time to first /api/scan result with inline vs. background speech")
+    parser.add_argument('--requests', type=int, default=REQUESTS, help=f"Scans per mode (default {REQUESTS})")
+    parser.add_argument('--ocr-seconds', type=float, default=OCR_SECONDS,
+                        help=f"Stand-in OCR time (default {OCR_SECONDS})")
+    parser.add_argument('--tts-seconds', type=float, default=TTS_SECONDS,
+                        help=f"Stand-in gTTS time (default {TTS_SECONDS})")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    app.OCR_CACHE_CONFIG['enabled'] = False  # Every request here must reach OCR
+    app.gTTS = SlowTTS.with_delay(args.tts_seconds)
+    app.translation_engine = StubTranslationEngine()
+    names = [med['name'] for med in app.catalogue_store.current().medicines.values() if med.get('name')]
+    random.Random(1).shuffle(names)
+    client = app.app.test_client()
+    payload = sample_payload()
+
+    print(f"stub OCR {args.ocr_seconds * 1e3:.0f}ms, stub TTS {args.tts_seconds * 1e3:.0f}ms, {args.requests} scans")
+    for label, async_speech in (('inline', False), ('background', True)):
+        p50, p99 = run(client, payload, names, async_speech, args.requests, args.ocr_seconds)
+        print(f"{label:<11} p50 {p50:8.1f}ms  p99 {p99:8.1f}ms")
+    app.speech_jobs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
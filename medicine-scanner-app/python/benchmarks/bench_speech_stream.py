@@ -0,0 +1,104 @@
+"""Time-to-first-byte and total latency of /api/speech, streamed vs. saved first.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_speech_stream --delay 2.0 -n 5
+
+gTTS is replaced by ``benchmarks.stubs.SlowTTS``. It takes ``--delay``
+seconds per text, spread across the parts gTTS's tokenizer would send as
+separate requests. The spoken texts are each sample medicine's English and
+Hindi scan text, made unique so the audio cache never answers. The old path,
+which synthesizes to a file and then calls ``send_file``, is served from a
+benchmark-only route for comparison.
+"""
+import argparse
+import logging
+import os
+import tempfile
+import threading
+import time
+
+import httpx
+from flask import request, send_file
+from werkzeug.serving import make_server
+
+from benchmarks.samples import sample_paths
+from benchmarks.stubs import SlowTTS
+
+
+def saved_speech():
+    # /api/speech as it was before streaming
+    import app
+    data = request.get_json()
+    lang = data.get('language', 'en')
+    audio_file = app.generate_speech(data['text'], lang)
+    return send_file(audio_file, mimetype='audio/mpeg', as_attachment=True, download_name=f'medicine_info_{lang}.mp3')
+
+
+def timed_post(client, url, payload):
+    """Return ``(seconds to first body byte, seconds to last byte, bytes)``."""
+    start = time.perf_counter()
+    first = None
+    size = 0
+    with client.stream('POST', url, json=payload) as response:
+        response.raise_for_status()
+        for chunk in response.iter_raw():
+            if first is None and chunk:
+                first = time.perf_counter() - start
+            size += len(chunk)
+    return first, time.perf_counter() - start, size
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare streamed and saved /api/speech responses")
+    parser.add_argument('--delay', type=float, default=2.0, help="Stubbed gTTS seconds per text")
+    parser.add_argument('-n', '--rounds', type=int, default=3, help="Passes over the sample medicines")
+    parser.add_argument('--port', type=int, default=5060)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix='mediscan-speech-') as directory:
+        os.environ['AUDIO_CACHE_DIR'] = os.path.join(directory, 'audio')
+        os.environ['TRANSLATION_CACHE_DB'] = os.path.join(directory, 'translations.db')
+        logging.disable(logging.ERROR)
+        import app
+        app.gTTS = SlowTTS.with_delay(args.delay)
+        app.app.add_url_rule('/bench/speech-saved', 'speech_saved', saved_speech, methods=['POST'])
+
+        texts = []
+        for _, name in sample_paths():
+            for lang in ('en', 'hi'):
+                texts.append((lang, app.scan_info(name, lang)[1]))
+
+        server = make_server('127.0.0.1', args.port, app.app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base = f"http://127.0.0.1:{args.port}"
+        results = {}
+        try:
+            with httpx.Client(timeout=60) as client:
+                counter = 0
+                for _ in range(args.rounds):
+                    for lang, text in texts:
+                        for path, route in (('saved', '/bench/speech-saved'), ('streamed', '/api/speech')):
+                            counter += 1
+                            payload = {'text': f"{text} {counter}", 'language': lang}
+                            first, total, _ = timed_post(client, base + route, payload)
+                            results.setdefault((path, lang), []).append((first, total))
+        finally:
+            server.shutdown()
+            app.speech_jobs.shutdown()
+
+    print(f"{len(texts) // 2} medicines x en/hi x {args.rounds} rounds, stubbed gTTS {args.delay}s per text")
+    print(f"{'path':<9} {'lang':<4} {'TTFB p50':>9} {'TTFB p95':>9} {'total p50':>10} {'total p95':>10}")
+    for (path, lang), values in sorted(results.items(), key=lambda item: (item[0][1], item[0][0])):
+        firsts, totals = [v[0] for v in values], [v[1] for v in values]
+        print(f"{path:<9} {lang:<4} {percentile(firsts, 0.5) * 1e3:>7.0f}ms {percentile(firsts, 0.95) * 1e3:>7.0f}ms "
+              f"{percentile(totals, 0.5) * 1e3:>8.0f}ms {percentile(totals, 0.95) * 1e3:>8.0f}ms")
+
+
+if __name__ == '__main__':
+    main()
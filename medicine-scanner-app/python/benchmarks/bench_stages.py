@@ -0,0 +1,263 @@
+"""Per-stage timings, peak memory and match accuracy over the sample photos.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_stages -o baseline.json
+    python -m benchmarks.bench_stages -o candidate.json
+    python -m benchmarks.bench_stages --compare baseline.json candidate.json
+
+Every photo in ``medicince photo/`` goes through decode, preprocess, OCR,
+match, translate and TTS. OCR is the adaptive pass cascade from
+``OCR_CASCADE_CONFIG``, run in this process, and the result includes the
+average number of passes per photo. Google Translate and gTTS are replaced by the
+deterministic stubs in ``benchmarks.stubs``, so the run is offline and the
+translate/TTS numbers are the app's own overhead around those calls.
+Without Tesseract the OCR stage is skipped and matching runs on the
+expected medicine name, so accuracy is only meaningful with Tesseract.
+
+``--compare`` exits with status 1 when a stage's mean or p95 grew, or
+accuracy dropped, by more than ``--threshold``.
+"""
+import argparse
+import io
+import json
+import logging
+import os
+import platform
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+from PIL import Image
+
+import app
+import ocr_pool
+from audio_cache import AudioCache
+from benchmarks.samples import sample_paths, tesseract_available
+from benchmarks.stubs import SlowTTS, StubTranslationEngine
+from config import PREPROCESS_CONFIG, TESSERACT_CONFIG
+from ocr_pool import OCRCascade
+from translation_cache import TranslationCache
+
+STAGES = ['decode', 'preprocess', 'ocr', 'match', 'translate', 'tts']
+
+
+def decode(image_bytes):
+    image = Image.open(io.BytesIO(image_bytes))
+    image.load()
+    return image
+
+
+def preprocess(image_bytes):
+    # Same preprocessing the OCR workers do; the first pass then reuses the result
+    image = ocr_pool._prepare(image_bytes)
+    image.load()
+    return image
+
+
+def ocr(image_bytes):
+    """Run the OCR cascade in this process; returns ``(text, passes run)``."""
+    cascade = OCRCascade(app.ocr_pool.passes, app.confident_match, PREPROCESS_CONFIG['max_side'])
+    while True:
+        job = cascade.next_job(image_bytes)
+        if job is None:
+            return cascade.result()
+        cascade.record(*ocr_pool._ocr_pass(job))
+
+
+def speech_text(info):
+    return f"Medicine: {info['name']} Usage: {info['usage']} Warnings: {info['warnings']}"
+
+
+def run_photo(image_bytes, expected, use_ocr, timings, passes=None):
+    """Run every stage on one photo, appending seconds to ``timings``; returns the matched name."""
+    def timed(stage, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        timings.setdefault(stage, []).append(time.perf_counter() - start)
+        return result
+
+    timed('decode', decode, image_bytes)
+    timed('preprocess', preprocess, image_bytes)
+    if use_ocr:
+        text, passes_run = timed('ocr', ocr, image_bytes)
+        if passes is not None:
+            passes.append(passes_run)
+    else:
+        text = expected
+    info = timed('match', app.extract_medicine_info, text, 'en')
+    spoken = speech_text(info)
+    timed('translate', app.translate_to_hindi, spoken)
+    key, spoken, slow = app.speech_request(spoken, 'en')
+    timed('tts', app.synthesize_speech, key, spoken, 'en', slow)
+    return info['name']
+
+
+def fresh_caches(directory, round_number):
+    # Every round starts cold so translate/TTS time the miss path, not a cache lookup
+    app.translation_cache = TranslationCache(os.path.join(directory, f'translations-{round_number}.db'),
+                                             memory_entries=1024, max_entries=10000, ttl_seconds=3600)
+    app.audio_cache = AudioCache(os.path.join(directory, f'audio-{round_number}'), 64 * 1024 * 1024)
+
+
+def peak_rss_bytes():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def run(rounds):
+    with tempfile.TemporaryDirectory(prefix='mediscan-bench-') as directory:
+        return run_in(directory, rounds)
+
+
+def run_in(directory, rounds):
+    app.gTTS = SlowTTS
+    app.translation_engine = StubTranslationEngine()
+    use_ocr = tesseract_available()
+    ocr_pool._init_worker(app.pytesseract.pytesseract.tesseract_cmd, TESSERACT_CONFIG['lang'],
+                          TESSERACT_CONFIG['config'], PREPROCESS_CONFIG)
+    photos = [(os.path.basename(path), open(path, 'rb').read(), expected) for path, expected in sample_paths()]
+    timings = {}
+    passes = []
+    correct = 0
+
+    # Untimed warm-up loads Pillow plugins and the matcher code paths
+    fresh_caches(directory, 'warmup')
+    for _, image_bytes, expected in photos:
+        run_photo(image_bytes, expected, use_ocr, {})
+
+    for round_number in range(rounds):
+        fresh_caches(directory, round_number)
+        for _, image_bytes, expected in photos:
+            correct += run_photo(image_bytes, expected, use_ocr, timings, passes) == expected
+
+    # Measured in a separate pass because tracemalloc slows allocation-heavy stages.
+    # Pillow's pixel buffers are outside the Python heap, so peak RSS is reported too.
+    fresh_caches(directory, 'memory')
+    tracemalloc.start()
+    for _, image_bytes, expected in photos:
+        run_photo(image_bytes, expected, use_ocr, {})
+    peak_heap_bytes = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    stages = {}
+    for stage in STAGES:
+        values = timings.get(stage)
+        if not values:
+            stages[stage] = None
+            continue
+        stages[stage] = {
+            'count': len(values),
+            'mean_ms': round(sum(values) / len(values) * 1e3, 3),
+            'p95_ms': round(percentile(values, 0.95) * 1e3, 3)
+        }
+    return {
+        'meta': {
+            'timestamp': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpus': os.cpu_count(),
+            'ocr': 'tesseract' if use_ocr else 'skipped',
+            'ocr_cascade': app.ocr_pool.passes,
+            'photos': len(photos),
+            'rounds': rounds
+        },
+        'stages': stages,
+        'peak_memory_bytes': {'python_heap': peak_heap_bytes, 'rss': peak_rss_bytes()},
+        'accuracy': round(correct / (len(photos) * rounds), 4),
+        'ocr_passes': {'mean': round(sum(passes) / len(passes), 3), 'max': max(passes)} if passes else None
+    }
+
+
+def compare(baseline, candidate, threshold, min_delta_ms):
+    """Return a list of human-readable regressions of ``candidate`` against ``baseline``.
+
+    A timing counts only when it grew by more than ``threshold`` and by more
+    than ``min_delta_ms``, so sub-millisecond jitter isn't flagged.
+    """
+    regressions = []
+    for stage in STAGES:
+        before, after = baseline['stages'].get(stage), candidate['stages'].get(stage)
+        if not before or not after:
+            continue
+        for metric in ('mean_ms', 'p95_ms'):
+            grew = after[metric] - before[metric]
+            if grew > min_delta_ms and grew > before[metric] * threshold:
+                regressions.append(f"{stage} {metric}: {before[metric]:.3f} -> {after[metric]:.3f} "
+                                   f"(+{grew / before[metric]:.0%})")
+    for kind, before in baseline['peak_memory_bytes'].items():
+        after = candidate['peak_memory_bytes'].get(kind)
+        if before and after and after > before * (1 + threshold):
+            regressions.append(f"peak memory ({kind}): {before / 1e6:.1f}MB -> {after / 1e6:.1f}MB")
+    before, after = baseline.get('ocr_passes'), candidate.get('ocr_passes')
+    if before and after and after['mean'] > before['mean'] * (1 + threshold):
+        regressions.append(f"OCR passes per photo: {before['mean']:.2f} -> {after['mean']:.2f}")
+    if candidate['accuracy'] < baseline['accuracy'] - threshold * baseline['accuracy']:
+        regressions.append(f"accuracy: {baseline['accuracy']:.1%} -> {candidate['accuracy']:.1%}")
+    return regressions
+
+
+def print_report(result):
+    meta = result['meta']
+    print(f"{meta['photos']} photos x {meta['rounds']} rounds, OCR {meta['ocr']}, Python {meta['python']}")
+    for stage in STAGES:
+        numbers = result['stages'][stage]
+        if numbers is None:
+            print(f"{stage:<11} skipped")
+        else:
+            print(f"{stage:<11} mean {numbers['mean_ms']:9.3f}ms  p95 {numbers['p95_ms']:9.3f}ms")
+    memory = result['peak_memory_bytes']
+    rss = f", RSS {memory['rss'] / 1e6:.1f}MB" if memory['rss'] else ''
+    print(f"peak memory: Python heap {memory['python_heap'] / 1e6:.1f}MB{rss}; accuracy {result['accuracy']:.1%}")
+    if result.get('ocr_passes'):
+        print(f"OCR passes per photo: mean {result['ocr_passes']['mean']:.2f}, max {result['ocr_passes']['max']} "
+              f"of {len(meta['ocr_cascade'])}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Stage-level benchmark over the sample medicine photos")
+    parser.add_argument('-o', '--output', help="Write the JSON result to this file (default: stdout)")
+    parser.add_argument('-n', '--rounds', type=int, default=5, help="Passes over the photo set")
+    parser.add_argument('--compare', nargs=2, metavar=('BASELINE', 'CANDIDATE'),
+                        help="Compare two result files instead of running")
+    parser.add_argument('--threshold', type=float, default=0.10, help="Allowed relative slowdown (default 0.10)")
+    parser.add_argument('--min-delta-ms', type=float, default=0.1,
+                        help="Ignore timing changes smaller than this (default 0.1ms)")
+    args = parser.parse_args()
+
+    if args.compare:
+        with open(args.compare[0]) as f:
+            baseline = json.load(f)
+        with open(args.compare[1]) as f:
+            candidate = json.load(f)
+        regressions = compare(baseline, candidate, args.threshold, args.min_delta_ms)
+        for line in regressions:
+            print(f"REGRESSION {line}")
+        if not regressions:
+            print(f"No regressions beyond {args.threshold:.0%}")
+        sys.exit(1 if regressions else 0)
+
+    logging.disable(logging.ERROR)
+    result = run(args.rounds)
+    app.speech_jobs.shutdown()
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(result, f, indent=2)
+        print_report(result)
+    else:
+        print(json.dumps(result, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,136 @@
+"""Import time, warmup, time to first scan and RSS of python/app.py.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_startup                  # in-code catalogue
+    python -m benchmarks.bench_startup --entries 100000  # synthetic medicines.db
+
+Every measurement runs in a fresh interpreter. "cold" scans right after
+import, so the first scan pays for loading the catalogue; "warm" runs the
+warmup first, as the server does before /api/ready turns 200. OCR is stubbed
+and returns a sample medicine name, so the scan time is matching, localization
+and the response. The catalogue's record memory is also compared: dicts of
+every field (the old loader) against the slotted index-only records.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from benchmarks.samples import sample_paths
+
+
+def peak_rss_mb():
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return round((peak / 1024 if sys.platform == 'darwin' else peak) / 1024, 1)
+
+
+def child(mode, image_path):
+    start = time.perf_counter()
+    import app
+    imported = time.perf_counter()
+    from benchmarks.stubs import SlowTTS, StubTranslationEngine, slow_ocr
+    app.gTTS = SlowTTS
+    app.translation_engine = StubTranslationEngine()
+    app.OCR_CACHE_CONFIG['enabled'] = False
+    app.SPEECH_JOB_CONFIG['async'] = True
+    app.run_ocr = slow_ocr('Paracetamol 500mg tablets', 0)
+
+    warmup_s = None
+    if mode == 'warm':
+        app.warmup.start()
+        app.warmup.wait()
+        warmup_s = app.warmup.finished_at - app.warmup.started_at
+    with open(image_path, 'rb') as f:
+        image = f.read()
+    client = app.app.test_client()
+    scan_start = time.perf_counter()
+    response = client.post('/api/scan/upload?language=hi', data=image, content_type='image/jpeg')
+    first_scan = time.perf_counter() - scan_start
+    assert response.status_code == 200, response.status_code
+    app.speech_jobs.shutdown()
+    print(json.dumps({
+        'import_s': imported - start,
+        'warmup_s': warmup_s,
+        'first_scan_s': first_scan,
+        'entries': app.catalogue_store.stats()['entries'],
+        'peak_rss_mb': peak_rss_mb()
+    }))
+
+
+def record_memory(path):
+    """Python heap used by the catalogue records alone, old dicts vs. MedicineRecord."""
+    from catalogue import CatalogueFile
+    from medicines_db import load_medicine_database
+    sizes = {}
+    for name, load in (('dict', load_medicine_database), ('compact', lambda p: CatalogueFile(p).records())):
+        tracemalloc.start()
+        records = load(path)
+        sizes[name] = round(tracemalloc.get_traced_memory()[0] / 1e6, 1)
+        tracemalloc.stop()
+        del records
+    return sizes
+
+
+def build_catalogue(entries, directory):
+    from benchmarks.bench_matcher import synthetic_database
+    from medicines_db import build_medicines_db
+    database = synthetic_database(entries)
+    for med in database.values():
+        med.setdefault('usage', f"For {med['name'].lower()} related conditions")
+        med.setdefault('warnings', 'Take as directed')
+        med.setdefault('dosage', '10mg once daily')
+        med.setdefault('sideEffects', 'Nausea, headache')
+    path = os.path.join(directory, 'medicines.db')
+    build_medicines_db(database, path)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure app startup, warmup and time to first scan")
+    parser.add_argument('--entries', type=int, help="Build a synthetic medicines.db of this size")
+    parser.add_argument('-n', '--runs', type=int, default=3, help="Fresh interpreters per mode")
+    parser.add_argument('--child', choices=['cold', 'warm'], help=argparse.SUPPRESS)
+    parser.add_argument('--image', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        return child(args.child, args.image)
+
+    image_path = next(iter(sample_paths()))[0]
+    with tempfile.TemporaryDirectory(prefix='mediscan-startup-') as directory:
+        env = dict(os.environ, AUDIO_CACHE_DIR=os.path.join(directory, 'audio'),
+                   TRANSLATION_CACHE_DB=os.path.join(directory, 'translations.db'),
+                   MEDICINES_DB=os.path.join(directory, 'missing.db'))
+        if args.entries:
+            env['MEDICINES_DB'] = build_catalogue(args.entries, directory)
+
+        results = {}
+        for mode in ('cold', 'warm'):
+            for _ in range(args.runs):
+                output = subprocess.run([sys.executable, '-m', 'benchmarks.bench_startup', '--child', mode,
+                                         '--image', image_path], env=env, capture_output=True, text=True,
+                                        cwd=os.path.join(os.path.dirname(__file__), '..'), check=True).stdout
+                results.setdefault(mode, []).append(json.loads(output.strip().splitlines()[-1]))
+        memory = record_memory(env['MEDICINES_DB']) if args.entries else None
+
+    def median(mode, key):
+        values = sorted(run[key] for run in results[mode])
+        return values[len(values) // 2]
+
+    entries = results['cold'][0]['entries']
+    print(f"{entries} medicines, median of {args.runs} runs")
+    print(f"import               {median('cold', 'import_s') * 1e3:8.0f}ms")
+    print(f"first scan, cold     {median('cold', 'first_scan_s') * 1e3:8.0f}ms   peak RSS {median('cold', 'peak_rss_mb'):.0f}MB")
+    print(f"warmup               {median('warm', 'warmup_s') * 1e3:8.0f}ms")
+    print(f"first scan, warm     {median('warm', 'first_scan_s') * 1e3:8.0f}ms   peak RSS {median('warm', 'peak_rss_mb'):.0f}MB")
+    if memory:
+        print(f"catalogue records    {memory['dict']:.1f}MB as dicts, {memory['compact']:.1f}MB as MedicineRecord")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,236 @@
+"""Time to recognition: live WebSocket scan vs. a single-shot /api/scan photo.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_stream_scan
+    python -m benchmarks.bench_stream_scan --focus 0,1,2,4 --retry 2
+
+Both paths run through ``asgi.application`` in this process. Each sample
+photo stands in for a camera pointed at a label from time 0. The picture
+starts blurred (Gaussian radius ``--blur``) and is sharp after ``--focus``
+seconds while the hand steadies and the camera focuses. The clock stops when
+the correct medicine arrives at the client.
+
+- single shot: the user taps capture after ``--tap`` seconds. The still
+  (1280px, JPEG q92, base64 JSON) goes to /api/scan. If the wrong medicine
+  or none comes back, they tap again ``--retry`` seconds after the answer.
+- stream: from time 0 the client sends 960px JPEG q80 frames at ``--fps``
+  to /api/scan/stream until the server sends ``stop``.
+
+Without Tesseract, OCR is a stand-in keyed by the exact frame bytes and
+taking ``--ocr-delay`` per pass. A sharp frame (radius <= 0.5) reads the name
+exactly. A slightly blurred one (<= 2) reads it with one letter wrong, which
+only the fuzzy matcher finds, so a single shot runs every cascade pass on
+it. A blurrier one reads noise. Network time is not included.
+"""
+import argparse
+import asyncio
+import base64
+import hashlib
+import io
+import json
+import logging
+import time
+
+from PIL import Image, ImageFilter
+
+from benchmarks.samples import sample_paths, tesseract_available
+from benchmarks.stubs import StubTranslationEngine
+
+RADIUS_STEP = 0.25
+
+
+def render(path, width, quality, radii):
+    """JPEG bytes of the photo at camera ``width`` for every blur radius in ``radii``."""
+    image = Image.open(path).convert('RGB')
+    image = image.resize((width, max(1, round(image.height * width / image.width))))
+    frames = {}
+    for radius in radii:
+        blurred = image.filter(ImageFilter.GaussianBlur(radius)) if radius else image
+        buffer = io.BytesIO()
+        blurred.save(buffer, 'JPEG', quality=quality)
+        frames[radius] = buffer.getvalue()
+    return frames
+
+
+def misspelled(name):
+    middle = len(name) // 2
+    return name[:middle] + ('x' if name[middle] != 'x' else 'y') + name[middle + 1:]
+
+
+class Camera:
+    """The frame the camera shows ``t`` seconds after the label came into view."""
+
+    def __init__(self, path, name, blur, focus):
+        self.name = name
+        self.blur = blur
+        self.focus = focus
+        radii = [round(step * RADIUS_STEP, 2) for step in range(int(blur / RADIUS_STEP) + 1)]
+        self.stills = render(path, 1280, 92, radii)
+        self.frames = render(path, 960, 80, radii)
+        # Stand-in OCR reads the blur radius back from the frame bytes
+        self.radius_of = {hashlib.sha256(data).digest(): radius
+                          for frames in (self.stills, self.frames) for radius, data in frames.items()}
+
+    def radius(self, t):
+        if t >= self.focus:
+            return 0.0
+        radius = self.blur * (1 - t / self.focus)
+        return min(self.blur, round(radius / RADIUS_STEP) * RADIUS_STEP)
+
+    def still(self, t):
+        return self.stills[round(self.radius(t), 2)]
+
+    def frame(self, t):
+        return self.frames[round(self.radius(t), 2)]
+
+    def read(self, image_bytes):
+        """Stand-in OCR text for a frame, and whether the cascade would accept it after one pass."""
+        radius = self.radius_of.get(hashlib.sha256(image_bytes).digest(), self.blur)
+        if radius <= 0.5:
+            return f"{self.name} tablets IP", True
+        if radius <= 2.0:
+            return f"{misspelled(self.name)} tab1ets", False
+        return "~ ,. |' -", False
+
+
+def stub_ocr(asgi, scanner, camera, delay):
+    def run_ocr(image_bytes):
+        text, accepted = camera.read(image_bytes)
+        time.sleep(delay * (1 if accepted else len(scanner.ocr_pool.passes)))
+        return text
+
+    async def run_frame_ocr(frame):
+        text, _ = camera.read(frame)
+        await asyncio.sleep(delay * asgi.STREAM_SCAN_CONFIG['passes_per_frame'])
+        return text
+    scanner.run_ocr = run_ocr
+    asgi.run_frame_ocr = run_frame_ocr
+
+
+async def post_scan(asgi, image, lang):
+    body = json.dumps({'imageData': 'data:image/jpeg;base64,' + base64.b64encode(image).decode(),
+                       'language': lang}).encode()
+    scope = {'type': 'http', 'method': 'POST', 'path': '/api/scan', 'query_string': b'', 'root_path': '',
+             'scheme': 'http', 'server': ('127.0.0.1', 5000), 'client': ('127.0.0.1', 1),
+             'http_version': '1.1',
+             'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode())]}
+    sent = []
+
+    async def receive():
+        return {'type': 'http.request', 'body': body, 'more_body': False}
+
+    async def send(message):
+        sent.append(message)
+    await asgi.application(scope, receive, send)
+    return json.loads(b''.join(message.get('body', b'') for message in sent if message['type'] == 'http.response.body'))
+
+
+async def single_shot(asgi, camera, tap, retry, limit, lang):
+    start = time.perf_counter()
+    capture_at, attempts = tap, 0
+    while capture_at < limit:
+        await asyncio.sleep(max(0.0, start + capture_at - time.perf_counter()))
+        payload = await post_scan(asgi, camera.still(capture_at), lang)
+        attempts += 1
+        elapsed = time.perf_counter() - start
+        if (payload.get('data') or {}).get('name') == camera.name:
+            return elapsed, attempts
+        capture_at = elapsed + retry
+    return None, attempts
+
+
+async def stream(asgi, camera, fps, lang):
+    incoming, outgoing = asyncio.Queue(), asyncio.Queue()
+    scope = {'type': 'websocket', 'path': '/api/scan/stream', 'query_string': f'language={lang}'.encode(),
+             'headers': []}
+    start = time.perf_counter()
+    await incoming.put({'type': 'websocket.connect'})
+    server = asyncio.ensure_future(asgi.application(scope, incoming.get, outgoing.put))
+    await outgoing.get()  # websocket.accept
+
+    async def send_frames():
+        sent = 0
+        while True:
+            await incoming.put({'type': 'websocket.receive', 'bytes': camera.frame(time.perf_counter() - start)})
+            sent += 1
+            await asyncio.sleep(max(0.0, start + sent / fps - time.perf_counter()))
+    sender = asyncio.ensure_future(send_frames())
+
+    seconds, result = None, {}
+    while True:
+        message = await outgoing.get()
+        if message['type'] == 'websocket.close':
+            break
+        payload = json.loads(message['text'])
+        if payload['type'] == 'result':
+            seconds, result = time.perf_counter() - start, payload
+        elif payload['type'] == 'stop':
+            sender.cancel()
+    sender.cancel()
+    await incoming.put({'type': 'websocket.disconnect', 'code': 1000})
+    await server
+    if (result.get('data') or {}).get('name') != camera.name:
+        seconds = None
+    return seconds, result.get('frames', 0), result.get('dropped', 0)
+
+
+def median(values):
+    values = sorted(value for value in values if value is not None)
+    return values[len(values) // 2] if values else None
+
+
+def milliseconds(seconds):
+    return f"{seconds * 1e3:7.0f}ms" if seconds is not None else f"{'-':>9}"
+
+
+async def main_async(args):
+    import asgi
+    scanner = asgi.scanner
+    scanner.OCR_CACHE_CONFIG['enabled'] = False
+    scanner.translation_engine = StubTranslationEngine()
+    # Audio is started after the result is sent; keep gTTS out of the measurement
+    scanner.queue_speech = lambda text, lang='en': (None, 'unavailable')
+    scanner.SPEECH_JOB_CONFIG['async'] = True
+    await asyncio.to_thread(scanner.catalogue_store.current)
+    use_stub = not tesseract_available()
+    samples = list(sample_paths())
+
+    print(f"blur radius {args.blur} -> sharp, tap at {args.tap}s, retry {args.retry}s after a miss, "
+          f"{args.fps} fps stream, OCR {'stand-in ' + str(args.ocr_delay) + 's/pass' if use_stub else 'Tesseract'}")
+    print(f"{'focus':>6} {'single shot':>12} {'taps':>5} {'stream':>10} {'frames':>7} {'dropped':>8} {'missed':>7}")
+    for focus in (float(value) for value in args.focus.split(',')):
+        shots, taps, streams, frames, dropped, missed = [], [], [], [], [], 0
+        for path, name in samples:
+            camera = Camera(path, name, args.blur, focus)
+            if use_stub:
+                stub_ocr(asgi, scanner, camera, args.ocr_delay)
+            seconds, attempts = await single_shot(asgi, camera, args.tap, args.retry, args.limit, args.language)
+            shots.append(seconds)
+            taps.append(attempts)
+            seconds, read, skipped = await stream(asgi, camera, args.fps, args.language)
+            streams.append(seconds)
+            frames.append(read)
+            dropped.append(skipped)
+            missed += (shots[-1] is None) + (seconds is None)
+        print(f"{focus:>5.1f}s {milliseconds(median(shots)):>12} {median(taps):>5} {milliseconds(median(streams)):>10} "
+              f"{median(frames):>7} {median(dropped):>8} {missed:>7}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare time to recognition of live and single-shot scans")
+    parser.add_argument('--focus', default='0,1,2,4', help="Seconds until the camera image is sharp")
+    parser.add_argument('--blur', type=float, default=6.0, help="Gaussian blur radius at time 0")
+    parser.add_argument('--tap', type=float, default=1.0, help="Seconds until the first capture tap")
+    parser.add_argument('--retry', type=float, default=2.0, help="Seconds from a failed answer to the next tap")
+    parser.add_argument('--fps', type=float, default=4.0, help="Frames per second the stream client sends")
+    parser.add_argument('--ocr-delay', type=float, default=0.3, help="Seconds per stand-in OCR pass")
+    parser.add_argument('--limit', type=float, default=20.0, help="Give the single shot up after this long")
+    parser.add_argument('--language', default='en')
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    asyncio.run(main_async(args))
+
+
+if __name__ == '__main__':
+    main()
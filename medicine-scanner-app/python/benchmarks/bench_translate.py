@@ -0,0 +1,111 @@
+"""Latency of translating long texts: TranslationEngine vs. the previous chunk loop.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_translate
+    python -m benchmarks.bench_translate --sizes 1500,10000 --callers 8
+
+Both clients talk to ``benchmarks.stub_server``'s stand-in for Google
+Translate in this process. Each request takes ``--delay`` plus
+``--per-char`` seconds per character, and each new connection first waits
+``--connect-delay`` for the handshakes a real HTTPS connection to Google
+needs. "previous" is the old ``translate_to_hindi`` loop: fixed-size slices
+sent one after another, each through a new ``deep_translator``
+``GoogleTranslator`` and a new connection. The old loop cut 5000-character
+slices, which ``deep_translator`` rejects (it takes fewer than 5000), so any
+text that long was left untranslated; 4999 is used here. "engine" is the app's
+``TranslationEngine``: sentence-aware chunks, sent in parallel over a pooled
+keep-alive session. Texts are catalogue usage and warning sentences repeated
+to each ``--sizes`` length; ``--callers`` translate different texts at once.
+"""
+import argparse
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stub_server import TranslatePage, translate_server
+from config import TRANSLATION_ENGINE_CONFIG
+from medicine_database import MEDICINE_DATABASE
+from translation_engine import TranslationEngine
+
+
+def label_text(chars, salt):
+    sentences = [f"{med['usage']}. {med['warnings']}." for med in MEDICINE_DATABASE.values()
+                 if med.get('usage') and med.get('warnings')]
+    text, index = f"Label {salt}.", 0
+    while len(text) < chars:
+        text += ' ' + sentences[index % len(sentences)]
+        index += 1
+    return text[:chars]
+
+
+def previous_translate(url):
+    from deep_translator import GoogleTranslator
+
+    def translate(text):
+        chunks = [text[i:i+4999] for i in range(0, len(text), 4999)]
+        parts = []
+        for chunk in chunks:
+            translator = GoogleTranslator(source='en', target='hi')
+            translator._base_url = url
+            parts.append(translator.translate(chunk))
+        return ' '.join(parts)
+    return translate
+
+
+def measure(translate, size, runs, callers):
+    """Median seconds per text, and connections and requests per text."""
+    timings = []
+    connections, requests = TranslatePage.connections, TranslatePage.requests
+    salt = iter(range(10 ** 9))
+    lock = threading.Lock()
+
+    def one():
+        with lock:
+            text = label_text(size, next(salt))
+        start = time.perf_counter()
+        translate(text)
+        return time.perf_counter() - start
+
+    with ThreadPoolExecutor(callers) as callers_pool:
+        for _ in range(runs):
+            timings.extend(callers_pool.map(lambda _: one(), range(callers)))
+    timings.sort()
+    texts = runs * callers
+    return (timings[len(timings) // 2], (TranslatePage.connections - connections) / texts,
+            (TranslatePage.requests - requests) / texts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare translation latency for long texts")
+    parser.add_argument('--sizes', default='300,1500,5000,10000,20000', help="Text lengths in characters")
+    parser.add_argument('-n', '--runs', type=int, default=5)
+    parser.add_argument('--callers', type=int, default=1, help="Texts translated at the same time")
+    parser.add_argument('--delay', type=float, default=0.15, help="Seconds per stubbed request")
+    parser.add_argument('--per-char', type=float, default=0.00002, help="Extra seconds per character")
+    parser.add_argument('--connect-delay', type=float, default=0.03, help="Seconds to open a connection")
+    parser.add_argument('--port', type=int, default=5090)
+    args = parser.parse_args()
+
+    server = translate_server('127.0.0.1', args.port, args.delay, args.per_char, args.connect_delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{args.port}/m"
+    engine = TranslationEngine(url=url, chunk_chars=TRANSLATION_ENGINE_CONFIG['chunk_chars'],
+                               max_parallel=TRANSLATION_ENGINE_CONFIG['max_parallel'],
+                               pool_connections=TRANSLATION_ENGINE_CONFIG['pool_connections'])
+    clients = (('previous', previous_translate(url)), ('engine', lambda text: engine.translate(text, 'en', 'hi')))
+
+    print(f"{args.delay * 1e3:.0f}ms + {args.per_char * 1e6:.0f}us/char per request, "
+          f"{args.connect_delay * 1e3:.0f}ms per new connection, {args.callers} caller(s), "
+          f"chunks of {engine.chunk_chars} chars, {engine.max_parallel} in parallel")
+    print(f"{'chars':>7} {'client':<9} {'median':>9} {'requests':>9} {'conns':>6}")
+    for size in (int(size) for size in args.sizes.split(',')):
+        for name, translate in clients:
+            seconds, connections, requests = measure(translate, size, args.runs, args.callers)
+            print(f"{size:>7} {name:<9} {seconds * 1e3:>7.0f}ms {requests:>9.1f} {connections:>6.1f}")
+    engine.close()
+    server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,116 @@
+"""Memory and upload time of the base64 JSON scan vs. the binary upload endpoint.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.bench_upload
+    python -m benchmarks.bench_upload --rounds 30
+
+A phone-sized JPEG is posted three ways: as a base64 data URL to ``/api/scan``,
+as ``multipart/form-data`` and as a raw ``image/jpeg`` body to ``/api/scan/upload``.
+OCR is stubbed, so the numbers isolate request handling. Peak memory is the
+Python heap allocated while the server handles one request (tracemalloc);
+upload time is measured over a local HTTP socket.
+"""
+import argparse
+import base64
+import http.client
+import io
+import logging
+import random
+import threading
+import time
+import tracemalloc
+
+from PIL import Image
+from werkzeug.serving import make_server
+from werkzeug.test import EnvironBuilder
+
+import app
+from benchmarks.stubs import SlowTTS, StubTranslationEngine, slow_ocr
+
+ROUNDS = 10
+BOUNDARY = 'mediscanbenchboundary'
+
+
+def phone_photo(width=4032, height=3024):
+    # Noise compresses badly, which gives a realistic multi-megabyte JPEG
+    rng = random.Random(1)
+    image = Image.frombytes('L', (width // 4, height // 4), bytes(rng.getrandbits(8) for _ in range(width * height // 16)))
+    buffer = io.BytesIO()
+    image.resize((width, height)).convert('RGB').save(buffer, format='JPEG', quality=90)
+    return buffer.getvalue()
+
+
+def requests_for(jpeg):
+    data_url = 'data:image/jpeg;base64,' + base64.b64encode(jpeg).decode()
+    json_body = ('{"imageData": "%s", "language": "en"}' % data_url).encode()
+    multipart_body = b''.join([
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="language"\r\n\r\nen\r\n'.encode(),
+        f'--{BOUNDARY}\r\nContent-Disposition: form-data; name="image"; filename="scan.jpg"\r\n'
+        'Content-Type: image/jpeg\r\n\r\n'.encode(),
+        jpeg,
+        f'\r\n--{BOUNDARY}--\r\n'.encode()
+    ])
+    return [
+        ('json base64', '/api/scan', 'application/json', json_body),
+        ('multipart', '/api/scan/upload', f'multipart/form-data; boundary={BOUNDARY}', multipart_body),
+        ('raw body', '/api/scan/upload?language=en', 'image/jpeg', jpeg)
+    ]
+
+
+def peak_memory(path, content_type, body):
+    environ = EnvironBuilder(path=path, method='POST', content_type=content_type,
+                             input_stream=io.BytesIO(body), content_length=len(body)).get_environ()
+    tracemalloc.start()
+    response = app.app.wsgi_app(environ, lambda status, headers: None)
+    b''.join(response)
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak
+
+
+def upload_time(port, path, content_type, body, rounds):
+    timings = []
+    for _ in range(rounds):
+        connection = http.client.HTTPConnection('127.0.0.1', port)
+        start = time.perf_counter()
+        connection.request('POST', path, body=body, headers={'Content-Type': content_type})
+        response = connection.getresponse()
+        response.read()
+        timings.append(time.perf_counter() - start)
+        connection.close()
+        assert response.status == 200, response.status
+    timings.sort()
+    return timings[len(timings) // 2]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Memory and upload time of base64 JSON vs. binary scan uploads")
+    parser.add_argument('--rounds', type=int, default=ROUNDS, help=f"Uploads per format (default {ROUNDS})")
+    args = parser.parse_args()
+    logging.disable(logging.ERROR)
+    app.OCR_CACHE_CONFIG['enabled'] = False  # Every request here must reach OCR
+    app.gTTS = SlowTTS
+    app.translation_engine = StubTranslationEngine()
+    app.run_ocr = slow_ocr('Paracetamol 500mg tablets', 0)
+
+    jpeg = phone_photo()
+    cases = requests_for(jpeg)
+    # Measured before the HTTP server starts so its threads don't show up in the trace
+    peaks = [peak_memory(path, content_type, body) for _, path, content_type, body in cases]
+
+    server = make_server('127.0.0.1', 0, app.app, threaded=True)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+
+    print(f"JPEG {len(jpeg) / 1e6:.2f}MB, median of {args.rounds} uploads")
+    print(f"{'':<12} {'wire':>9} {'peak heap':>10} {'upload':>9}")
+    for (label, path, content_type, body), peak in zip(cases, peaks):
+        seconds = upload_time(server.port, path, content_type, body, args.rounds)
+        print(f"{label:<12} {len(body) / 1e6:7.2f}MB {peak / 1e6:8.2f}MB {seconds * 1e3:7.1f}ms")
+
+    server.shutdown()
+    app.speech_jobs.shutdown()
+
+
+if __name__ == '__main__':
+    main()
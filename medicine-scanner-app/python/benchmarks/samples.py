@@ -0,0 +1,37 @@
+import os
+
+SAMPLE_DIR = os.path.join(os.path.dirname(__file__), '..', '..', '..', 'medicince photo')
+
+# Sample photo -> the medicine printed on the packaging.
+SAMPLE_IMAGES = {
+    'OIP (1).webp': 'Metformin',
+    'OIP.jpeg': 'Paracetamol',
+    'amitriplene.jpg': 'Amitriptyline',
+    'amoxicillin-tablets-1000mg.jpeg': 'Amoxicillin',
+    'ciprofloxacin.webp': 'Ciprofloxacin',
+    'esomeprozole.jpeg': 'Esomeprazole',
+    'lisinpril.jpg': 'Lisinopril',
+    'metoformin.jpg': 'Metformin',
+    'omniprazole.jpeg': 'Omeprazole',
+}
+
+
+def sample_paths():
+    for filename, expected in SAMPLE_IMAGES.items():
+        yield os.path.join(SAMPLE_DIR, filename), expected
+
+
+def tesseract_available():
+    """True when the OCR workers can run Tesseract, through tesserocr or the tesseract binary."""
+    try:
+        import tesserocr
+        tesserocr.PyTessBaseAPI().End()
+        return True
+    except Exception:
+        pass
+    try:
+        import pytesseract
+        pytesseract.get_tesseract_version()
+        return True
+    except Exception:
+        return False
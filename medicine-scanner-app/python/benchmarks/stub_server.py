@@ -0,0 +1,149 @@
+"""Serve the scan API and the root catalogue API with local stand-ins for Google.
+
+Run from the ``python/`` directory:
+
+    python -m benchmarks.stub_server --port 5000 --catalogue-port 5001
+
+gTTS sleeps for a fixed delay instead of calling Google. Translations go
+through the app's real TranslationEngine to a local stand-in for Google
+Translate's mobile page (``--translate-port``) that answers after a delay,
+so load tests exercise the servers' own concurrency and connection pooling. Without
+Tesseract, OCR is replaced by a lookup of the sample photo's expected
+medicine after ``--ocr-delay``. The catalogue is compiled from the in-code
+database into a temporary medicines.db for the root app.py.
+"""
+import argparse
+import hashlib
+import html
+import logging
+import os
+import signal
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from werkzeug.serving import make_server
+
+from benchmarks.samples import sample_paths, tesseract_available
+from benchmarks.stubs import SlowTTS
+
+
+def sample_ocr(seconds):
+    """Replacement for ``app.run_ocr`` that recognizes the bundled sample photos."""
+    expected = {}
+    for path, name in sample_paths():
+        with open(path, 'rb') as f:
+            expected[hashlib.sha256(f.read()).digest()] = f"{name} tablets IP"
+
+    def run_ocr(image_bytes):
+        time.sleep(seconds)
+        return expected.get(hashlib.sha256(image_bytes).digest(), '')
+    return run_ocr
+
+
+class TranslatePage(BaseHTTPRequestHandler):
+    """Answers ``GET /m?sl=..&tl=..&q=..`` like Google Translate's mobile page, with ``[tl] q``.
+
+    Each request takes ``delay`` plus ``per_char`` seconds per character of
+    ``q``; each new connection first waits ``connect_delay``, standing in for
+    the TCP and TLS handshakes to Google.
+    """
+
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like Google's servers
+    # Headers and body are separate writes; without this, delayed ACKs stall kept-alive connections
+    disable_nagle_algorithm = True
+    delay = 0.15
+    per_char = 0.0
+    connect_delay = 0.0
+    connections = 0
+    requests = 0
+
+    def setup(self):
+        TranslatePage.connections += 1
+        time.sleep(self.connect_delay)
+        super().setup()
+
+    def do_GET(self):
+        TranslatePage.requests += 1
+        query = parse_qs(urlparse(self.path).query)
+        text = query.get('q', [''])[0]
+        time.sleep(self.delay + self.per_char * len(text))
+        body = (f'<html><body><div class="result-container">[{query.get("tl", ["en"])[0]}] '
+                f'{html.escape(text)}</div></body></html>').encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/html; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def translate_server(host, port, delay, per_char=0.0, connect_delay=0.0):
+    """Return an unstarted stand-in for Google Translate; serve it with ``serve_forever``."""
+    handler = type('TranslatePage', (TranslatePage,), {'delay': delay, 'per_char': per_char,
+                                                        'connect_delay': connect_delay})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    return server
+
+
+def scan_app(args):
+    import app
+    app.gTTS = SlowTTS.with_delay(args.tts_delay)
+    app.translation_engine.url = f"http://{args.host}:{args.translate_port}/m"
+    app.OCR_CACHE_CONFIG['enabled'] = args.ocr_cache
+    if not tesseract_available():
+        app.run_ocr = sample_ocr(args.ocr_delay)
+    return app.app
+
+
+def catalogue_app(directory):
+    from benchmarks.bench_medicine_lookup import load_root_app
+    from medicine_database import MEDICINE_DATABASE
+    from medicines_db import build_medicines_db
+    path = os.path.join(directory, 'medicines.db')
+    build_medicines_db(MEDICINE_DATABASE, path)
+    return load_root_app(path).app
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the Mediscan APIs with stubbed Google services")
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=5000)
+    parser.add_argument('--catalogue-port', type=int, default=5001)
+    parser.add_argument('--ocr-delay', type=float, default=0.3, help="Seconds per stubbed OCR")
+    parser.add_argument('--translate-port', type=int, default=5009, help="Port of the Google Translate stand-in")
+    parser.add_argument('--translate-delay', type=float, default=0.15, help="Seconds per stubbed translation")
+    parser.add_argument('--tts-delay', type=float, default=0.4, help="Seconds per stubbed gTTS call")
+    parser.add_argument('--ocr-cache', action='store_true', help="Keep the perceptual-hash OCR cache on")
+    args = parser.parse_args()
+    # Stop cleanly (and remove the temporary catalogue) when a load test terminates us
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+
+    with tempfile.TemporaryDirectory(prefix='mediscan-stub-') as directory:
+        os.environ.setdefault('AUDIO_CACHE_DIR', os.path.join(directory, 'audio'))
+        os.environ.setdefault('TRANSLATION_CACHE_DB', os.path.join(directory, 'translations.db'))
+        servers = [translate_server(args.host, args.translate_port, args.translate_delay),
+                   make_server(args.host, args.port, scan_app(args), threaded=True),
+                   make_server(args.host, args.catalogue_port, catalogue_app(directory), threaded=True)]
+        logging.disable(logging.WARNING)
+        for server in servers:
+            threading.Thread(target=server.serve_forever, daemon=True).start()
+        print(f"scan API on http://{args.host}:{args.port}, catalogue on http://{args.host}:{args.catalogue_port}",
+              flush=True)
+        try:
+            threading.Event().wait()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            for server in servers:
+                server.shutdown()
+
+
+if __name__ == '__main__':
+    main()
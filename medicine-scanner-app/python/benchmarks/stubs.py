@@ -0,0 +1,94 @@
+"""Local, deterministic stand-ins for Tesseract, gTTS and Google Translate used by the benchmarks."""
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from ocr_pool import OCRPool
+from translation_engine import TranslationEngine
+
+
+def slow_ocr(text, seconds):
+    """Replacement for ``app.run_ocr`` returning ``text`` after ``seconds``."""
+    def run_ocr(*args, **kwargs):
+        time.sleep(seconds)
+        return text
+    return run_ocr
+
+
+class SlowTTS:
+    """Drop-in for ``gtts.gTTS`` that sleeps instead of calling Google."""
+
+    delay = 0.0
+
+    def __init__(self, text, lang='en', slow=False):
+        self.text = text
+        self.lang = lang
+        self.slow = slow
+
+    @classmethod
+    def with_delay(cls, seconds):
+        return type('SlowTTS', (cls,), {'delay': seconds})
+
+    def save(self, path):
+        time.sleep(self.delay)
+        with open(path, 'wb') as f:
+            f.write(b'ID3' + self.text.encode('utf-8'))
+
+    def stream(self):
+        """Yield one chunk per part gTTS would request, spreading ``delay`` across the parts."""
+        from gtts import gTTS
+        parts = gTTS(self.text, lang=self.lang, lang_check=False)._tokenize(self.text)
+        for index, part in enumerate(parts):
+            time.sleep(self.delay / len(parts))
+            yield (b'ID3' if index == 0 else b'') + part.encode('utf-8')
+
+
+class StubTranslationEngine(TranslationEngine):
+    """``TranslationEngine`` whose chunk requests sleep and return tagged text.
+
+    Chunking and the parallel fan-out are the real ones.
+    """
+
+    delay = 0.0
+
+    @classmethod
+    def with_delay(cls, seconds):
+        return type('StubTranslationEngine', (cls,), {'delay': seconds})
+
+    def translate_chunk(self, chunk, source, target):
+        if not chunk.strip():
+            return chunk
+        self._count_request()
+        time.sleep(self.delay)
+        return f"[{target}] {chunk}"
+
+
+def _read_nothing(image, psm=None):
+    return '', 0.0
+
+
+def _init_preprocess_only_worker(*init_args):
+    import logging
+    import ocr_pool
+    # Its warning that Tesseract can't start is expected here
+    logging.disable(logging.WARNING)
+    ocr_pool._init_worker(*init_args)
+    ocr_pool.recognize_words = _read_nothing
+
+
+class PreprocessOnlyPool(OCRPool):
+    """``OCRPool`` whose workers do the real decoding, preprocessing and rotation but skip Tesseract.
+
+    The stand-in reads no text, so every image runs the whole cascade.
+    """
+
+    def _get_executor(self):
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_preprocess_only_worker,
+                    initargs=self._init_args
+                )
+            return self._executor
@@ -0,0 +1,357 @@
+"""The medicine catalogue the scanner matches against, read from medicines.db.
+
+Only what the matchers index (``name`` and ``commonNames``) is loaded up
+front, into slotted MedicineRecord objects. Usage, warnings, dosage and
+side-effect texts and the precomputed per-language records stay in SQLite
+and are read when a scan matches a medicine.
+
+CatalogueStore holds the current Catalogue. When medicines.db is rebuilt it
+builds the new snapshot in the background and swaps the reference; scans
+that already took the old snapshot finish on it.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, deque
+from contextlib import contextmanager
+
+from fuzzy_matcher import FuzzyMedicineIndex
+from localization import LocalizedMedicine, precompute_localized
+from medicine_matcher import MedicineMatcher
+from medicines_db import LIST_FIELDS, TEXT_FIELDS
+
+logger = logging.getLogger(__name__)
+
+INDEX_FIELDS = ('name', 'commonNames')
+DETAIL_FIELDS = [field for field in TEXT_FIELDS + LIST_FIELDS if field not in INDEX_FIELDS]
+
+
+class MedicineRecord:
+    """A catalogue entry holding only the fields the matchers index.
+
+    Reads like a ``MEDICINE_DATABASE`` dict (``med['usage']``,
+    ``med.get('name_hi')``, ``'usage_hi' in med``); the other fields are
+    fetched from medicines.db on first use.
+    """
+
+    __slots__ = ('id', 'name', 'commonNames', '_source')
+
+    def __init__(self, medicine_id, name, common_names, source):
+        self.id = medicine_id
+        self.name = name
+        self.commonNames = common_names
+        self._source = source
+
+    def __getitem__(self, field):
+        if field in INDEX_FIELDS:
+            value = getattr(self, field)
+        else:
+            value = self._source.details(self.id).get(field)
+        if value is None:
+            raise KeyError(field)
+        return value
+
+    def get(self, field, default=None):
+        try:
+            return self[field]
+        except KeyError:
+            return default
+
+    def __contains__(self, field):
+        return self.get(field) is not None
+
+    def __repr__(self):
+        return f"MedicineRecord({self.id}, {self.name!r})"
+
+
+class LRUCache:
+    def __init__(self, max_entries):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            value = self._entries.get(key)
+            if value is not None:
+                self._entries.move_to_end(key)
+            return value
+
+    def put(self, key, value):
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def __len__(self):
+        return len(self._entries)
+
+
+class CatalogueFile:
+    """Lookups of the fields MedicineRecord leaves out, from one medicines.db file.
+
+    Its read-only connections are opened up front and stay pinned to that
+    file after a rebuild replaces it, so lookups by row id keep matching the
+    records the snapshot indexed.
+    """
+
+    def __init__(self, path, connections=4, cache_entries=4096):
+        self.path = path
+        self.closed = False
+        self._idle = queue.LifoQueue(maxsize=connections)
+        for _ in range(connections):
+            self._idle.put(sqlite3.connect(f"file:{path}?mode=ro", uri=True, check_same_thread=False))
+        self._details = LRUCache(cache_entries)
+        self._localized = LRUCache(cache_entries)
+
+    @contextmanager
+    def connection(self):
+        if self.closed:
+            raise sqlite3.ProgrammingError(f"Catalogue snapshot of {self.path} is closed")
+        conn = self._idle.get()
+        try:
+            yield conn
+        finally:
+            if self.closed:
+                conn.close()
+            else:
+                self._idle.put(conn)
+
+    def close(self):
+        """Close the connections; ones in use are closed when they are given back."""
+        self.closed = True
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+    def version(self):
+        with self.connection() as conn:
+            row = conn.execute("SELECT value FROM catalogue_meta WHERE key = 'version'").fetchone()
+        return row[0] if row else None
+
+    def records(self):
+        """Return ``{key: MedicineRecord}`` for every medicine, in catalogue order."""
+        medicines = {}
+        with self.connection() as conn:
+            for medicine_id, key, name, common_names in conn.execute(
+                    "SELECT id, key, name, commonNames FROM medicines ORDER BY id"):
+                aliases = tuple(json.loads(common_names)) if common_names else None
+                medicines[key] = MedicineRecord(medicine_id, name, aliases, self)
+        return medicines
+
+    def details(self, medicine_id):
+        """Return the non-index fields of one medicine."""
+        details = self._details.get(medicine_id)
+        if details is None:
+            with self.connection() as conn:
+                row = conn.execute(f"SELECT {', '.join(DETAIL_FIELDS)} FROM medicines WHERE id = ?",
+                                   (medicine_id,)).fetchone()
+            details = {}
+            for field, value in zip(DETAIL_FIELDS, row or ()):
+                if value is not None:
+                    details[field] = json.loads(value) if field in LIST_FIELDS else value
+            self._details.put(medicine_id, details)
+        return details
+
+    def localized(self, name, lang):
+        key = (name, lang)
+        record = self._localized.get(key)
+        if record is None:
+            try:
+                with self.connection() as conn:
+                    row = conn.execute("SELECT record FROM localized_medicines WHERE name = ? AND lang = ?",
+                                       key).fetchone()
+            except sqlite3.OperationalError:
+                # Built before localized records existed
+                row = None
+            # False marks a known miss so it isn't queried again
+            record = LocalizedMedicine(*json.loads(row[0])) if row else False
+            self._localized.put(key, record)
+        return record or None
+
+    def cached_details(self):
+        return len(self._details)
+
+
+class Catalogue:
+    """One immutable snapshot of the catalogue with its matchers."""
+
+    def __init__(self, medicines, version, fuzzy_config, source=None, localized=None):
+        self.medicines = medicines
+        self.version = version
+        self.source = source
+        self.loaded_at = time.time()
+        self._localized = localized
+        self.matcher = MedicineMatcher(medicines)
+        self.fuzzy_index = FuzzyMedicineIndex(
+            medicines,
+            max_distance=fuzzy_config['max_distance'],
+            prefix_length=fuzzy_config['prefix_length'],
+            min_token_length=fuzzy_config['min_token_length']
+        )
+
+    @classmethod
+    def open(cls, path, fuzzy_config, connections=4, cache_entries=4096):
+        """Load the index fields of every medicine in the medicines.db at ``path``."""
+        source = CatalogueFile(path, connections, cache_entries)
+        try:
+            return cls(source.records(), source.version(), fuzzy_config, source=source)
+        except Exception:
+            source.close()
+            raise
+
+    @classmethod
+    def from_database(cls, database, fuzzy_config, languages):
+        """Wrap an in-memory ``MEDICINE_DATABASE``-shaped dict."""
+        return cls(database, 'builtin', fuzzy_config, localized=precompute_localized(database, languages))
+
+    def close(self):
+        if self.source is not None:
+            self.source.close()
+
+    def localized(self, name, lang):
+        """Return the precomputed LocalizedMedicine for ``(name, lang)``, or None."""
+        if self.source is not None:
+            return self.source.localized(name, lang)
+        return self._localized.get((name, lang))
+
+    def stats(self):
+        return {
+            'version': self.version,
+            'path': self.source.path if self.source is not None else None,
+            'entries': len(self.medicines),
+            'loadedAt': self.loaded_at,
+            'cachedDetails': self.source.cached_details() if self.source is not None else 0
+        }
+
+
+class CatalogueStore:
+    """Holds the current Catalogue and replaces it when medicines.db changes.
+
+    ``current()`` loads the catalogue on first use. After that it checks
+    medicines.db's modification time at most every ``check_seconds`` and
+    reloads in a background thread, so requests keep using the old snapshot
+    until the new one is ready. A replaced snapshot is closed
+    ``RETIRE_SECONDS`` later. Without medicines.db, or when the first load
+    of it fails, ``fallback()`` supplies the catalogue.
+    """
+
+    # Scans take the current snapshot for one match, so this is ample
+    RETIRE_SECONDS = 30
+
+    def __init__(self, path, load, fallback, check_seconds=2.0):
+        self.path = path
+        self._load = load
+        self._fallback = fallback
+        self.check_seconds = check_seconds
+        self.reloads = 0
+        self.last_error = None
+        self.last_load_seconds = None
+        self._current = None
+        self._signature = None
+        self._next_check = 0.0
+        self._lock = threading.Lock()
+        self._check_lock = threading.Lock()
+        self._reloading = False
+        self._retired = deque()
+
+    def _file_signature(self):
+        try:
+            stat = os.stat(self.path)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size, stat.st_ino
+
+    def current(self):
+        catalogue = self._current
+        if catalogue is None:
+            return self.reload(force=False)
+        if self.check_seconds and time.monotonic() >= self._next_check:
+            with self._check_lock:
+                self._next_check = time.monotonic() + self.check_seconds
+                if self._reloading or self._file_signature() == self._signature:
+                    return catalogue
+                self._reloading = True
+            threading.Thread(target=self._reload_in_background, name='catalogue-reload', daemon=True).start()
+        return catalogue
+
+    def _reload_in_background(self):
+        try:
+            self.reload()
+        except Exception:
+            # Already logged; keep serving the previous snapshot
+            pass
+        finally:
+            self._reloading = False
+
+    def reload(self, force=True):
+        """Load medicines.db (or the fallback) and make it current; returns the new Catalogue.
+
+        A failed reload raises and leaves the current snapshot in place; a
+        failed first load falls back to ``fallback()``.
+        """
+        with self._lock:
+            if not force and self._current is not None:
+                return self._current
+            signature = self._file_signature()
+            start = time.perf_counter()
+            try:
+                if signature is None:
+                    logger.info("medicines.db not built, using the in-code MEDICINE_DATABASE")
+                    catalogue = self._fallback()
+                else:
+                    logger.info(f"Loading medicine catalogue from: {self.path}")
+                    catalogue = self._load(self.path)
+            except Exception as e:
+                self.last_error = str(e)
+                # Don't retry a broken file until it changes again
+                self._signature = signature
+                logger.error(f"Could not load medicine catalogue: {str(e)}")
+                if self._current is not None or signature is None:
+                    raise
+                # Nothing to keep serving (e.g. an empty medicines.db at startup)
+                logger.info("Using the in-code MEDICINE_DATABASE until medicines.db is rebuilt")
+                catalogue = self._fallback()
+            previous = self._current
+            self._current, self._signature = catalogue, signature
+            self.last_load_seconds = time.perf_counter() - start
+            if catalogue.source is not None or signature is None:
+                self.last_error = None
+            if previous is not None:
+                self.reloads += 1
+                logger.info(f"Medicine catalogue reloaded: {previous.version} -> {catalogue.version}, "
+                            f"{len(catalogue.medicines)} entries in {self.last_load_seconds:.2f}s")
+                self._retired.append(previous)
+                timer = threading.Timer(self.RETIRE_SECONDS, self._close_retired)
+                timer.daemon = True
+                timer.start()
+            return catalogue
+
+    def _close_retired(self):
+        """Close the oldest replaced snapshot, whose grace period is over.
+
+        Refcounting frees it once the last scan using it lets go.
+        """
+        self._retired.popleft().close()
+
+    @property
+    def loaded(self):
+        return self._current is not None
+
+    def stats(self):
+        catalogue = self._current
+        return {
+            **(catalogue.stats() if catalogue is not None else {'entries': 0, 'version': None}),
+            'loaded': catalogue is not None,
+            'reloads': self.reloads,
+            'reloading': self._reloading,
+            'lastLoadSeconds': round(self.last_load_seconds, 3) if self.last_load_seconds is not None else None,
+            'lastError': self.last_error
+        }
@@ -1,4 +1,5 @@
 import os
+import tempfile
 
 # Tesseract Configuration
 TESSERACT_CONFIG = {
@@ -7,9 +8,163 @@ TESSERACT_CONFIG = {
     'config': '--psm 6'  # Page segmentation mode: Assume a single uniform block of text
 }
 
+# Languages offered for translation, speech and precomputed medicine records
+SUPPORTED_LANGUAGES = {
+    'en': 'English',
+    'hi': 'Hindi',
+    'es': 'Spanish',
+    'fr': 'French',
+    'de': 'German',
+    'it': 'Italian',
+    'pt': 'Portuguese',
+    'ru': 'Russian',
+    'ja': 'Japanese',
+    'ko': 'Korean',
+    'zh': 'Chinese',
+    'ar': 'Arabic'
+}
+
+# Image preprocessing in front of Tesseract
+PREPROCESS_CONFIG = {
+    'enabled': True,
+    'max_side': 1600,  # Longest side after decoding/resizing; JPEGs are draft-decoded near this size
+    # Local-mean adaptive threshold. Off: Tesseract binarizes on its own, and on the
+    # sample photos this doubled OCR time with no gain in matches (bench_preprocess)
+    'binarize': False,
+    'threshold_radius': 15,
+    'threshold_offset': 10,  # How much darker than its neighbourhood a pixel must be to count as ink
+    'autocrop': False,  # Crop to the bounding box of detected ink (needs binarize)
+    'autocrop_padding': 20
+}
+
+# OCR worker processes for /api/scan
+OCR_POOL_CONFIG = {
+    'workers': int(os.environ.get('OCR_WORKERS', os.cpu_count() or 2)),
+    'queue_depth': int(os.environ.get('OCR_QUEUE_DEPTH', 16)),  # Waiting scans beyond the busy workers
+    'timeout_seconds': 20,  # Per-scan OCR deadline (the frontend gives up after 30s)
+    'retry_after_seconds': 2  # Sent with 503 when the queue is full
+}
+
+# Adaptive OCR: passes run in order until the matcher finds a catalogue name in the
+# text, so most labels cost one pass. Settings per pass: psm (replaces the --psm in
+# TESSERACT_CONFIG), rotate (degrees counterclockwise) and max_side (preprocessing
+# resolution). OCR_MAX_PASSES=1 keeps only the original single pass.
+OCR_CASCADE_CONFIG = {
+    'passes': [
+        {'psm': 6},  # Single uniform block: flat box labels
+        {'psm': 11},  # Sparse text: curved blister foil, scattered print
+        {'psm': 6, 'rotate': 90},  # Boxes photographed on their side
+        {'psm': 6, 'rotate': 270},
+        {'psm': 6, 'max_side': 2400},  # Small print on large photos, decoded at a higher resolution
+    ],
+    'max_passes': int(os.environ.get('OCR_MAX_PASSES', 5))
+}
+
+# OCR results keyed by perceptual hash, so repeat photos of the same box skip Tesseract.
+# dHash distances between different packages in the sample photos start at 17 bits.
+OCR_CACHE_CONFIG = {
+    'enabled': True,
+    'max_entries': 2048,
+    'hash_size': 8,  # 8 -> 64-bit hash
+    'max_distance': 6  # Hamming distance still counted as the same photo
+}
+
+# /api/scan/batch: images are spread over the OCR pool's workers
+BATCH_SCAN_CONFIG = {
+    'max_images': 32,
+    'timeout_seconds': 60,  # OCR budget for the whole batch; images not read by then get an error
+    'speech': False  # Default when the request does not say; intake desks rarely need audio
+}
+
+# Live camera scan over the /api/scan/stream WebSocket (asgi.py only)
+STREAM_SCAN_CONFIG = {
+    'confidence_threshold': 1.0,  # Lead over the runner-up: one exact name, or about two agreeing fuzzy frames
+    'passes_per_frame': 1,  # Cascade passes per frame; the next frame is a better retry than a rotated pass
+    'max_seconds': 20,  # Give up and tell the client to fall back to a still photo
+    'max_frame_bytes': 2 * 1024 * 1024
+}
+
+# Compiled catalogue shared with the root app.py (build with: python medicines_db.py)
+DATABASE_CONFIG = {
+    'path': os.environ.get('MEDICINES_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'medicines.db')),
+    'reload_check_seconds': float(os.environ.get('CATALOGUE_RELOAD_CHECK', 2)),  # 0 disables reloading on file change
+    'detail_cache_entries': 4096  # Usage/warnings/dosage records and localized records kept in memory
+}
+
+# Admin endpoints (/api/admin/...). Without a token they only accept requests from localhost.
+ADMIN_CONFIG = {
+    'token': os.environ.get('ADMIN_TOKEN', '')  # Sent as the X-Admin-Token header
+}
+
+# Fuzzy matching fallback for OCR misreads (e.g. "Amoxici11in", "Cetrizine")
+FUZZY_MATCH_CONFIG = {
+    'max_distance': 2,  # Maximum edit distance between an OCR token and a name
+    'prefix_length': 7,  # Only deletions of the first N characters are indexed
+    'min_token_length': 4,  # Shorter OCR tokens are never fuzzy matched
+    'min_similarity': 0.75,  # 1 - distance / length
+    'top_k': 5
+}
+
+# Generated speech cache, keyed by hash of (text, lang, slow)
+AUDIO_CACHE_CONFIG = {
+    'directory': os.environ.get('AUDIO_CACHE_DIR', os.path.join(tempfile.gettempdir(), 'mediscan-audio')),
+    'max_bytes': 256 * 1024 * 1024  # 256MB, least recently used files are evicted
+}
+
+# Background speech synthesis for /api/scan; clients poll /api/audio/<id>
+SPEECH_JOB_CONFIG = {
+    'async': True,  # False synthesizes inline before /api/scan responds
+    'workers': 4,
+    'max_pending': 64,  # Scans beyond this get no audio instead of queueing
+    'max_wait_seconds': 10  # Upper bound for /api/audio/<id>?wait=N long-polls
+}
+
+# Translation cache: in-process LRU in front of a persistent SQLite table
+TRANSLATION_CACHE_CONFIG = {
+    'path': os.environ.get('TRANSLATION_CACHE_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'translation_cache.db')),
+    'memory_entries': 4096,
+    'max_entries': 200000,
+    'ttl_seconds': 30 * 24 * 3600  # 30 days
+}
+
+# Google Translate client used by app.py, asgi.py and the medicines.db builder
+TRANSLATION_ENGINE_CONFIG = {
+    'url': os.environ.get('TRANSLATE_URL', 'https://translate.google.com/m'),
+    'chunk_chars': int(os.environ.get('TRANSLATE_CHUNK_CHARS', 1500)),  # Split longer texts at sentence ends (max 4999)
+    'max_parallel': int(os.environ.get('TRANSLATE_MAX_PARALLEL', 8)),  # Chunk requests in flight across the process
+    'pool_connections': 16,  # Keep-alive connections kept open to Google
+    'timeout_seconds': 10
+}
+
+# Server-side history of /api/scan results, written to SQLite in the background
+SCAN_HISTORY_CONFIG = {
+    'enabled': os.environ.get('SCAN_HISTORY', '1') == '1',
+    'path': os.environ.get('SCAN_HISTORY_DB', os.path.join(os.path.dirname(os.path.abspath(__file__)), 'scan_history.db')),
+    'max_queue': 10000,  # Scans waiting to be written; past this they spill to <path>.spill
+    'spill': True,  # False drops scans that don't fit in the queue
+    'batch_size': 500,  # Rows per transaction
+    'flush_seconds': 1.0
+}
+
+# /api/metrics and the optional Server-Timing response header
+METRICS_CONFIG = {
+    'server_timing': os.environ.get('SERVER_TIMING', '') == '1'  # Adds per-stage durations to every response
+}
+
+# Production serving with asgi.py (uvicorn asgi:application)
+ASYNC_SERVING_CONFIG = {
+    'max_connections': 100,  # Pooled HTTP connections shared by all upstream calls
+    'translate_concurrency': int(os.environ.get('TRANSLATE_CONCURRENCY', 16)),  # Google Translate calls in flight
+    'tts_concurrency': int(os.environ.get('TTS_CONCURRENCY', 8)),  # gTTS calls in flight
+    'tts_verify_tls': os.environ.get('TTS_VERIFY_TLS', '1') == '1',  # 0 skips certificate checks for the TTS host only, as gTTS does
+    'upstream_timeout_seconds': 10,
+    # Threads running the Flask handlers; requests beyond this wait in a2wsgi's queue
+    'wsgi_workers': int(os.environ.get('WSGI_WORKERS', 32))
+}
+
 # Flask Configuration
 FLASK_CONFIG = {
-    'DEBUG': True,
+    'DEBUG': os.environ.get('FLASK_DEBUG', '1') == '1',  # Development server only; asgi.py ignores it
     'PORT': 5000,
     'HOST': '0.0.0.0',
     'SECRET_KEY': os.urandom(24),
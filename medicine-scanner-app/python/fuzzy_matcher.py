@@ -0,0 +1,181 @@
+import gc
+import re
+
+# Characters Tesseract commonly reads in place of letters on medicine labels.
+OCR_CONFUSIONS = str.maketrans({'0': 'o', '1': 'l', '|': 'l', '5': 's', '8': 'b', '@': 'a', '$': 's'})
+TOKEN_PATTERN = re.compile(r"[a-z0-9|@$]+")
+
+
+def normalize_ocr_token(token):
+    return token.lower().translate(OCR_CONFUSIONS)
+
+
+def edit_distance(a, b, max_distance):
+    """Optimal string alignment distance, or ``max_distance + 1`` once exceeded.
+
+    Only the diagonal band of width ``max_distance`` is evaluated.
+    """
+    if a == b:
+        return 0
+    len_a, len_b = len(a), len(b)
+    if abs(len_a - len_b) > max_distance:
+        return max_distance + 1
+    too_far = max_distance + 1
+    previous_previous = None
+    previous = [j if j <= max_distance else too_far for j in range(len_b + 1)]
+    for i in range(1, len_a + 1):
+        current = [too_far] * (len_b + 1)
+        if i <= max_distance:
+            current[0] = i
+        row_min = current[0]
+        char_a = a[i - 1]
+        for j in range(max(1, i - max_distance), min(len_b, i + max_distance) + 1):
+            value = previous[j - 1] + (char_a != b[j - 1])
+            if previous[j] + 1 < value:
+                value = previous[j] + 1
+            if current[j - 1] + 1 < value:
+                value = current[j - 1] + 1
+            if (previous_previous is not None and j > 1 and char_a == b[j - 2]
+                    and a[i - 2] == b[j - 1] and previous_previous[j - 2] + 1 < value):
+                value = previous_previous[j - 2] + 1
+            current[j] = value
+            if value < row_min:
+                row_min = value
+        if row_min > max_distance:
+            return too_far
+        previous_previous, previous = previous, current
+    return min(previous[len_b], too_far)
+
+
+def _deletes(word, max_distance):
+    """``word`` and every string made by deleting up to ``max_distance`` of its characters."""
+    results = {word}
+    # (string, position of its last deletion): deleting only at or after that
+    # position makes each combination of positions once instead of d! times
+    frontier = [(word, 0)]
+    for _ in range(max_distance):
+        next_frontier = []
+        for w, start in frontier:
+            if len(w) > 1:
+                for i in range(start, len(w)):
+                    deleted = w[:i] + w[i + 1:]
+                    results.add(deleted)
+                    next_frontier.append((deleted, i))
+        frontier = next_frontier
+    return results
+
+
+class FuzzyMedicineIndex:
+    """SymSpell-style deletion dictionary over medicine names and aliases.
+
+    Only deletions of each label's first ``prefix_length`` characters are
+    stored, which keeps the index small while a lookup stays a handful of
+    dictionary probes plus a bounded edit-distance check per candidate.
+    """
+
+    def __init__(self, database, max_distance=2, prefix_length=7, min_token_length=4):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.min_token_length = min_token_length
+        # normalized label -> [(medicine, original label), ...] in database order
+        self.labels = {}
+        self._rank = {}
+        self._deletes = {}
+        # Millions of small strings/lists are allocated below; cyclic GC passes
+        # over them only slow the build down.
+        gc_was_enabled = gc.isenabled()
+        gc.disable()
+        try:
+            self._build(database)
+        finally:
+            if gc_was_enabled:
+                gc.enable()
+
+    def _build(self, database):
+        max_distance, prefix_length = self.max_distance, self.prefix_length
+        for med in database.values():
+            names = ([med['name']] if med.get('name') else []) + [a for a in med.get('commonNames', []) if a]
+            for label in names:
+                key = normalize_ocr_token(label)
+                if key not in self.labels:
+                    self.labels[key] = []
+                    self._rank[key] = len(self._rank)
+                    for deleted in _deletes(key[:prefix_length], max_distance):
+                        # Most deletions belong to a single label; keep those as a
+                        # bare string instead of a one-element list.
+                        existing = self._deletes.get(deleted)
+                        if existing is None:
+                            self._deletes[deleted] = key
+                        elif isinstance(existing, str):
+                            self._deletes[deleted] = [existing, key]
+                        else:
+                            existing.append(key)
+                self.labels[key].append((med, label))
+
+    def lookup(self, token, top_k=5, min_similarity=0.0):
+        """Return up to ``top_k`` ``(similarity, distance, medicine, label)`` tuples.
+
+        Only labels with at least ``min_similarity`` are looked for, so short
+        tokens probe fewer deletions and check fewer candidates.
+        """
+        key = normalize_ocr_token(token)
+        if len(key) < self.min_token_length:
+            return []
+        max_distance = self._distance_bound(len(key), min_similarity)
+
+        seen = set()
+        results = []
+        # Each edit costs at most one deletion on the token's side
+        for deleted in _deletes(key[:self.prefix_length], max_distance):
+            candidates = self._deletes.get(deleted, ())
+            if isinstance(candidates, str):
+                candidates = (candidates,)
+            for candidate in candidates:
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                longest = max(len(key), len(candidate))
+                # The length difference alone may already be too many edits
+                if 1 - abs(len(key) - len(candidate)) / longest < min_similarity:
+                    continue
+                distance = edit_distance(key, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                similarity = 1 - distance / longest
+                if similarity < min_similarity:
+                    continue
+                med, label = self.labels[candidate][0]
+                results.append((similarity, distance, self._rank[candidate], med, label))
+
+        results.sort(key=lambda r: (-r[0], r[1], r[2]))
+        return [(similarity, distance, med, label) for similarity, distance, _, med, label in results[:top_k]]
+
+    def _distance_bound(self, length, min_similarity):
+        """Most edits a label can be from a ``length``-character token and still reach ``min_similarity``."""
+        if min_similarity <= 0:
+            return self.max_distance
+        # d <= (1 - s) * max(length, length + d)  =>  d <= (1 - s) * length / s
+        return min(self.max_distance, int((1 - min_similarity) * length / min_similarity + 1e-9))
+
+    def best_match(self, lower_text, min_similarity=0.75, top_k=5):
+        """Fallback for ``extract_medicine_info`` when no exact label occurs.
+
+        Returns ``(medicine, score, matched_names)`` shaped like
+        ``MedicineMatcher.best_match``; the score is the exact-match score
+        weighted by the edit similarity of the token that matched.
+        """
+        if not lower_text:
+            return None, 0, []
+
+        best_match = None
+        best_score = 0
+        matched_names = []
+        for token in dict.fromkeys(TOKEN_PATTERN.findall(lower_text)):
+            if token.isdigit():
+                continue
+            for similarity, _, med, label in self.lookup(token, top_k, min_similarity):
+                score = similarity * len(label) / len(lower_text)
+                if score > best_score:
+                    best_match, best_score = med, score
+                    matched_names = [label]
+        return best_match, best_score, matched_names
@@ -0,0 +1,39 @@
+"""Deferred construction of heavy clients.
+
+``app.gTTS`` is a LazyObject stand-in, so importing the app doesn't import
+gTTS. The real object is created the first time it is called or one of its
+attributes is used, or earlier by the warmup.
+"""
+import importlib
+import threading
+
+
+class LazyObject:
+    """Stands in for ``factory()``, creating it on first call or attribute access."""
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._value = None
+        self._lock = threading.Lock()
+
+    def resolve(self):
+        if self._value is None:
+            with self._lock:
+                if self._value is None:
+                    self._value = self._factory()
+        return self._value
+
+    @property
+    def loaded(self):
+        return self._value is not None
+
+    def __getattr__(self, name):
+        return getattr(self.resolve(), name)
+
+    def __call__(self, *args, **kwargs):
+        return self.resolve()(*args, **kwargs)
+
+
+def lazy_import(module, name):
+    """LazyObject for ``module.name``, imported on first use."""
+    return LazyObject(lambda: getattr(importlib.import_module(module), name))
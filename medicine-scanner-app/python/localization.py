@@ -0,0 +1,93 @@
+"""Per-language medicine records precomputed at build time.
+
+``python medicines_db.py --localize`` translates every catalogue entry into
+each of SUPPORTED_LANGUAGES and stores the results in medicines.db, so a scan
+in any language is a dictionary lookup instead of live translation calls.
+"""
+import json
+import logging
+from typing import NamedTuple
+
+logger = logging.getLogger(__name__)
+
+FIELDS = ['name', 'usage', 'warnings', 'dosage', 'sideEffects']
+
+SPEECH_LABELS = {
+    'en': ['Medicine', 'Usage', 'Warnings', 'Dosage', 'Side Effects'],
+    'hi': ['दवा का नाम', 'उपयोग', 'चेतावनी', 'खुराक', 'दुष्प्रभाव'],
+}
+
+# deep_translator spells a few language codes differently
+TRANSLATOR_LANG_CODES = {'zh': 'zh-CN'}
+
+
+class LocalizedMedicine(NamedTuple):
+    name: str
+    usage: str
+    warnings: str
+    dosage: str
+    sideEffects: str
+    speech: str
+
+    def display(self):
+        return {field: getattr(self, field) for field in FIELDS}
+
+
+def speech_text(labels, values):
+    return ' '.join(f"{label}: {value}" for label, value in zip(labels, values))
+
+
+def localize_medicine(med, lang, labels, translate=None):
+    """Build the record for one language, or None if it needs a translation we cannot make."""
+    values = []
+    for field in FIELDS:
+        if lang == 'en':
+            values.append(med[field])
+        elif f'{field}_{lang}' in med:
+            values.append(med[f'{field}_{lang}'])
+        elif translate is None:
+            return None
+        else:
+            values.append(translate(med[field], lang))
+    return LocalizedMedicine(*values, speech_text(labels, values))
+
+
+def precompute_localized(database, languages, translate=None):
+    """Return ``{(name, lang): LocalizedMedicine}`` for every entry and language.
+
+    Without ``translate`` only records that need no translation (English and
+    fully translated fields such as ``usage_hi``) are produced.
+    """
+    records = {}
+    for lang in languages:
+        labels = SPEECH_LABELS.get(lang)
+        if labels is None:
+            if translate is None:
+                continue
+            labels = [translate(label, lang) for label in SPEECH_LABELS['en']]
+        for med in database.values():
+            if not all(med.get(field) for field in FIELDS):
+                continue
+            try:
+                record = localize_medicine(med, lang, labels, translate)
+            except Exception as e:
+                logger.error(f"Could not localize {med['name']} into {lang}: {str(e)}")
+                continue
+            if record is not None:
+                records[(med['name'], lang)] = record
+    return records
+
+
+def write_localized(conn, records):
+    conn.execute("""
+    CREATE TABLE IF NOT EXISTS localized_medicines (
+        name TEXT NOT NULL,
+        lang TEXT NOT NULL,
+        record TEXT NOT NULL,
+        PRIMARY KEY (name, lang)
+    ) WITHOUT ROWID""")
+    conn.executemany(
+        "INSERT OR REPLACE INTO localized_medicines VALUES (?, ?, ?)",
+        ((name, lang, json.dumps(list(record), ensure_ascii=False)) for (name, lang), record in records.items())
+    )
+
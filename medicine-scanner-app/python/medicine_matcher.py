@@ -0,0 +1,86 @@
+from collections import deque
+
+
+class MedicineMatcher:
+    """Aho-Corasick automaton over every medicine name and commonNames alias.
+
+    Built once at startup; a scan walks the OCR text a single time no matter
+    how many entries the database holds.
+    """
+
+    def __init__(self, database):
+        self.database = database
+        # Every (medicine, label) pair in the same order the old linear scan
+        # visited them, so best-score ties resolve exactly as before.
+        self.candidates = []
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        self._build(database)
+
+    def _build(self, database):
+        goto, fail, out = self._goto, self._fail, self._out
+        for med in database.values():
+            labels = []
+            if med.get('name'):
+                labels.append(med['name'])
+            labels.extend(alias for alias in med.get('commonNames', []) if alias)
+            for label in labels:
+                candidate_id = len(self.candidates)
+                self.candidates.append((med, label))
+                node = 0
+                for char in label.lower():
+                    edges = goto[node]
+                    nxt = edges.get(char)
+                    if nxt is None:
+                        nxt = edges[char] = len(goto)
+                        goto.append({})
+                        out.append(())
+                    node = nxt
+                out[node] += (candidate_id,)
+
+        fail.extend([0] * (len(goto) - 1))
+        queue = deque(goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in goto[node].items():
+                queue.append(child)
+                fallback = fail[node]
+                while fallback and char not in goto[fallback]:
+                    fallback = fail[fallback]
+                fail[child] = suffix = goto[fallback].get(char, 0)
+                if out[suffix]:
+                    out[child] += out[suffix]
+
+    def find_all(self, lower_text):
+        """Return the ids of every candidate whose label occurs in ``lower_text``."""
+        goto, fail, out = self._goto, self._fail, self._out
+        hits = set()
+        node = 0
+        for char in lower_text:
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if out[node]:
+                hits.update(out[node])
+        return hits
+
+    def best_match(self, lower_text):
+        """Return ``(medicine, score, matched_names)`` for the OCR text.
+
+        Keeps the original semantics: score is label length over text length,
+        and ``matched_names`` lists every label that improved the best score.
+        """
+        if not lower_text:
+            return None, 0, []
+
+        best_match = None
+        best_score = 0
+        matched_names = []
+        for candidate_id in sorted(self.find_all(lower_text)):
+            med, label = self.candidates[candidate_id]
+            score = len(label) / len(lower_text)
+            if score > best_score:
+                best_match, best_score = med, score
+                matched_names.append(label)
+        return best_match, best_score, matched_names
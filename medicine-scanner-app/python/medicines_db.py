@@ -0,0 +1,228 @@
+"""Compile the medicine catalogue into ``medicines.db``.
+
+Both servers read the same artifact: the root ``app.py`` queries it directly
+and ``python/app.py`` loads it into memory at startup. Build it with::
+
+    python medicines_db.py                       # from MEDICINE_DATABASE
+    python medicines_db.py formulary.json -o ../medicines.db
+    python medicines_db.py formulary.csv
+    python medicines_db.py --localize           # also translate into every language
+"""
+import argparse
+import csv
+import hashlib
+import json
+import os
+import sqlite3
+import time
+
+from config import DATABASE_CONFIG, SUPPORTED_LANGUAGES, TRANSLATION_CACHE_CONFIG, TRANSLATION_ENGINE_CONFIG
+from localization import precompute_localized, write_localized
+
+TEXT_FIELDS = ['name', 'name_hi', 'usage', 'usage_hi', 'warnings', 'warnings_hi',
+               'dosage', 'dosage_hi', 'sideEffects', 'sideEffects_hi']
+LIST_FIELDS = ['commonNames', 'commonNames_hi']
+SEARCH_COLUMNS = ['name', 'name_hi', 'commonNames', 'commonNames_hi']
+
+SCHEMA = f"""
+CREATE TABLE medicines (
+    id INTEGER PRIMARY KEY,
+    key TEXT NOT NULL UNIQUE,
+    {', '.join(f'{field} TEXT' for field in TEXT_FIELDS + LIST_FIELDS)},
+    name_lower TEXT,
+    name_hi_lower TEXT
+);
+CREATE TABLE medicine_aliases (
+    medicine_id INTEGER NOT NULL REFERENCES medicines(id),
+    lang TEXT NOT NULL,
+    alias TEXT NOT NULL,
+    alias_lower TEXT NOT NULL
+);
+CREATE TABLE catalogue_meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+CREATE VIRTUAL TABLE medicines_fts USING fts5(
+    {', '.join(SEARCH_COLUMNS)}, content='medicines', content_rowid='id', tokenize='trigram'
+);
+"""
+
+INDEXES = """
+CREATE INDEX idx_medicines_name_lower ON medicines(name_lower);
+CREATE INDEX idx_medicines_name_hi_lower ON medicines(name_hi_lower);
+CREATE INDEX idx_medicine_aliases_alias_lower ON medicine_aliases(alias_lower);
+CREATE INDEX idx_medicine_aliases_medicine_id ON medicine_aliases(medicine_id);
+INSERT INTO medicines_fts(medicines_fts) VALUES ('rebuild');
+"""
+
+
+def read_source(path):
+    """Return ``{key: record}`` from the in-code catalogue or a JSON/CSV file."""
+    if path is None:
+        from medicine_database import MEDICINE_DATABASE
+        return MEDICINE_DATABASE
+
+    if path.endswith('.json'):
+        with open(path, encoding='utf-8') as f:
+            data = json.load(f)
+        if isinstance(data, list):
+            data = {record['name'].lower(): record for record in data}
+        return data
+
+    if path.endswith('.csv'):
+        records = {}
+        with open(path, encoding='utf-8', newline='') as f:
+            for row in csv.DictReader(f):
+                record = {k: v for k, v in row.items() if v and k != 'key'}
+                for field in LIST_FIELDS:
+                    if field in record:
+                        value = record[field]
+                        record[field] = json.loads(value) if value.startswith('[') else value.split('|')
+                records[row.get('key') or row['name'].lower()] = record
+        return records
+
+    raise ValueError(f"Unsupported catalogue format: {path}")
+
+
+def _rows(database, digest):
+    for medicine_id, (key, med) in enumerate(database.items(), start=1):
+        values = [med.get(field) for field in TEXT_FIELDS]
+        values += [json.dumps(med[field], ensure_ascii=False) if field in med else None for field in LIST_FIELDS]
+        row = (medicine_id, key, *values,
+               med['name'].lower() if med.get('name') else None,
+               med['name_hi'].lower() if med.get('name_hi') else None)
+        digest.update(repr(row).encode('utf-8'))
+        yield row
+
+
+def _aliases(database):
+    for medicine_id, med in enumerate(database.values(), start=1):
+        for field, lang in (('commonNames', 'en'), ('commonNames_hi', 'hi')):
+            for alias in med.get(field, []):
+                if alias:
+                    yield medicine_id, lang, alias, alias.lower()
+
+
+def build_medicines_db(database, output, localized=None):
+    """Write ``database`` to ``output`` in one transaction and swap it in atomically.
+
+    ``localized`` holds the precomputed per-language records; by default only
+    those that need no translation are stored. Returns the catalogue version,
+    a hash of the loaded rows.
+    """
+    if localized is None:
+        localized = precompute_localized(database, SUPPORTED_LANGUAGES)
+    tmp_path = f"{output}.tmp"
+    if os.path.exists(tmp_path):
+        os.remove(tmp_path)
+
+    conn = sqlite3.connect(tmp_path, isolation_level=None)
+    try:
+        # The file is private until os.replace, so durability is not needed yet.
+        conn.execute("PRAGMA journal_mode=OFF")
+        conn.execute("PRAGMA synchronous=OFF")
+        conn.execute("PRAGMA temp_store=MEMORY")
+        conn.execute("PRAGMA cache_size=-262144")
+        conn.execute("BEGIN")
+        for statement in SCHEMA.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        columns = ['id', 'key'] + TEXT_FIELDS + LIST_FIELDS + ['name_lower', 'name_hi_lower']
+        digest = hashlib.sha256()
+        conn.executemany(
+            f"INSERT INTO medicines ({', '.join(columns)}) VALUES ({', '.join('?' * len(columns))})",
+            _rows(database, digest)
+        )
+        conn.executemany("INSERT INTO medicine_aliases VALUES (?, ?, ?, ?)", _aliases(database))
+        for statement in INDEXES.split(';'):
+            if statement.strip():
+                conn.execute(statement)
+        write_localized(conn, localized)
+        for key in sorted(localized):
+            digest.update(repr((key, tuple(localized[key]))).encode('utf-8'))
+        version = digest.hexdigest()[:16]
+        conn.executemany("INSERT INTO catalogue_meta VALUES (?, ?)", [
+            ('version', version),
+            ('built_at', str(int(time.time()))),
+            ('rows', str(len(database)))
+        ])
+        conn.execute("COMMIT")
+        conn.execute("PRAGMA journal_mode=DELETE")
+    finally:
+        conn.close()
+
+    os.replace(tmp_path, output)
+    return version
+
+
+def load_medicine_database(path):
+    """Read ``medicines.db`` back into the ``MEDICINE_DATABASE`` dict shape.
+
+    Missing columns are left out of each record rather than set to None, so
+    ``record.get('usage_hi', ...)`` fallbacks behave as with the in-code dict.
+    """
+    conn = sqlite3.connect(f"file:{path}?mode=ro", uri=True)
+    try:
+        columns = TEXT_FIELDS + LIST_FIELDS
+        database = {}
+        for key, *values in conn.execute(f"SELECT key, {', '.join(columns)} FROM medicines ORDER BY id"):
+            record = {}
+            for field, value in zip(columns, values):
+                if value is None:
+                    continue
+                record[field] = json.loads(value) if field in LIST_FIELDS else value
+            database[key] = record
+        return database
+    finally:
+        conn.close()
+
+
+def cached_translate():
+    """English -> lang translation through the persistent translation cache."""
+    from translation_cache import TranslationCache
+    from translation_engine import TranslationEngine
+
+    cache = TranslationCache(
+        TRANSLATION_CACHE_CONFIG['path'],
+        memory_entries=TRANSLATION_CACHE_CONFIG['memory_entries'],
+        max_entries=TRANSLATION_CACHE_CONFIG['max_entries'],
+        ttl_seconds=TRANSLATION_CACHE_CONFIG['ttl_seconds']
+    )
+    engine = TranslationEngine(
+        url=TRANSLATION_ENGINE_CONFIG['url'],
+        chunk_chars=TRANSLATION_ENGINE_CONFIG['chunk_chars'],
+        max_parallel=TRANSLATION_ENGINE_CONFIG['max_parallel'],
+        pool_connections=TRANSLATION_ENGINE_CONFIG['pool_connections'],
+        timeout=TRANSLATION_ENGINE_CONFIG['timeout_seconds']
+    )
+
+    def translate(text, lang):
+        cached = cache.get(text, 'en', lang)
+        if cached is not None:
+            return cached
+        translated = engine.translate(text, 'en', lang)
+        cache.put(text, 'en', lang, translated)
+        return translated
+
+    return translate
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile the medicine catalogue into medicines.db")
+    parser.add_argument('source', nargs='?', help="JSON or CSV formulary (default: MEDICINE_DATABASE)")
+    parser.add_argument('-o', '--output', default=DATABASE_CONFIG['path'], help="Output database path")
+    parser.add_argument('--localize', action='store_true',
+                        help="Translate every medicine into all SUPPORTED_LANGUAGES (needs network on first run)")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    database = read_source(args.source)
+    translate = cached_translate() if args.localize else None
+    localized = precompute_localized(database, SUPPORTED_LANGUAGES, translate)
+    version = build_medicines_db(database, args.output, localized)
+    print(f"Built {args.output}: {len(database)} medicines, {len(localized)} localized records, "
+          f"version {version}, {time.perf_counter() - start:.2f}s")
+
+
+if __name__ == '__main__':
+    main()
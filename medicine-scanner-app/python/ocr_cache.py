@@ -0,0 +1,123 @@
+import io
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+
+def perceptual_hash(image_bytes, hash_size=8):
+    """dHash of an image: one bit per horizontally adjacent pixel pair of a tiny grayscale thumbnail.
+
+    Re-encoding, small shifts and lighting changes flip only a few bits, so
+    photos of the same packaging land within a small Hamming distance.
+    """
+    image = Image.open(io.BytesIO(image_bytes))
+    if image.format == 'JPEG':
+        # Only a thumbnail is needed; let libjpeg decode at 1/8 scale
+        image.draft('L', (hash_size * 8, hash_size * 8))
+    image = ImageOps.exif_transpose(image).convert('L').resize((hash_size + 1, hash_size), Image.BILINEAR)
+    pixels = image.tobytes()
+    value = 0
+    for row in range(hash_size):
+        offset = row * (hash_size + 1)
+        for col in range(hash_size):
+            value = (value << 1) | (pixels[offset + col] > pixels[offset + col + 1])
+    return value
+
+
+def hamming_distance(a, b):
+    return bin(a ^ b).count('1')
+
+
+class OCRResultCache:
+    """LRU of OCR text keyed by perceptual image hash.
+
+    A lookup hits when a cached hash is within ``max_distance`` bits of the
+    query, so a second photo of the same box skips Tesseract. Entries remember
+    how long their OCR took, which is reported as time saved on each hit.
+
+    Hashes are indexed by ``max_distance + 1`` bit bands. Two hashes at most
+    ``max_distance`` bits apart must agree on at least one band, so a lookup
+    only measures the distance to hashes sharing a band with the query
+    instead of scanning every entry.
+    """
+
+    def __init__(self, max_entries, max_distance, hash_bits=64):
+        self.max_entries = max_entries
+        self.max_distance = max_distance
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        count = max(1, min(max_distance + 1, hash_bits))
+        # (shift, mask) per band; widths differ by at most one bit
+        self._bands = []
+        shift = 0
+        for band in range(count):
+            width = hash_bits // count + (band < hash_bits % count)
+            self._bands.append((shift, (1 << width) - 1))
+            shift += width
+        self._band_index = [{} for _ in self._bands]
+
+    def _band_keys(self, image_hash):
+        return [(image_hash >> shift) & mask for shift, mask in self._bands]
+
+    def _index(self, image_hash):
+        for index, key in zip(self._band_index, self._band_keys(image_hash)):
+            index.setdefault(key, set()).add(image_hash)
+
+    def _unindex(self, image_hash):
+        for index, key in zip(self._band_index, self._band_keys(image_hash)):
+            hashes = index[key]
+            hashes.discard(image_hash)
+            if not hashes:
+                del index[key]
+
+    def get(self, image_hash):
+        with self._lock:
+            best, best_distance = None, self.max_distance + 1
+            if image_hash in self._entries:
+                best, best_distance = image_hash, 0
+            else:
+                for index, key in zip(self._band_index, self._band_keys(image_hash)):
+                    for cached_hash in index.get(key, ()):
+                        distance = hamming_distance(image_hash, cached_hash)
+                        if distance < best_distance:
+                            best, best_distance = cached_hash, distance
+            if best is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            self._entries.move_to_end(best)
+            text, seconds = self._entries[best]
+            self.seconds_saved += seconds
+            return text
+
+    def put(self, image_hash, text, seconds):
+        with self._lock:
+            if image_hash not in self._entries:
+                self._index(image_hash)
+            self._entries[image_hash] = (text, seconds)
+            self._entries.move_to_end(image_hash)
+            while len(self._entries) > self.max_entries:
+                evicted, _ = self._entries.popitem(last=False)
+                self._unindex(evicted)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._band_index = [{} for _ in self._bands]
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'entries': len(self._entries),
+                'maxEntries': self.max_entries,
+                'maxDistance': self.max_distance,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hitRate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'secondsSaved': round(self.seconds_saved, 3)
+            }
@@ -0,0 +1,453 @@
+"""Long-lived OCR worker processes with a bounded submission queue.
+
+Each worker initializes Tesseract once. With ``tesserocr`` installed the
+engine stays loaded in the worker between requests; otherwise the worker
+falls back to ``pytesseract``, which still spawns a ``tesseract`` process per
+image but never more than ``workers`` at a time.
+
+Scans go through a cascade of passes (page segmentation mode, rotation,
+resolution). Each pass is one job, and the caller's ``accept`` check on its
+text decides whether the next pass runs at all. Only the first pass at a
+resolution gets the upload's bytes; it sends back the decoded, preprocessed
+image and later passes at that resolution get that image instead.
+"""
+import asyncio
+import hashlib
+import io
+import logging
+import multiprocessing
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, TimeoutError, wait
+from concurrent.futures.process import BrokenProcessPool
+
+logger = logging.getLogger(__name__)
+
+_engine = None
+_engine_config = None
+_preprocess_config = None
+# (digest, max_side, image) of the last upload, so its later passes skip decoding
+_prepared = None
+
+
+class OCRQueueFull(Exception):
+    pass
+
+
+class OCRTimeout(Exception):
+    pass
+
+
+def _page_seg_mode(config):
+    match = re.search(r'--psm\s+(\d+)', config or '')
+    return int(match.group(1)) if match else None
+
+
+def _with_page_seg_mode(config, psm):
+    if _page_seg_mode(config) is None:
+        return f"{config} --psm {psm}".strip()
+    return re.sub(r'--psm\s+\d+', f'--psm {psm}', config)
+
+
+def _init_worker(tesseract_cmd, lang, config, preprocess_config):
+    global _engine, _engine_config, _preprocess_config
+    import pytesseract
+    if tesseract_cmd:
+        pytesseract.pytesseract.tesseract_cmd = tesseract_cmd
+    _engine_config = (lang, config)
+    _preprocess_config = preprocess_config
+    try:
+        import tesserocr
+    except ImportError:
+        return
+    try:
+        _engine = tesserocr.PyTessBaseAPI(lang=lang)
+        psm = _page_seg_mode(config)
+        if psm is not None:
+            _engine.SetPageSegMode(psm)
+    except Exception as e:
+        logger.warning(f"tesserocr unavailable in OCR worker, using pytesseract: {str(e)}")
+        _engine = None
+
+
+def recognize_words(image, psm=None):
+    """OCR a PIL image; returns ``(text, mean word confidence from 0 to 100)``."""
+    lang, config = _engine_config
+    psm = psm if psm is not None else _page_seg_mode(config)
+    if _engine is not None:
+        if psm is not None:
+            _engine.SetPageSegMode(psm)
+        _engine.SetImage(image)
+        return _engine.GetUTF8Text(), _engine.MeanTextConf()
+    import pytesseract
+    if psm is not None:
+        config = _with_page_seg_mode(config, psm)
+    data = pytesseract.image_to_data(image, lang=lang, config=config, output_type=pytesseract.Output.DICT)
+    lines = {}
+    confidences = []
+    for i, word in enumerate(data['text']):
+        word = word.strip()
+        confidence = float(data['conf'][i])
+        # Rows for blocks, paragraphs and lines carry a confidence of -1
+        if not word or confidence < 0:
+            continue
+        lines.setdefault((data['block_num'][i], data['par_num'][i], data['line_num'][i]), []).append(word)
+        confidences.append(confidence)
+    text = '\n'.join(' '.join(words) for words in lines.values())
+    return text, sum(confidences) / len(confidences) if confidences else 0.0
+
+
+def _prepare(image_bytes, max_side=None):
+    global _prepared
+    from preprocess import preprocess_image
+    digest = hashlib.blake2b(image_bytes, digest_size=16).digest()
+    if _prepared is not None and _prepared[:2] == (digest, max_side):
+        return _prepared[2]
+    config = _preprocess_config if max_side is None else dict(_preprocess_config, max_side=max_side)
+    image = preprocess_image(image_bytes, config)
+    _prepared = (digest, max_side, image)
+    return image
+
+
+def _ocr_pass(job):
+    """Run one cascade pass; returns ``(text, confidence, prepared image or None)``.
+
+    ``job`` is ``(image, pass settings, keep)``: ``image`` is the upload's
+    bytes or an image an earlier pass prepared, and with ``keep`` the image
+    prepared from bytes is sent back for the later passes.
+    """
+    from PIL import Image
+    source, settings, keep = job
+    image = _prepare(source, settings.get('max_side')) if isinstance(source, bytes) else source
+    prepared = image if keep and image is not source else None
+    rotate = settings.get('rotate', 0) % 360
+    if rotate:
+        image = image.transpose({90: Image.ROTATE_90, 180: Image.ROTATE_180, 270: Image.ROTATE_270}[rotate])
+    return recognize_words(image, settings.get('psm')) + (prepared,)
+
+
+class OCRCascade:
+    """Tracks one image through the passes: the best text so far and whether to go on.
+
+    ``max_side`` is the preprocessing resolution of passes that don't set one.
+    """
+
+    def __init__(self, passes, accept, max_side=None):
+        self.passes = passes
+        self.accept = accept
+        self.max_side = max_side
+        self.position = 0
+        self.count = 0
+        self.text = None
+        self.confidence = -1.0
+        self.done = not passes
+        self._prepared = {}
+        self._ran = set()
+        self._running = None
+
+    def _image_key(self, max_side):
+        if max_side is None or max_side in self._prepared:
+            return max_side
+        for key, image in self._prepared.items():
+            # Not reduced at ``key``, so preprocessing at a larger max_side gives the same image
+            if key is not None and key < max_side and max(image.size) < key:
+                return key
+        return max_side
+
+    def next_job(self, image_bytes):
+        """The job for the next pass worth running, or None once the cascade is done."""
+        while not self.done:
+            settings = self.passes[self.position]
+            key = self._image_key(settings.get('max_side') or self.max_side)
+            signature = (key, settings.get('psm'), settings.get('rotate', 0) % 360)
+            if signature not in self._ran:
+                self._running = key, signature
+                image = self._prepared.get(key)
+                if image is not None:
+                    return image, settings, False
+                return image_bytes, settings, self.position + 1 < len(self.passes)
+            # The same image and settings as a pass already run would read the same text
+            self.position += 1
+            self.done = self.position >= len(self.passes)
+        return None
+
+    def record(self, text, confidence, prepared=None):
+        key, signature = self._running
+        self._ran.add(signature)
+        if prepared is not None:
+            self._prepared[key] = prepared
+        self.position += 1
+        self.count += 1
+        if self.accept(text):
+            self.text, self.confidence, self.done = text, confidence, True
+            return
+        # Without a confident match, keep the pass Tesseract was surest about
+        if confidence > self.confidence:
+            self.text, self.confidence = text, confidence
+        self.done = self.position >= len(self.passes)
+
+    def result(self):
+        return self.text, self.count
+
+
+class OCRPool:
+    def __init__(self, workers, queue_depth, timeout, lang, config, preprocess_config, tesseract_cmd='', passes=None):
+        self.workers = workers
+        self.queue_depth = queue_depth
+        self.timeout = timeout
+        self.passes = passes or [{}]
+        self.rejected = 0
+        self.timeouts = 0
+        self.recognized = 0
+        self.passes_run = 0
+        self._init_args = (tesseract_cmd, lang, config, preprocess_config)
+        self._slots = threading.BoundedSemaphore(workers + queue_depth)
+        self._in_flight = 0
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def _get_executor(self):
+        # Created on first use so importing the app never spawns processes
+        with self._lock:
+            if self._executor is None:
+                self._executor = ProcessPoolExecutor(
+                    max_workers=self.workers,
+                    mp_context=multiprocessing.get_context('spawn'),
+                    initializer=_init_worker,
+                    initargs=self._init_args
+                )
+            return self._executor
+
+    def submit(self, fn, *args):
+        """Run ``fn(*args)`` in a worker; raises OCRQueueFull when every slot is taken."""
+        if not self._slots.acquire(blocking=False):
+            with self._lock:
+                self.rejected += 1
+            raise OCRQueueFull()
+        with self._lock:
+            self._in_flight += 1
+        executor = self._get_executor()
+        try:
+            future = executor.submit(fn, *args)
+        except BrokenProcessPool:
+            self._release(None)
+            self._reset(executor)
+            raise
+        except Exception:
+            self._release(None)
+            raise
+        future.add_done_callback(self._release)
+        future.executor = executor
+        return future
+
+    def _release(self, future):
+        with self._lock:
+            self._in_flight -= 1
+        self._slots.release()
+
+    def _reset(self, broken):
+        # Only the executor that broke is replaced, not one another thread already restarted
+        with self._lock:
+            if self._executor is not broken:
+                return
+            self._executor = None
+        logger.error("OCR worker pool broken, restarting it")
+        broken.shutdown(wait=False, cancel_futures=True)
+
+    def run(self, fn, *args):
+        return self._result(self.submit(fn, *args), self.timeout)
+
+    def _result(self, future, timeout):
+        try:
+            return future.result(timeout=timeout)
+        except TimeoutError:
+            # A queued job is dropped; a running one keeps its slot until it ends
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise OCRTimeout()
+        except BrokenProcessPool:
+            # A worker died (e.g. Tesseract crashed); start fresh on the next scan
+            self._reset(future.executor)
+            raise
+
+    async def run_async(self, fn, *args):
+        """Awaitable ``run`` for asgi.py: the event loop waits on the worker, no thread is held."""
+        return await self._result_async(self.submit(fn, *args), self.timeout)
+
+    async def _result_async(self, future, timeout):
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), timeout)
+        except asyncio.TimeoutError:
+            future.cancel()
+            with self._lock:
+                self.timeouts += 1
+            raise OCRTimeout()
+        except BrokenProcessPool:
+            self._reset(future.executor)
+            raise
+
+    def run_many(self, fn, items, deadline=None):
+        """Yield ``(index, result, error)`` for ``fn(item)`` as each one finishes.
+
+        At most ``workers`` items of one batch are submitted at a time, so a
+        large batch spreads over every core without taking all the queue slots
+        that single scans rely on. Items still running or unsubmitted at
+        ``deadline`` (a ``time.monotonic()`` value) get OCRTimeout.
+        """
+        items = enumerate(items)
+        pending = {}
+        exhausted = False
+        while True:
+            while not exhausted and len(pending) < self.workers:
+                try:
+                    index, item = next(items)
+                except StopIteration:
+                    exhausted = True
+                    break
+                if deadline is not None and time.monotonic() >= deadline:
+                    yield index, None, OCRTimeout()
+                    continue
+                try:
+                    future = self.submit(fn, item)
+                except Exception as e:
+                    yield index, None, e
+                    continue
+                expires = time.monotonic() + self.timeout
+                pending[future] = (index, expires if deadline is None else min(expires, deadline))
+            if not pending:
+                return
+
+            deadline = min(expires for _, expires in pending.values())
+            done, _ = wait(pending, timeout=max(0, deadline - time.monotonic()), return_when=FIRST_COMPLETED)
+            for future in done:
+                index, _ = pending.pop(future)
+                try:
+                    yield index, future.result(), None
+                except BrokenProcessPool as e:
+                    self._reset(future.executor)
+                    yield index, None, e
+                except Exception as e:
+                    yield index, None, e
+
+            now = time.monotonic()
+            for future, (index, expires) in list(pending.items()):
+                if expires <= now:
+                    del pending[future]
+                    future.cancel()
+                    with self._lock:
+                        self.timeouts += 1
+                    yield index, None, OCRTimeout()
+
+    def _cascade(self, accept, passes=None):
+        preprocess_config = self._init_args[3]
+        max_side = preprocess_config['max_side'] if preprocess_config['enabled'] else None
+        return OCRCascade(passes or self.passes, accept, max_side)
+
+    def recognize(self, image_bytes, accept, passes=None):
+        """OCR ``image_bytes`` pass by pass until ``accept(text)``; returns ``(text, passes run)``.
+
+        The passes share one ``timeout``. When a later pass fails, can't be
+        queued or runs out of time, the best earlier result is returned
+        instead. ``passes`` replaces the pool's cascade for this image.
+        """
+        cascade = self._cascade(accept, passes)
+        deadline = time.monotonic() + self.timeout
+        while not cascade.done:
+            job = cascade.next_job(image_bytes)
+            if job is None:
+                break
+            try:
+                future = self.submit(_ocr_pass, job)
+                cascade.record(*self._result(future, deadline - time.monotonic()))
+            except Exception as e:
+                if cascade.count == 0:
+                    raise
+                logger.warning(f"OCR pass {cascade.count + 1} failed, keeping the earlier result: "
+                               f"{type(e).__name__}: {str(e)}")
+                break
+        return self._finished(cascade)
+
+    async def recognize_async(self, image_bytes, accept, passes=None):
+        cascade = self._cascade(accept, passes)
+        deadline = time.monotonic() + self.timeout
+        while not cascade.done:
+            job = cascade.next_job(image_bytes)
+            if job is None:
+                break
+            try:
+                future = self.submit(_ocr_pass, job)
+                cascade.record(*await self._result_async(future, deadline - time.monotonic()))
+            except Exception as e:
+                if cascade.count == 0:
+                    raise
+                logger.warning(f"OCR pass {cascade.count + 1} failed, keeping the earlier result: "
+                               f"{type(e).__name__}: {str(e)}")
+                break
+        return self._finished(cascade)
+
+    def recognize_many(self, images, accept, timeout=None):
+        """Yield ``(index, (text, passes run), error)`` per image, like ``run_many``.
+
+        Every image gets its first pass before any gets a second, so images
+        that match early are answered while the rest are still escalating.
+        With ``timeout`` the whole batch gets that many seconds: after it no
+        pass is started, images with a result keep their best one so far and
+        the others get OCRTimeout.
+        """
+        deadline = time.monotonic() + timeout if timeout else None
+        cascades = [self._cascade(accept) for _ in images]
+        remaining = [index for index, cascade in enumerate(cascades) if not cascade.done]
+        while remaining:
+            escalate = []
+            jobs = [cascades[index].next_job(images[index]) for index in remaining]
+            for position, result, error in self.run_many(_ocr_pass, jobs, deadline):
+                index = remaining[position]
+                cascade = cascades[index]
+                if error is None:
+                    cascade.record(*result)
+                    if (not cascade.done and cascade.next_job(images[index]) is not None
+                            and (deadline is None or time.monotonic() < deadline)):
+                        escalate.append(index)
+                        continue
+                elif cascade.count == 0:
+                    yield index, None, error
+                    continue
+                yield index, self._finished(cascade), None
+            remaining = escalate
+
+    def warm(self):
+        """Start every worker and run one OCR pass on a blank image in each."""
+        from PIL import Image
+        buffer = io.BytesIO()
+        Image.new('L', (320, 80), 255).save(buffer, 'PNG')
+        job = (buffer.getvalue(), self.passes[0], False)
+        for _, _, error in self.run_many(_ocr_pass, [job] * self.workers):
+            if error is not None:
+                raise error
+
+    def _finished(self, cascade):
+        with self._lock:
+            self.recognized += 1
+            self.passes_run += cascade.count
+        return cascade.result()
+
+    def stats(self):
+        with self._lock:
+            return {
+                'workers': self.workers,
+                'queueDepth': self.queue_depth,
+                'inFlight': self._in_flight,
+                'rejected': self.rejected,
+                'timeouts': self.timeouts,
+                'recognized': self.recognized,
+                'passesRun': self.passes_run,
+                'averagePasses': round(self.passes_run / self.recognized, 3) if self.recognized else 0
+            }
+
+    def shutdown(self):
+        with self._lock:
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
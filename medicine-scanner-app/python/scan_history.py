@@ -0,0 +1,270 @@
+"""Write-behind record of every scan in SQLite, for auditing and analytics.
+
+``record()`` only puts a row on a bounded in-memory queue, so scans never
+wait on the disk. A background thread writes whatever has queued up in one
+transaction per batch (WAL mode, ``synchronous=NORMAL``). When the queue is
+full, rows are appended to a JSON-lines spill file that the writer loads
+once it has caught up; with no spill file they are dropped and counted.
+``close()`` writes everything still queued or spilled before returning.
+"""
+import json
+import logging
+import os
+import queue
+import sqlite3
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scans (
+    id INTEGER PRIMARY KEY,
+    scanned_at REAL NOT NULL,
+    source TEXT NOT NULL,
+    language TEXT NOT NULL,
+    medicine TEXT,
+    confidence REAL,
+    ocr_cached INTEGER NOT NULL,
+    timings TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_scans_scanned_at ON scans(scanned_at);
+CREATE INDEX IF NOT EXISTS idx_scans_language_medicine ON scans(language, medicine);
+"""
+COLUMNS = ('scanned_at', 'source', 'language', 'medicine', 'confidence', 'ocr_cached', 'timings')
+INSERT = f"INSERT INTO scans ({', '.join(COLUMNS)}) VALUES ({', '.join('?' for _ in COLUMNS)})"
+
+# Sentinel that tells the writer thread to finish
+_STOP = object()
+
+
+class ScanRecorder:
+    def __init__(self, path, max_queue=10000, batch_size=500, flush_seconds=1.0, spill_path=None):
+        self.path = path
+        self.batch_size = batch_size
+        self.flush_seconds = flush_seconds
+        self.spill_path = spill_path
+        self.recorded = 0
+        self.written = 0
+        self.spilled = 0
+        self.dropped = 0
+        self.batches = 0
+        self._queue = queue.Queue(maxsize=max_queue)
+        # Guards the counters, which request threads and the writer both update
+        self._count_lock = threading.Lock()
+        self._spill_lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        self._conn_lock = threading.Lock()
+        self._thread = None
+        self._closed = False
+        # Set by the writer once it has taken the stop sentinel
+        self._stopping = False
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='scan-recorder', daemon=True)
+            self._thread.start()
+
+    def record(self, source, language, medicine, confidence, ocr_cached=False, timings=None, scanned_at=None):
+        """Queue one scan; ``timings`` maps stage names to seconds. Never blocks."""
+        if self._closed:
+            return
+        self.start()
+        row = (scanned_at or time.time(), source, language, medicine or None, confidence, int(ocr_cached),
+               json.dumps({stage: round(seconds * 1e3, 2) for stage, seconds in timings.items()}) if timings else None)
+        with self._count_lock:
+            self.recorded += 1
+        try:
+            self._queue.put_nowait(row)
+        except queue.Full:
+            self._overflow(row)
+
+    def _overflow(self, row):
+        if self.spill_path is None:
+            self._count('dropped')
+            return
+        try:
+            with self._spill_lock, open(self.spill_path, 'a', encoding='utf-8') as f:
+                f.write(json.dumps(row) + '\n')
+            self._count('spilled')
+        except OSError as e:
+            logger.warning(f"Could not spill scan record: {str(e)}")
+            self._count('dropped')
+
+    def _count(self, counter, amount=1):
+        with self._count_lock:
+            setattr(self, counter, getattr(self, counter) + amount)
+
+    def _write(self, rows):
+        if not rows:
+            return
+        try:
+            with self._conn_lock:
+                self._conn.execute("BEGIN")
+                self._conn.executemany(INSERT, rows)
+                self._conn.execute("COMMIT")
+            with self._count_lock:
+                self.written += len(rows)
+                self.batches += 1
+        except Exception as e:
+            # e.g. a spilled row with a value SQLite can't bind
+            logger.error(f"Writing {len(rows)} scan records failed: {str(e)}")
+            self._count('dropped', len(rows))
+            with self._conn_lock:
+                if self._conn.in_transaction:
+                    self._conn.execute("ROLLBACK")
+
+    def _load_spill(self):
+        """Write the rows spilled while the queue was full."""
+        if self.spill_path is None or not os.path.exists(self.spill_path):
+            return
+        loading = self.spill_path + '.loading'
+        try:
+            with self._spill_lock:
+                # A file left by a crash during loading is picked up first
+                if not os.path.exists(loading):
+                    os.replace(self.spill_path, loading)
+            rows, skipped = [], 0
+            with open(loading, encoding='utf-8', errors='replace') as f:
+                for line in f:
+                    row = self._spill_row(line)
+                    if row is not None:
+                        rows.append(row)
+                    elif line.strip():
+                        skipped += 1
+            for i in range(0, len(rows), self.batch_size):
+                self._write(rows[i:i + self.batch_size])
+            os.remove(loading)
+        except OSError as e:
+            # Left in place for the next attempt
+            logger.error(f"Could not load spilled scan records: {str(e)}")
+            return
+        if skipped:
+            # e.g. a line cut short by a crash while spilling
+            logger.warning(f"Skipped {skipped} malformed spilled scan records")
+            self._count('dropped', skipped)
+
+    @staticmethod
+    def _spill_row(line):
+        """The row a spill file line holds, or None if it isn't one."""
+        try:
+            row = json.loads(line)
+        except ValueError:
+            return None
+        if not isinstance(row, list) or len(row) != len(COLUMNS):
+            return None
+        return tuple(row)
+
+    def _run(self):
+        # The writer must outlive any one bad batch or spill file, or the queue
+        # fills and every later scan is spilled or dropped
+        while True:
+            try:
+                self._drain()
+                return
+            except Exception as e:
+                logger.error(f"Scan recorder writer failed, restarting it: {type(e).__name__}: {str(e)}")
+                if not self._stopping:
+                    time.sleep(self.flush_seconds)
+
+    def _drain(self):
+        while not self._stopping:
+            try:
+                item = self._queue.get(timeout=self.flush_seconds)
+            except queue.Empty:
+                self._load_spill()
+                continue
+            rows = []
+            # Take whatever else is already queued, up to one batch
+            while True:
+                if item is _STOP:
+                    self._stopping = True
+                    break
+                rows.append(item)
+                if len(rows) >= self.batch_size:
+                    break
+                try:
+                    item = self._queue.get_nowait()
+                except queue.Empty:
+                    break
+            self._write(rows)
+            if self._queue.empty():
+                self._load_spill()
+        # Rows queued after the stop sentinel
+        rows = []
+        while True:
+            try:
+                item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            if item is not _STOP:
+                rows.append(item)
+        self._write(rows)
+        self._load_spill()
+
+    def flush(self, timeout=5.0):
+        """Wait until everything queued so far has been written (for tests and benchmarks)."""
+        deadline = time.monotonic() + timeout
+        while self.written + self.dropped < self.recorded and time.monotonic() < deadline:
+            time.sleep(0.01)
+
+    def close(self, timeout=10.0):
+        """Write everything queued or spilled, then stop the writer."""
+        if self._closed:
+            return
+        self._closed = True
+        if self._thread is not None:
+            # Blocks only while the queue is full, which the writer is draining
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+        else:
+            self._load_spill()
+        with self._conn_lock:
+            self._conn.close()
+
+    def stats(self):
+        return {'recorded': self.recorded, 'written': self.written, 'queued': self._queue.qsize(),
+                'spilled': self.spilled, 'dropped': self.dropped, 'batches': self.batches}
+
+    def summary(self, since=None, language=None, limit=10):
+        """Aggregate scans since ``since`` (epoch seconds): totals and top medicines per language."""
+        where, params = ["scanned_at >= ?"], [since or 0]
+        if language:
+            where.append("language = ?")
+            params.append(language)
+        where = ' AND '.join(where)
+        # A separate read connection: WAL readers don't wait for the writer
+        conn = sqlite3.connect(self.path)
+        try:
+            languages = {}
+            for lang, scans, matched, confidence in conn.execute(f"""
+                SELECT language, COUNT(*), COUNT(medicine), AVG(confidence)
+                FROM scans WHERE {where} GROUP BY language ORDER BY COUNT(*) DESC
+            """, params):
+                languages[lang] = {'scans': scans, 'matched': matched,
+                                   'averageConfidence': round(confidence or 0.0, 3), 'topMedicines': []}
+            for lang, medicine, scans in conn.execute(f"""
+                SELECT language, medicine, scans FROM (
+                    SELECT language, medicine, COUNT(*) AS scans,
+                           ROW_NUMBER() OVER (PARTITION BY language ORDER BY COUNT(*) DESC, medicine) AS rank
+                    FROM scans WHERE {where} AND medicine IS NOT NULL
+                    GROUP BY language, medicine
+                ) WHERE rank <= ? ORDER BY language, rank
+            """, params + [limit]):
+                languages[lang]['topMedicines'].append({'name': medicine, 'scans': scans})
+
+            stages = {}
+            for stage, average, count in conn.execute(f"""
+                SELECT t.key, AVG(t.value), COUNT(*)
+                FROM scans, json_each(scans.timings) AS t
+                WHERE {where} AND scans.timings IS NOT NULL
+                GROUP BY t.key
+            """, params):
+                stages[stage] = {'averageMs': round(average, 2), 'scans': count}
+        finally:
+            conn.close()
+        return {'scans': sum(stats['scans'] for stats in languages.values()), 'languages': languages,
+                'stages': stages}
@@ -0,0 +1,55 @@
+"""Coalescing of identical upstream calls that are in flight at the same time.
+
+When several scans of a new medicine arrive together, each one misses the
+translation and audio caches and would call Google with the same text.
+Callers of ``do(key, fn, ...)`` with an equal key share the first caller's
+result, or its exception, instead of starting their own call.
+"""
+import threading
+from concurrent.futures import Future
+
+
+class SingleFlight:
+    """The first caller runs ``fn``; the others block on its Future."""
+
+    def __init__(self):
+        self.calls = 0
+        self.coalesced = 0
+        self._flights = {}
+        self._lock = threading.Lock()
+
+    def begin(self, key):
+        """Return ``(future, leader)``; the leader must call ``finish`` once it has a result."""
+        with self._lock:
+            future = self._flights.get(key)
+            if future is not None:
+                self.coalesced += 1
+                return future, False
+            future = self._flights[key] = Future()
+            self.calls += 1
+            return future, True
+
+    def finish(self, key, future, result=None, error=None):
+        with self._lock:
+            if self._flights.get(key) is future:
+                del self._flights[key]
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def do(self, key, fn, *args):
+        future, leader = self.begin(key)
+        if not leader:
+            return future.result()
+        try:
+            result = fn(*args)
+        except BaseException as e:
+            self.finish(key, future, error=e)
+            raise
+        self.finish(key, future, result)
+        return result
+
+    def stats(self):
+        with self._lock:
+            return {'calls': self.calls, 'coalesced': self.coalesced, 'inFlight': len(self._flights)}
@@ -0,0 +1,59 @@
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+
+class SpeechJobQueue:
+    """Bounded background pool for speech synthesis.
+
+    Jobs are identified by their audio cache key, so a second request for the
+    same speech joins the job already in flight.
+    """
+
+    FAILED_JOBS_KEPT = 256
+
+    def __init__(self, workers, max_pending):
+        self.max_pending = max_pending
+        self.rejected = 0
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='speech')
+        self._pending = {}
+        self._failed = OrderedDict()
+        self._lock = threading.Lock()
+
+    def submit(self, key, fn, *args):
+        """Schedule ``fn(*args)`` under ``key``; returns the Future or None when saturated."""
+        with self._lock:
+            future = self._pending.get(key)
+            if future is not None:
+                return future
+            if len(self._pending) >= self.max_pending:
+                self.rejected += 1
+                return None
+            self._failed.pop(key, None)
+            future = self._executor.submit(fn, *args)
+            self._pending[key] = future
+        future.add_done_callback(lambda f: self._finished(key, f))
+        return future
+
+    def _finished(self, key, future):
+        with self._lock:
+            self._pending.pop(key, None)
+            if future.cancelled() or future.exception() is not None or future.result() is None:
+                self._failed[key] = True
+                while len(self._failed) > self.FAILED_JOBS_KEPT:
+                    self._failed.popitem(last=False)
+
+    def get(self, key):
+        with self._lock:
+            return self._pending.get(key)
+
+    def failed(self, key):
+        with self._lock:
+            return key in self._failed
+
+    def pending_count(self):
+        with self._lock:
+            return len(self._pending)
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
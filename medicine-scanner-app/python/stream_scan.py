@@ -0,0 +1,89 @@
+"""State of one live camera scan (the /api/scan/stream WebSocket in asgi.py).
+
+The phone sends frames faster than OCR can read them. LatestFrame keeps only
+the newest one; older frames that were never read are dropped. FrameEvidence
+adds up what each OCR'd frame says: a catalogue name found exactly counts 1,
+a fuzzy match counts its edit similarity. The scan is decided once the
+leading medicine is ahead of the runner-up by ``threshold``. One clean frame
+is enough, or a few blurry frames that agree.
+"""
+import asyncio
+
+
+class LatestFrame:
+    """Single-slot mailbox between the WebSocket reader and the OCR loop."""
+
+    def __init__(self):
+        self.frame = None
+        self.received = 0
+        self.dropped = 0
+        self.closed = False
+        self._ready = asyncio.Event()
+
+    def put(self, frame):
+        self.received += 1
+        if self.frame is not None:
+            self.dropped += 1
+        self.frame = frame
+        self._ready.set()
+
+    def close(self):
+        self.closed = True
+        self._ready.set()
+
+    async def take(self):
+        """Wait for a frame that hasn't been read yet; None once the client has gone."""
+        while self.frame is None and not self.closed:
+            self._ready.clear()
+            await self._ready.wait()
+        frame, self.frame = self.frame, None
+        return frame
+
+
+class FrameEvidence:
+    def __init__(self, catalogue, fuzzy_config, threshold=1.0):
+        self.catalogue = catalogue
+        self.fuzzy_config = fuzzy_config
+        self.threshold = threshold
+        self.frames = 0
+        self.scores = {}
+        # Best-scoring OCR text per medicine, matched again for the result
+        self.texts = {}
+
+    def add(self, text):
+        """Count one frame's OCR text; returns ``(medicine name, weight)`` or None."""
+        self.frames += 1
+        lower_text = (text or '').lower()
+        med, _, _ = self.catalogue.matcher.best_match(lower_text)
+        weight = 1.0
+        if med is None:
+            med, score, names = self.catalogue.fuzzy_index.best_match(
+                lower_text,
+                min_similarity=self.fuzzy_config['min_similarity'],
+                top_k=self.fuzzy_config['top_k']
+            )
+            if med is None:
+                return None
+            # Undo the length weighting to get the edit similarity of the matched token
+            weight = min(1.0, score * len(lower_text) / len(names[0]))
+        name = med['name']
+        self.scores[name] = self.scores.get(name, 0.0) + weight
+        if weight > self.texts.get(name, (0.0, ''))[0]:
+            self.texts[name] = (weight, text)
+        return name, weight
+
+    def leader(self):
+        """Return ``(name, margin over the runner-up)``, or ``(None, 0.0)`` before any match."""
+        if not self.scores:
+            return None, 0.0
+        ranked = sorted(self.scores.items(), key=lambda item: item[1], reverse=True)
+        runner_up = ranked[1][1] if len(ranked) > 1 else 0.0
+        return ranked[0][0], ranked[0][1] - runner_up
+
+    @property
+    def decided(self):
+        return self.leader()[1] >= self.threshold
+
+    def best_text(self):
+        name, _ = self.leader()
+        return self.texts[name][1] if name is not None else ''
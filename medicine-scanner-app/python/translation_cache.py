@@ -0,0 +1,116 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def translation_cache_key(text, source_lang, target_lang):
+    return hashlib.sha256(f"{source_lang}\0{target_lang}\0{text}".encode('utf-8')).hexdigest()
+
+
+class TranslationCache:
+    """In-process LRU in front of a persistent SQLite table of translations.
+
+    Entries older than ``ttl_seconds`` are treated as misses. The SQLite tier
+    is pruned back to ``max_entries`` by last access time.
+    """
+
+    PRUNE_EVERY = 256
+
+    def __init__(self, path, memory_entries, max_entries, ttl_seconds):
+        self.memory_entries = memory_entries
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.memory_hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._puts_since_prune = 0
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute("""
+        CREATE TABLE IF NOT EXISTS translations (
+            key TEXT PRIMARY KEY,
+            source_lang TEXT NOT NULL,
+            target_lang TEXT NOT NULL,
+            translated TEXT NOT NULL,
+            created_at REAL NOT NULL,
+            accessed_at REAL NOT NULL
+        )""")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed_at ON translations(accessed_at)")
+        # Kept up to date on insert and prune, so stats() needn't count the table
+        self._disk_entries = self._conn.execute("SELECT COUNT(*) FROM translations").fetchone()[0]
+
+    def _remember(self, key, translated, created_at):
+        self._memory[key] = (translated, created_at)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.memory_entries:
+            self._memory.popitem(last=False)
+
+    def get(self, text, source_lang, target_lang):
+        key = translation_cache_key(text, source_lang, target_lang)
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry and now - entry[1] < self.ttl_seconds:
+                self._memory.move_to_end(key)
+                self.memory_hits += 1
+                return entry[0]
+            self._memory.pop(key, None)
+
+            row = self._conn.execute(
+                "SELECT translated, created_at FROM translations WHERE key = ? AND created_at > ?",
+                (key, now - self.ttl_seconds)
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            self._conn.execute("UPDATE translations SET accessed_at = ? WHERE key = ?", (now, key))
+            self._remember(key, row[0], row[1])
+            self.disk_hits += 1
+            return row[0]
+
+    def put(self, text, source_lang, target_lang, translated):
+        key = translation_cache_key(text, source_lang, target_lang)
+        now = time.time()
+        with self._lock:
+            updated = self._conn.execute(
+                "UPDATE translations SET translated = ?, created_at = ?, accessed_at = ? WHERE key = ?",
+                (translated, now, now, key)
+            ).rowcount
+            if not updated:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO translations VALUES (?, ?, ?, ?, ?, ?)",
+                    (key, source_lang, target_lang, translated, now, now)
+                )
+                self._disk_entries += 1
+            self._remember(key, translated, now)
+            self._puts_since_prune += 1
+            if self._puts_since_prune >= self.PRUNE_EVERY:
+                self._prune(now)
+
+    def _prune(self, now):
+        self._puts_since_prune = 0
+        expired = self._conn.execute("DELETE FROM translations WHERE created_at <= ?", (now - self.ttl_seconds,))
+        self._disk_entries -= expired.rowcount
+        evicted = self._conn.execute("""
+        DELETE FROM translations WHERE key IN (
+            SELECT key FROM translations ORDER BY accessed_at DESC LIMIT -1 OFFSET ?
+        )""", (self.max_entries,))
+        self._disk_entries -= evicted.rowcount
+
+    def stats(self):
+        with self._lock:
+            lookups = self.memory_hits + self.disk_hits + self.misses
+            hits = self.memory_hits + self.disk_hits
+            return {
+                'memoryHits': self.memory_hits,
+                'diskHits': self.disk_hits,
+                'misses': self.misses,
+                'hitRate': hits / lookups if lookups else 0,
+                'memoryEntries': len(self._memory),
+                'diskEntries': self._disk_entries
+            }
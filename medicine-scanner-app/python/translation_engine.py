@@ -0,0 +1,151 @@
+"""Google Translate client shared by every translation in the scanner.
+
+Long texts are split at sentence ends into chunks of at most ``chunk_chars``,
+translated concurrently (at most ``max_parallel`` requests at once across the
+process) and put back together in order with their original whitespace.
+Requests go through one pooled keep-alive ``requests.Session`` instead of a
+new connection per chunk. Requests are built the way ``deep_translator``
+builds them for Google Translate's mobile page.
+"""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from localization import TRANSLATOR_LANG_CODES
+
+TRANSLATE_URL = 'https://translate.google.com/m'
+TRANSLATE_ELEMENTS = ({'class': 't0'}, {'class': 'result-container'})
+# Google Translate's mobile page takes fewer than 5000 characters per request
+MAX_CHUNK_CHARS = 4999
+# Whitespace after a sentence end (including the Devanagari danda), or any line break
+SENTENCE_BREAK = re.compile(r'((?<=[.!?।])\s+|\s*\n\s*)')
+
+
+class TranslationError(Exception):
+    pass
+
+
+def _fragments(sentence, separator, max_chars):
+    """Yield ``(fragment, gap)`` pieces of one sentence, cutting an over-long one at spaces."""
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(' ', 0, max_chars + 1)
+        if cut <= 0:
+            yield sentence[:max_chars], ''
+            sentence = sentence[max_chars:]
+        else:
+            yield sentence[:cut], ' '
+            sentence = sentence[cut + 1:]
+    yield sentence, separator
+
+
+def split_text(text, max_chars=MAX_CHUNK_CHARS):
+    """Split ``text`` into ``(chunk, separator)`` pairs with chunks of at most ``max_chars``.
+
+    Chunks end at sentence ends or line breaks where possible.
+    ``''.join(chunk + separator for chunk, separator in pairs)`` is ``text``.
+    """
+    parts = SENTENCE_BREAK.split(text)
+    pairs = []
+    current, pending = '', ''
+    for i in range(0, len(parts), 2):
+        separator = parts[i + 1] if i + 1 < len(parts) else ''
+        for fragment, gap in _fragments(parts[i], separator, max_chars):
+            if not current:
+                if pending:
+                    # Leading whitespace, kept as is
+                    pairs.append(('', pending))
+                current, pending = fragment, gap
+            elif len(current) + len(pending) + len(fragment) <= max_chars:
+                current, pending = current + pending + fragment, gap
+            else:
+                pairs.append((current, pending))
+                current, pending = fragment, gap
+    if current or pending:
+        pairs.append((current, pending))
+    return pairs
+
+
+def translated_text(html, original):
+    """Pull the translation out of Google Translate's mobile page."""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(html, 'html.parser')
+    for query in TRANSLATE_ELEMENTS:
+        element = soup.find('div', query)
+        if element:
+            return element.get_text(strip=True)
+    raise TranslationError(f"No translation found for: {original[:50]}")
+
+
+class TranslationEngine:
+    def __init__(self, url=TRANSLATE_URL, chunk_chars=1500, max_parallel=8, pool_connections=16, timeout=10):
+        self.url = url
+        self.chunk_chars = min(chunk_chars, MAX_CHUNK_CHARS)
+        self.max_parallel = max_parallel
+        self.pool_connections = pool_connections
+        self.timeout = timeout
+        self.requests = 0
+        self._session = None
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        # Created on first use so importing the app doesn't import requests
+        if self._session is None:
+            with self._lock:
+                if self._session is None:
+                    import requests
+                    from requests.adapters import HTTPAdapter
+                    session = requests.Session()
+                    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=self.pool_connections)
+                    session.mount('https://', adapter)
+                    session.mount('http://', adapter)
+                    self._executor = ThreadPoolExecutor(self.max_parallel, thread_name_prefix='translate')
+                    self._session = session
+        return self._session
+
+    def warm(self):
+        self._ensure_started()
+        from bs4 import BeautifulSoup  # noqa: F401 (imported for the first translation)
+
+    def _count_request(self):
+        # Chunks are sent from the executor's threads as well as the caller's
+        with self._lock:
+            self.requests += 1
+
+    def translate_chunk(self, chunk, source, target):
+        if not chunk.strip():
+            return chunk
+        session = self._ensure_started()
+        self._count_request()
+        response = session.get(self.url, params={'tl': target, 'sl': source, 'q': chunk}, timeout=self.timeout)
+        if response.status_code != 200:
+            raise TranslationError(f"Google Translate returned HTTP {response.status_code}")
+        return translated_text(response.text, chunk)
+
+    def translate(self, text, source='auto', target='en'):
+        """Translate ``text`` from ``source`` ('auto' to detect) into ``target``."""
+        target = TRANSLATOR_LANG_CODES.get(target, target)
+        pairs = split_text(text, self.chunk_chars)
+        if not pairs:
+            return text
+        if len(pairs) == 1:
+            return self.translate_chunk(pairs[0][0], source, target) + pairs[0][1]
+        self._ensure_started()
+        futures = [self._executor.submit(self.translate_chunk, chunk, source, target) for chunk, _ in pairs[1:]]
+        try:
+            # The calling thread sends the first chunk itself rather than idling
+            parts = [self.translate_chunk(pairs[0][0], source, target)] + [future.result() for future in futures]
+            return ''.join(part + separator for part, (_, separator) in zip(parts, pairs))
+        finally:
+            # After a failed chunk don't send the ones that haven't started
+            for future in futures:
+                future.cancel()
+
+    def stats(self):
+        return {'requests': self.requests, 'chunkChars': self.chunk_chars, 'maxParallel': self.max_parallel}
+
+    def close(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False, cancel_futures=True)
+        if self._session is not None:
+            self._session.close()
@@ -0,0 +1,62 @@
+"""Background warmup run once per process before the server reports ready.
+
+Each step is a named callable. They run in order on a daemon thread, and
+``status()`` reports which steps finished, how long each took and what failed.
+"""
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+
+class Warmup:
+    def __init__(self, steps):
+        self.steps = steps
+        self.results = {}
+        self.started_at = None
+        self.finished_at = None
+        self._lock = threading.Lock()
+        self._done = threading.Event()
+
+    def start(self):
+        """Start the steps in the background; later calls do nothing."""
+        with self._lock:
+            if self.started_at is not None:
+                return False
+            self.started_at = time.time()
+        threading.Thread(target=self.run, name='warmup', daemon=True).start()
+        return True
+
+    def run(self):
+        for name, step in self.steps:
+            start = time.perf_counter()
+            try:
+                detail = step()
+                self.results[name] = {'ok': True, 'seconds': round(time.perf_counter() - start, 3)}
+                if detail is not None:
+                    self.results[name]['detail'] = detail
+            except Exception as e:
+                logger.error(f"Warmup step {name} failed: {str(e)}")
+                self.results[name] = {'ok': False, 'seconds': round(time.perf_counter() - start, 3), 'error': str(e)}
+        self.finished_at = time.time()
+        logger.info(f"Warmup finished in {self.finished_at - self.started_at:.2f}s")
+        self._done.set()
+
+    def wait(self, timeout=None):
+        return self._done.wait(timeout)
+
+    @property
+    def finished(self):
+        return self._done.is_set()
+
+    def ok(self, name):
+        return self.results.get(name, {}).get('ok', False)
+
+    def status(self):
+        return {
+            'started': self.started_at is not None,
+            'finished': self.finished,
+            'seconds': round(self.finished_at - self.started_at, 3) if self.finished else None,
+            'steps': {name: self.results.get(name, {'ok': None}) for name, _ in self.steps}
+        }
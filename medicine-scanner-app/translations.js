@@ -14,6 +14,9 @@ const translations = {
         medicineInfo: "Medicine Information",
         scanHistory: "Scan History",
         processing: "Processing...",
+        liveScanning: "Hold the label steady in front of the camera...",
+        liveScanCandidate: "Reading:",
+        liveScanBusy: "Server is busy, still trying...",
         searchHistory: "Search History",
         account: "Account",
         privacyPolicy: "Privacy Policy"
@@ -33,6 +36,9 @@ const translations = {
         medicineInfo: "दवा की जानकारी",
         scanHistory: "स्कैन इतिहास",
         processing: "प्रोसेसिंग...",
+        liveScanning: "लेबल को कैमरे के सामने स्थिर रखें...",
+        liveScanCandidate: "पढ़ रहे हैं:",
+        liveScanBusy: "सर्वर व्यस्त है, कोशिश जारी है...",
         searchHistory: "इतिहास खोजें",
         account: "खाता",
         privacyPolicy: "गोपनीयता नीति"